@@ -1,43 +1,148 @@
 import os
+import time
+from typing import Any, Dict, List, Optional
+
 from dotenv import load_dotenv
-from .base import ModelAdapter
+from .base import AnswerComplete, ModelAdapter
+from ..config import MODELS
+from ..monitoring import ADAPTER_REQUESTS, ADAPTER_ERRORS, error_kind
+from ..tokens import count_tokens
 
 load_dotenv()
 
+GENERATION_OPTIONS = ("max_tokens", "max_completion_tokens", "stop", "temperature")
+
+
+def generation_options(model_id: str) -> Dict[str, Any]:
+    """The ``config.MODELS`` generation limits for ``model_id``, as adapter keyword arguments."""
+    entry = next((m for m in MODELS if m["id"] == model_id), {})
+    return {k: entry[k] for k in GENERATION_OPTIONS if entry.get(k) is not None}
+
+
+def _usage_dict(usage) -> Dict[str, Any]:
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "total_tokens": getattr(usage, "total_tokens", None),
+        # Prompt tokens served from the provider's prompt cache (billed at a discount)
+        "cached_tokens": getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None),
+    }
+
 
 class AzureOpenAIAdapter(ModelAdapter):
+    """
+    Chat completions on an Azure OpenAI deployment.
+
+    ``max_tokens`` / ``max_completion_tokens`` (reasoning models) and ``stop`` are passed
+    to the API when set; ``config.MODELS`` holds them per model. With ``stream=True`` the
+    response is streamed: the adapter records time to first token and inter-token latency,
+    and stops reading once ``until`` accepts the text so far. ``n`` > 1 asks for several
+    completions of one prompt (the API's ``n``); use a ``temperature`` above 0 for them
+    to differ by more than the provider's nondeterminism.
+    """
+
     def __init__(
         self,
         deployment: str,
         api_version: str | None = None,
         endpoint: str | None = None,
         api_key: str | None = None,
+        max_retries: int | None = None,
+        timeout: float | None = None,
+        stream: bool = False,
+        max_tokens: int | None = None,
+        max_completion_tokens: int | None = None,
+        stop: List[str] | None = None,
+        temperature: float = 0.0,
     ):
         from openai import AzureOpenAI
-        
+
+        client_options = {}
+        if max_retries is not None:
+            client_options["max_retries"] = max_retries
+        if timeout is not None:
+            client_options["timeout"] = timeout
         self.client = AzureOpenAI(
             api_version=api_version or os.getenv("AZURE_OPENAI_API_VERSION"),
             azure_endpoint=endpoint or os.getenv("AZURE_OPENAI_ENDPOINT"),
             api_key=api_key or os.getenv("AZURE_OPENAI_API_KEY"),
+            **client_options,
         )
         self.deployment = deployment
+        self.stream = stream
+        self.temperature = temperature
+        self.request_options: Dict[str, Any] = {}
+        if max_tokens is not None:
+            self.request_options["max_tokens"] = max_tokens
+        if max_completion_tokens is not None:
+            self.request_options["max_completion_tokens"] = max_completion_tokens
+        if stop:
+            self.request_options["stop"] = stop
 
-    def generate(self, prompt: str) -> dict:
+    def generate(self, prompt: str, until: Optional[AnswerComplete] = None, n: int = 1) -> dict:
+        ADAPTER_REQUESTS.inc(adapter="azure")
         try:
-            resp = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0,
-            )
-            text = (resp.choices[0].message.content or "")
+            request = {
+                "model": self.deployment,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": self.temperature,
+                **self.request_options,
+                **({"n": n} if n > 1 else {}),
+            }
+            if self.stream:
+                return self._generate_stream(request, prompt, until, n)
+            resp = self.client.chat.completions.create(**request)
+            texts = [c.message.content or "" for c in sorted(resp.choices, key=lambda c: c.index)]
             usage = getattr(resp, "usage", None)
-            usage_dict = {}
-            if usage:
-                usage_dict = {
-                    "prompt_tokens": getattr(usage, "prompt_tokens", None),
-                    "completion_tokens": getattr(usage, "completion_tokens", None),
-                    "total_tokens": getattr(usage, "total_tokens", None),
-                }
-            return {"text": text, "usage": usage_dict}
+            return {"text": texts[0], **({"texts": texts} if n > 1 else {}), "usage": _usage_dict(usage) if usage else {}}
         except Exception as e:
+            ADAPTER_ERRORS.inc(adapter="azure", kind=error_kind(e))
             return {"text": f"ERROR: azure generation failed: {type(e).__name__}: {e}"[:500], "usage": {}}
+
+    def _generate_stream(self, request: Dict[str, Any], prompt: str, until: Optional[AnswerComplete], n: int) -> dict:
+        started = time.perf_counter()
+        # include_usage sends a final usage chunk (API version 2024-09-01-preview or later)
+        stream = self.client.chat.completions.create(**request, stream=True, stream_options={"include_usage": True})
+        # Chunks of the n completions arrive interleaved, tagged with their choice index
+        parts: List[List[str]] = [[] for _ in range(n)]
+        complete = [False] * n
+        arrivals: List[float] = []
+        usage = None
+        cutoff = False
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                for choice in chunk.choices or []:
+                    delta = choice.delta.content if choice.delta else None
+                    if not delta or choice.index >= n:
+                        continue
+                    arrivals.append(time.perf_counter())
+                    parts[choice.index].append(delta)
+                    if until is not None and not complete[choice.index]:
+                        complete[choice.index] = until("".join(parts[choice.index]))
+                if until is not None and all(complete):
+                    # Closing the connection stops generation, so the rest of the answer is never produced
+                    cutoff = True
+                    break
+        finally:
+            stream.close()
+        texts = ["".join(p) for p in parts]
+        if usage is not None:
+            usage_dict = _usage_dict(usage)
+        else:
+            # No usage chunk after an early cutoff: one streamed chunk is about one token
+            prompt_tokens = count_tokens(prompt)
+            usage_dict = {"prompt_tokens": prompt_tokens, "completion_tokens": len(arrivals), "total_tokens": prompt_tokens + len(arrivals)}
+        gaps = [b - a for a, b in zip(arrivals, arrivals[1:])]
+        return {
+            "text": texts[0],
+            **({"texts": texts} if n > 1 else {}),
+            "usage": usage_dict,
+            "stream": {
+                "ttft_ms": (arrivals[0] - started) * 1000.0 if arrivals else None,
+                "itl_ms": sum(gaps) * 1000.0 / len(gaps) if gaps else None,
+                "chunks": len(arrivals),
+                "cutoff": cutoff,
+            },
+        }
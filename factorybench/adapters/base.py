@@ -1,8 +1,18 @@
 from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+# Predicate on the answer text received so far; True once nothing more is needed
+AnswerComplete = Callable[[str], bool]
 
 
 class ModelAdapter(ABC):
     @abstractmethod
-    def generate(self, prompt: str) -> dict:
-        """Return a dict with keys: text (str), usage (optional dict)."""
+    def generate(self, prompt: str, until: Optional[AnswerComplete] = None, n: int = 1) -> dict:
+        """
+        Return a dict with keys: text (str), usage (optional dict), stream (optional dict).
+
+        With ``n`` > 1, ``texts`` holds ``n`` completions of the one prompt (``text`` is the
+        first) and usage covers all of them. Streaming adapters may stop reading once
+        ``until(text)`` is True for every completion; others ignore it.
+        """
         ...
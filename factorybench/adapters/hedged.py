@@ -0,0 +1,141 @@
+"""
+Request hedging for slow model calls.
+
+A small share of calls takes many times the median, and those stragglers set the
+wall-clock time of a run. ``HedgedAdapter`` wraps any adapter: when a call has not
+answered after the observed latency quantile of recent calls, the same prompt is sent
+again and whichever call answers first is returned. Hedges are capped at ``max_rate``
+of all calls.
+
+The synchronous clients cannot abort a request in flight, so a losing call that has
+already started is abandoned: its answer is discarded once it arrives. The provider
+still bills it, so the returned usage carries ``hedge_prompt_tokens`` and
+``hedge_completion_tokens`` (the loser's usage if it finished, else the winner's as an
+estimate) for the runner to add to the run cost.
+"""
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError, wait
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Any, Deque, Dict, Optional
+import time
+
+from .base import AnswerComplete, ModelAdapter
+from ..monitoring import ADAPTER_HEDGES
+
+# Usage fields a hedged call adds; summed by the runner like token counts
+HEDGE_USAGE_KEYS = ("hedges", "hedge_wins", "hedge_prompt_tokens", "hedge_completion_tokens")
+
+
+@dataclass
+class HedgingPolicy:
+    """When ``HedgedAdapter`` sends a duplicate request."""
+    quantile: float = 0.95  # hedge calls slower than this quantile of recent latencies
+    max_rate: float = 0.05  # at most this many hedges per call
+    min_delay_s: float = 0.05  # never hedge sooner than this
+    window: int = 200  # recent successful calls the threshold is computed from
+    warmup: int = 20  # successful calls observed before the first hedge
+
+    def __post_init__(self):
+        if not 0.0 < self.quantile < 1.0:
+            raise ValueError("Hedging quantile must be between 0 and 1")
+        if not 0.0 <= self.max_rate <= 1.0:
+            raise ValueError("Hedging max_rate must be between 0 and 1")
+        if self.warmup < 1 or self.window < self.warmup:
+            raise ValueError("Hedging needs 1 <= warmup <= window")
+
+    def describe(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _failed(result: Dict[str, Any]) -> bool:
+    return (result.get("text") or "").startswith("ERROR:")
+
+
+class HedgedAdapter(ModelAdapter):
+    """
+    Adapter that duplicates slow calls to ``adapter``.
+
+    ``label`` names the wrapped adapter in the ``factorybench_adapter_hedges_total``
+    metric. ``max_workers`` bounds concurrent calls, abandoned ones included.
+    """
+
+    def __init__(self, adapter: ModelAdapter, policy: Optional[HedgingPolicy] = None, label: str = "adapter", max_workers: int = 16):
+        self.adapter = adapter
+        self.policy = policy or HedgingPolicy()
+        self.label = label
+        self._latencies: Deque[float] = deque(maxlen=self.policy.window)
+        self._lock = Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="factorybench-hedge")
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def threshold(self) -> Optional[float]:
+        """Seconds after which a call is hedged; None while warming up."""
+        with self._lock:
+            if len(self._latencies) < self.policy.warmup:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self.policy.quantile * len(ordered)))
+        return max(self.policy.min_delay_s, ordered[index])
+
+    def _call(self, prompt: str, until: Optional[AnswerComplete], n: int) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = self.adapter.generate(prompt, until=until, n=n)
+        if not _failed(result):
+            # Hedges and abandoned calls count too: all are draws from the same latency distribution
+            with self._lock:
+                self._latencies.append(time.perf_counter() - started)
+        return result
+
+    def _reserve_hedge(self) -> bool:
+        with self._lock:
+            if self.hedges + 1 > self.policy.max_rate * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def generate(self, prompt: str, until: Optional[AnswerComplete] = None, n: int = 1) -> dict:
+        with self._lock:
+            self.calls += 1
+        delay = self.threshold()
+        primary = self._pool.submit(self._call, prompt, until, n)
+        if delay is None:
+            return primary.result()
+        try:
+            return primary.result(timeout=delay)
+        except TimeoutError:
+            if not self._reserve_hedge():
+                return primary.result()
+        hedge = self._pool.submit(self._call, prompt, until, n)
+
+        # First successful answer wins; if the first to finish failed, wait for the other
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            answered = [f for f in (primary, hedge) if f in done and not _failed(f.result())]
+            if answered or not pending:
+                winner = answered[0] if answered else next(iter(done))
+                break
+        loser = hedge if winner is primary else primary
+        loser.cancel()
+        if winner is hedge:
+            with self._lock:
+                self.hedge_wins += 1
+        ADAPTER_HEDGES.inc(adapter=self.label, winner="hedge" if winner is hedge else "primary")
+
+        result = dict(winner.result())
+        usage = dict(result.get("usage") or {})
+        # Bill the loser: its own usage if it finished, the winner's as an estimate otherwise
+        billed = (loser.result().get("usage") or {}) if loser.done() and not loser.cancelled() else usage
+        usage["hedges"] = 1
+        usage["hedge_wins"] = int(winner is hedge)
+        usage["hedge_prompt_tokens"] = 0 if loser.cancelled() else billed.get("prompt_tokens") or 0
+        usage["hedge_completion_tokens"] = 0 if loser.cancelled() else billed.get("completion_tokens") or 0
+        result["usage"] = usage
+        return result
+
+    def shutdown(self):
+        """Stop accepting calls; abandoned calls finish in the background."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,6 +1,11 @@
-from .base import ModelAdapter
+from typing import Optional
+
+from .base import AnswerComplete, ModelAdapter
+from ..monitoring import ADAPTER_REQUESTS
 
 
 class MockAdapter(ModelAdapter):
-    def generate(self, prompt: str) -> dict:
-        return {"text": "mean=0 min=0 max=0", "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}}
+    def generate(self, prompt: str, until: Optional[AnswerComplete] = None, n: int = 1) -> dict:
+        ADAPTER_REQUESTS.inc(adapter="mock")
+        text = "mean=0 min=0 max=0"
+        return {"text": text, **({"texts": [text] * n} if n > 1 else {}), "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}}
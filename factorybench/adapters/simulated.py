@@ -0,0 +1,119 @@
+"""Latency-simulating adapter for harness benchmarks and offline load tests."""
+import math
+import random
+import time
+from typing import Dict, List, Optional
+
+from .base import AnswerComplete, ModelAdapter
+from ..eval.serializers import parse_values
+from ..monitoring import ADAPTER_REQUESTS, ADAPTER_ERRORS
+
+LATENCY_DISTRIBUTIONS = ("constant", "normal", "lognormal", "exponential")
+
+
+def extract_series(prompt: str) -> List[float]:
+    """Recover the value series from a telemetry literacy prompt in any prompt format."""
+    return parse_values(prompt)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for cost simulation."""
+    return max(1, math.ceil(len(text) / 4))
+
+
+def simulated_answer(values: List[float], correct: bool, rng: random.Random, rel_error: float = 0.1) -> str:
+    """Render a ``mean=.. min=.. max=..`` answer, exact or perturbed by ~``rel_error``."""
+    if not values:
+        return "mean=0 min=0 max=0"
+    stats = {"mean": sum(values) / len(values), "min": min(values), "max": max(values)}
+    if not correct:
+        scale = max(abs(stats["max"] - stats["min"]), abs(stats["mean"]), 1.0)
+        stats = {k: v + rng.choice((-1, 1)) * rng.uniform(0.5, 1.5) * rel_error * scale for k, v in stats.items()}
+    return " ".join(f"{k}={v:.4f}" for k, v in stats.items())
+
+
+class SimulatedAdapter(ModelAdapter):
+    """
+    Adapter that behaves like a remote model without calling one.
+
+    Latency is drawn from ``latency_dist`` around ``latency_ms`` (mean for normal and
+    exponential, median for lognormal) plus uniform ``jitter_ms``. Answers are computed
+    from the series in the prompt and are correct with probability ``accuracy``. Errors
+    and throttling are reported the same way ``AzureOpenAIAdapter`` reports them: an
+    ``ERROR: ...`` text with empty usage.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        latency_dist: str = "lognormal",
+        latency_sigma: float = 0.5,
+        jitter_ms: float = 0.0,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: int = 16,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        accuracy: float = 1.0,
+        seed: Optional[int] = None,
+        sleep: bool = True,
+    ):
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{latency_dist}'. Valid: {', '.join(LATENCY_DISTRIBUTIONS)}")
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.jitter_ms = jitter_ms
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.accuracy = accuracy
+        self.sleep = sleep
+        self.rng = random.Random(seed)
+        # Time spent "inside the model"; lets callers separate harness overhead from latency
+        self.total_latency_s = 0.0
+        self.calls = 0
+
+    def sample_latency(self) -> float:
+        """Draw one latency in seconds."""
+        base = self.latency_ms
+        if base <= 0:
+            latency = 0.0
+        elif self.latency_dist == "constant":
+            latency = base
+        elif self.latency_dist == "normal":
+            latency = self.rng.gauss(base, base * self.latency_sigma)
+        elif self.latency_dist == "lognormal":
+            latency = base * math.exp(self.rng.gauss(0.0, self.latency_sigma))
+        else:
+            latency = self.rng.expovariate(1.0 / base)
+        if self.jitter_ms > 0:
+            latency += self.rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, latency) / 1000.0
+
+    def generate(self, prompt: str, until: Optional[AnswerComplete] = None, n: int = 1) -> dict:
+        self.calls += 1
+        ADAPTER_REQUESTS.inc(adapter="simulated")
+        latency = self.sample_latency()
+        if self.sleep and latency > 0:
+            time.sleep(latency)
+        self.total_latency_s += latency
+
+        roll = self.rng.random()
+        if roll < self.throttle_rate:
+            ADAPTER_ERRORS.inc(adapter="simulated", kind="throttle")
+            return {"text": "ERROR: simulated generation failed: RateLimitError: Error code: 429 - rate limit exceeded", "usage": {}}
+        if roll < self.throttle_rate + self.error_rate:
+            ADAPTER_ERRORS.inc(adapter="simulated", kind="error")
+            return {"text": "ERROR: simulated generation failed: APIError: Error code: 500 - internal error", "usage": {}}
+
+        series = extract_series(prompt)
+        texts = [simulated_answer(series, self.rng.random() < self.accuracy, self.rng) for _ in range(n)]
+        prompt_tokens = self.prompt_tokens if self.prompt_tokens is not None else estimate_tokens(prompt)
+        # One prompt, n completions: input tokens are billed once
+        usage: Dict[str, int] = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": self.completion_tokens * n,
+            "total_tokens": prompt_tokens + self.completion_tokens * n,
+        }
+        return {"text": texts[0], **({"texts": texts} if n > 1 else {}), "usage": usage}
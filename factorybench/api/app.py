@@ -1,17 +1,25 @@
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request
+from fastapi.responses import FileResponse, PlainTextResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, Literal, Dict, Any, List
 from pathlib import Path
 from datetime import datetime, timezone
+from contextlib import asynccontextmanager
+import asyncio
 import json
+import time
+
+from starlette.concurrency import run_in_threadpool
 
 from ..config import (
     RUN_DIR,
     AZURE_OPENAI_API_KEY,
     AZURE_OPENAI_ENDPOINT,
     AZURE_OPENAI_API_VERSION,
+    AZURE_OPENAI_MAX_RETRIES,
+    AZURE_OPENAI_TIMEOUT,
     DATASETS,
     MODELS,
     MAX_COST_PER_RUN,
@@ -19,13 +27,35 @@ from ..config import (
 )
 from ..stages import Stage, normalize_stage
 from ..data.loader_tl import load_telemetry_literacy
+from ..data.loader_rca import load_root_cause_analysis
 from ..adapters.mock import MockAdapter
-from ..adapters.azure_openai import AzureOpenAIAdapter
-from ..eval.runner import run_telemetry_literacy
-from ..viz.charts import generate_all_charts
+from ..adapters.azure_openai import AzureOpenAIAdapter, generation_options
+from ..adapters.hedged import HedgedAdapter, HedgingPolicy
+from ..eval.runner import run_telemetry_literacy, run_root_cause_analysis, start_monitor, TELEMETRY_LITERACY, ROOT_CAUSE_ANALYSIS
+from ..metrics.sequential import EarlyStopping
+from ..eval.reduction import InputReduction
+from ..eval.serializers import get_serializer
+from ..eval.shards import parse_shard, select_shard, shard_run_id
+from ..eval.coordinator import coordinator
+from ..eval.subsets import subset_entry
+from ..eval.uncertainty import run_intervals, compare_runs
+from ..metrics.bootstrap import DEFAULT_RESAMPLES
 from ..state import run_state
+from ..leaderboard import leaderboard
+from .http_cache import REVALIDATE, make_etag, file_etag, etag_matches, not_modified
+from .offload import POOL_PARSE_BYTES, run_in_pool, read_run_file, render_charts, shutdown_pool
+from ..profiling import RunProfiler, NULL_PROFILER
+from ..monitoring import REGISTRY, HTTP_REQUESTS, HTTP_LATENCY, QUEUED_RUNS, CHART_CACHE, CHART_RENDER_SECONDS
+
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_pool()
 
-app = FastAPI(title="FactoryBench API", version="0.1.0")
+
+app = FastAPI(title="FactoryBench API", version="0.1.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -34,13 +64,67 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None  # type: ignore
+
+# Compress large JSON bodies; Brotli when brotli-asgi is installed (gzip for clients without it)
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=1024, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 CHARTS_DIR = Path("charts")
+# Renders write every chart file; one at a time so no request reads a half-written set
+_render_lock = asyncio.Lock()
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep cardinality bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method, route=route)
+        HTTP_REQUESTS.inc(method=request.method, route=route, status=str(status))
+
+
+class EarlyStopRequest(BaseModel):
+    half_width: Optional[float] = None
+    rel_half_width: Optional[float] = None
+    reference_run: Optional[str] = None
+    confidence: float = 0.95
+    method: Literal["bernstein", "bootstrap"] = "bernstein"
+    min_samples: int = 30
+    check_every: int = 10
+
+
+class ReductionRequest(BaseModel):
+    mode: Literal["lttb", "envelope", "chunked"] = "lttb"
+    points: int = 256
+    chunk_size: int = 1000
+    min_length: Optional[int] = None
+
+
+class HedgingRequest(BaseModel):
+    quantile: float = 0.95
+    max_rate: float = 0.05
+    min_delay_s: float = 0.05
+    window: int = 200
+    warmup: int = 20
 
 
 class RunRequest(BaseModel):
-    stage: Literal["telemetry_literacy"] = "telemetry_literacy"
+    stage: Literal["telemetry_literacy", "root_cause_analysis"] = "telemetry_literacy"
     model: str = Field(default="mock", description="mock | azure:<deployment>")
     dataset_source: Literal["local", "hf"] = "local"
     dataset_id: Optional[str] = None  # Must be explicitly provided; no autodetection
@@ -48,69 +132,196 @@ class RunRequest(BaseModel):
     split: str = "train"
     limit: Optional[int] = 25
     fixture_path: str = "datasets/stage1.json"
+    shard: Optional[str] = Field(default=None, description="i/n: evaluate only this deterministic shard of the samples")
+    distributed: bool = Field(default=False, description="Hand samples to 'factorybench worker' processes instead of running here")
+    early_stop: Optional[EarlyStopRequest] = Field(default=None, description="Stop once the score's confidence interval is tight enough")
+    reduction: Optional[ReductionRequest] = Field(default=None, description="Downsample or summarize long series before prompting (Stage 1)")
+    prompt_format: str = Field(default="repr", description="Series format (Stage 1): repr | fixed | csv | start_step | delta, optionally :precision")
+    hedging: Optional[HedgingRequest] = Field(default=None, description="Resend model calls slower than a latency quantile and keep the first answer")
+    stream: bool = Field(default=False, description="Stream completions: record time to first token and stop reading once the answer is complete")
+    samples_per_prompt: int = Field(default=1, ge=1, description="Completions per prompt (API n); each is scored, with votes and variance in the aggregate")
+    temperature: Optional[float] = Field(default=None, ge=0.0, le=2.0, description="Sampling temperature (default: the model's config, else 0)")
+
+
+class LeaseRequest(BaseModel):
+    worker_id: str
+    max_samples: int = Field(default=8, ge=1, le=1000)
+
+
+class LeaseResult(BaseModel):
+    lease_id: str
+    worker_id: str
+    results: List[Dict[str, Any]]
 
 
 @app.get("/healthz")
-def healthz():
+async def healthz():
     return {"ok": True}
 
 
+@app.get("/metrics")
+def metrics():
+    """Metrics in Prometheus text exposition format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/runs")
-def list_runs(
+async def list_runs(
+    request: Request,
+    background_tasks: BackgroundTasks,
     model: Optional[List[str]] = Query(None),
     dataset: Optional[List[str]] = Query(None),
     stage: Optional[str] = None,
+    include_ci: bool = False,
 ):
-    """List runs with optional filtering by model, dataset ID, and stage."""
-    RUN_DIR.mkdir(parents=True, exist_ok=True)
-    items = []
-    for p in sorted(Path(RUN_DIR).glob("*.json")):
+    """
+    List runs with optional filtering by model, dataset ID, and stage.
+
+    ``include_ci`` adds cached bootstrap intervals; ``ci`` is null for runs whose intervals
+    are still being computed.
+    """
+    etag = make_etag("runs", await run_in_threadpool(leaderboard.version), request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag, REVALIDATE)
+    items = (await run_in_threadpool(leaderboard.query, model, dataset, stage, sort="run_id", order="asc"))["items"]
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE}
+    if include_ci:
+        # Only cached intervals are served; the rest are null and computed in the background
+        missing = await run_in_threadpool(_attach_cached_intervals, items)
+        if missing:
+            background_tasks.add_task(_warm_intervals, missing)
+            # Not cacheable: the same ETag would otherwise pin the null intervals
+            del headers["ETag"]
+    return JSONResponse({"items": items, "count": len(items)}, headers=headers)
+
+
+def _attach_cached_intervals(items: List[Dict[str, Any]]) -> List[str]:
+    """Set each item's ``ci`` from the interval cache; returns the run ids not cached yet."""
+    missing = []
+    for item in items:
         try:
-            with p.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            # Apply filters
-            if model and data.get("model") not in model:
-                continue
-            if stage and data.get("stage") != stage:
-                continue
-            if dataset:
-                dataset_id = data.get("dataset", {}).get("dataset_id")
-                if dataset_id not in dataset:
-                    continue
-            
-            items.append(
-                {
-                    "run_id": data.get("run_id"),
-                    "stage": data.get("stage"),
-                    "model": data.get("model"),
-                    "status": data.get("status", "completed"),
-                    "aggregate": data.get("aggregate", {}),
-                    "dataset": data.get("dataset", {}),
-                }
-            )
+            entry = run_intervals(item["run_id"], cached_only=True)
+        except FileNotFoundError:
+            item["ci"] = None
+            continue
+        item["ci"] = entry["intervals"] if entry else None
+        if entry is None and item.get("status") != "running":
+            missing.append(item["run_id"])
+    return missing
+
+
+def _warm_intervals(run_ids: List[str]):
+    for run_id in run_ids:
+        try:
+            run_intervals(run_id)
         except Exception:
             continue
-    return {"items": items, "count": len(items)}
 
 
-@app.get("/runs/{run_id}")
-def get_run(run_id: str):
+@app.get("/leaderboard")
+async def get_leaderboard(
+    request: Request,
+    model: Optional[List[str]] = Query(None),
+    dataset: Optional[List[str]] = Query(None),
+    stage: Optional[str] = None,
+    best: bool = Query(False, description="Only the best run (most samples, then newest) per model and dataset"),
+    sort: str = "run_id",
+    order: Literal["asc", "desc"] = "desc",
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+):
+    """Runs from the leaderboard view, filtered and sorted server-side without reading run files."""
+    etag = make_etag("leaderboard", await run_in_threadpool(leaderboard.version), request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag, REVALIDATE)
+    try:
+        body = await run_in_threadpool(leaderboard.query, model, dataset, stage, best, sort, order, limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(body, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+
+
+@app.delete("/runs/{run_id}")
+def delete_run(run_id: str):
+    """Delete a finished run's file and drop it from the leaderboard view."""
     p = Path(RUN_DIR) / f"{run_id}.json"
     if not p.exists():
         raise HTTPException(status_code=404, detail="Run not found")
-    with p.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    progress = run_state.get_progress(run_id)
+    if progress and progress.status == "running":
+        raise HTTPException(status_code=409, detail="Run is still running; stop it first")
+    p.unlink()
+    (Path(RUN_DIR) / ".cache" / "ci" / f"{run_id}.json").unlink(missing_ok=True)
+    leaderboard.delete(run_id)
+    return {"run_id": run_id, "deleted": True}
+
+
+@app.get("/runs/{run_id}")
+async def get_run(run_id: str, request: Request):
+    p = Path(RUN_DIR) / f"{run_id}.json"
+    etag = file_etag(p)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if etag_matches(request, etag):
+        return not_modified(etag, REVALIDATE)
+    try:
+        if p.stat().st_size > POOL_PARSE_BYTES:
+            raw = await run_in_pool(read_run_file, p)
+        else:
+            raw = await run_in_threadpool(read_run_file, p)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Run not found")
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=503, detail="Run file is being written; retry", headers={"Retry-After": "1"})
+    return Response(raw, media_type="application/json", headers={"ETag": etag, "Cache-Control": REVALIDATE})
+
+
+@app.get("/runs/{run_id}/ci")
+async def get_run_intervals(
+    run_id: str,
+    request: Request,
+    resamples: int = Query(DEFAULT_RESAMPLES, ge=100, le=20000),
+    confidence: float = Query(0.95, gt=0.0, lt=1.0),
+):
+    """Bootstrap confidence intervals of the run's aggregate metrics (cached per run fingerprint)."""
+    etag = file_etag(Path(RUN_DIR) / f"{run_id}.json", "ci", resamples, confidence)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if etag_matches(request, etag):
+        return not_modified(etag, REVALIDATE)
+    try:
+        body = await run_in_threadpool(run_intervals, run_id, resamples=resamples, confidence=confidence)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return JSONResponse(body, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+
+
+@app.get("/runs/{run_id}/compare/{other_run_id}")
+def compare_run(
+    run_id: str,
+    other_run_id: str,
+    resamples: int = Query(DEFAULT_RESAMPLES, ge=100, le=20000),
+    confidence: float = Query(0.95, gt=0.0, lt=1.0),
+):
+    """Paired bootstrap test of this run minus another run on the same dataset."""
+    try:
+        return compare_runs(run_id, other_run_id, resamples=resamples, confidence=confidence)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Run not found: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.post("/runs")
-def create_run(req: RunRequest, background_tasks: BackgroundTasks):
+def create_run(req: RunRequest, background_tasks: BackgroundTasks, profile: bool = False):
     try:
         stage = normalize_stage(req.stage)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
-    if stage != Stage.telemetry_literacy:
-        raise HTTPException(status_code=400, detail="Only telemetry_literacy supported in MVP")
+    if stage not in (Stage.telemetry_literacy, Stage.root_cause_analysis):
+        raise HTTPException(status_code=400, detail="Only telemetry_literacy and root_cause_analysis are supported")
+    if stage == Stage.root_cause_analysis and req.dataset_source != "local":
+        raise HTTPException(status_code=400, detail="root_cause_analysis datasets are local only")
 
     # Require explicit dataset_id and validate against registry
     dataset_id = req.dataset_id
@@ -121,8 +332,54 @@ def create_run(req: RunRequest, background_tasks: BackgroundTasks):
     if dataset_id not in valid_ids:
         raise HTTPException(status_code=400, detail=f"Unknown dataset_id '{dataset_id}' for stage '{req.stage}'")
     
+    # Anchor subsets always run from their registered fixture
+    subset = subset_entry(dataset_id)
+    if subset:
+        req.dataset_source = "local"
+        req.fixture_path = subset["fixture_path"]
+    
     # Generate run_id immediately
-    run_id = datetime.now(timezone.utc).strftime("tl-%Y%m%dT%H%M%S")
+    shard = None
+    if req.shard:
+        try:
+            shard_index, shard_count = parse_shard(req.shard)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        shard = {"index": shard_index, "count": shard_count}
+    
+    task = ROOT_CAUSE_ANALYSIS if stage == Stage.root_cause_analysis else TELEMETRY_LITERACY
+    if req.early_stop:
+        if req.distributed:
+            raise HTTPException(status_code=400, detail="early_stop is not supported for distributed runs")
+        try:
+            start_monitor(task, _early_stopping(req))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        get_serializer(req.prompt_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if req.prompt_format != "repr" and (req.distributed or task is not TELEMETRY_LITERACY):
+        raise HTTPException(status_code=400, detail="prompt_format is only supported for local telemetry_literacy runs")
+    if req.reduction:
+        if req.distributed or task is not TELEMETRY_LITERACY:
+            raise HTTPException(status_code=400, detail="reduction is only supported for local telemetry_literacy runs")
+        try:
+            _reduction(req)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if req.hedging:
+        if req.distributed:
+            raise HTTPException(status_code=400, detail="hedging for distributed runs is set on the workers (factorybench worker --hedge-quantile)")
+        try:
+            _hedging(req)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if req.samples_per_prompt > 1 and req.distributed:
+        raise HTTPException(status_code=400, detail="samples_per_prompt is only supported for local runs")
+    run_id = datetime.now(timezone.utc).strftime(f"{task.run_id_prefix}-%Y%m%dT%H%M%S")
+    if shard:
+        run_id = shard_run_id(run_id, shard["index"], shard["count"])
     
     dataset_meta = {
         "source": req.dataset_source,
@@ -132,11 +389,18 @@ def create_run(req: RunRequest, background_tasks: BackgroundTasks):
         "limit": req.limit,
         "fixture_path": req.fixture_path,
     }
+    if shard:
+        dataset_meta["shard"] = shard
+    if req.hedging:
+        dataset_meta["hedging"] = _hedging(req).describe()
+    profiler = RunProfiler(run_id) if profile else NULL_PROFILER
+    if not profiler.claim(blocking=False):
+        raise HTTPException(status_code=409, detail="Another profiled run or chart render is in progress; retry later or without profile")
     
     # Create initial run file with running status
     initial_run = {
         "run_id": run_id,
-        "stage": "telemetry_literacy",
+        "stage": stage.value,
         "model": req.model if req.model == "mock" else f"azure:{req.model.split(':', 1)[1] if ':' in req.model else req.model}",
         "started_at": datetime.now(timezone.utc).isoformat(),
         "dataset": dataset_meta,
@@ -149,27 +413,44 @@ def create_run(req: RunRequest, background_tasks: BackgroundTasks):
     
     RUN_DIR.mkdir(parents=True, exist_ok=True)
     out_path = Path(RUN_DIR) / f"{run_id}.json"
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump(initial_run, f, indent=2)
+    try:
+        with out_path.open("w", encoding="utf-8") as f:
+            json.dump(initial_run, f, indent=2)
+        leaderboard.upsert(initial_run, out_path)
+    except BaseException:
+        profiler.release()
+        raise
     
     # Execute run in background
-    background_tasks.add_task(_run_in_background, req, run_id, dataset_meta)
+    QUEUED_RUNS.inc()
+    background_tasks.add_task(_run_in_background, req, run_id, dataset_meta, profiler)
     
     # Return immediately with run_id
     return {"run_id": run_id, "status": "running", "message": "Run started in background"}
 
 
-def _run_in_background(req: RunRequest, run_id: str, dataset_meta: Dict[str, Any]):
-    """Execute benchmark run in background."""
+def _run_in_background(req: RunRequest, run_id: str, dataset_meta: Dict[str, Any], profiler=NULL_PROFILER):
+    """Execute benchmark run in background; ``profiler`` was claimed by the request."""
+    adapter = None
     try:
         # Load dataset
-        samples = load_telemetry_literacy(
-            source=req.dataset_source,
-            path=req.fixture_path,
-            hf_slug=req.hf_slug,
-            split=req.split,
-            limit=req.limit,
-        )
+        try:
+            with profiler.phase("dataset_load"):
+                if req.stage == Stage.root_cause_analysis.value:
+                    samples = load_root_cause_analysis(path=req.fixture_path, limit=req.limit)
+                else:
+                    samples = load_telemetry_literacy(
+                        source=req.dataset_source,
+                        path=req.fixture_path,
+                        hf_slug=req.hf_slug,
+                        split=req.split,
+                        limit=req.limit,
+                    )
+        finally:
+            QUEUED_RUNS.dec()
+        shard = dataset_meta.get("shard")
+        if shard:
+            samples = select_shard(samples, shard["index"], shard["count"])
         if not samples:
             raise RuntimeError("No samples loaded")
         
@@ -183,10 +464,31 @@ def _run_in_background(req: RunRequest, run_id: str, dataset_meta: Dict[str, Any
                 json.dump(run, f, indent=2)
         
         # Resolve adapter
-        adapter, model_name = _resolve_adapter(req.model)
+        adapter, model_name = _resolve_adapter(req.model, stream=req.stream, temperature=req.temperature)
+        if req.hedging and not req.distributed:
+            adapter = HedgedAdapter(adapter, _hedging(req), label=model_name.split(":", 1)[0])
+        
+        if req.distributed:
+            # Workers evaluate with their own adapters; the coordinator owns the run file from here
+            task = ROOT_CAUSE_ANALYSIS if req.stage == Stage.root_cause_analysis.value else TELEMETRY_LITERACY
+            coordinator.submit(task, samples, model_name, dataset_meta, run_id)
+            return
         
         # Run evaluation
-        run_telemetry_literacy(samples, adapter, model_name, dataset_meta, run_id=run_id)
+        early_stopping = _early_stopping(req) if req.early_stop else None
+        if req.stage == Stage.root_cause_analysis.value:
+            run_root_cause_analysis(samples, adapter, model_name, dataset_meta, run_id=run_id, profiler=profiler, early_stopping=early_stopping,
+                                    samples_per_prompt=req.samples_per_prompt)
+        else:
+            run_telemetry_literacy(samples, adapter, model_name, dataset_meta, run_id=run_id, profiler=profiler, early_stopping=early_stopping,
+                                   reduction=_reduction(req) if req.reduction else None, prompt_format=req.prompt_format,
+                                   samples_per_prompt=req.samples_per_prompt)
+        # Warm the interval cache so the leaderboard and charts never wait on the bootstrap.
+        # The run is already saved; if this fails the intervals are computed on first request
+        try:
+            run_intervals(run_id)
+        except Exception:
+            pass
     except Exception as e:
         # Save error to run file
         out_path = Path(RUN_DIR) / f"{run_id}.json"
@@ -198,10 +500,27 @@ def _run_in_background(req: RunRequest, run_id: str, dataset_meta: Dict[str, Any
             run["ended_at"] = datetime.now(timezone.utc).isoformat()
             with out_path.open("w", encoding="utf-8") as f:
                 json.dump(run, f, indent=2)
+            leaderboard.upsert(run, out_path)
         run_state.complete_run(run_id, status="failed", error=str(e))
+    finally:
+        if isinstance(adapter, HedgedAdapter):
+            adapter.shutdown()
+        profiler.save()
+
+
+def _early_stopping(req: RunRequest) -> EarlyStopping:
+    return EarlyStopping(**req.early_stop.model_dump())
+
+
+def _reduction(req: RunRequest) -> InputReduction:
+    return InputReduction(**req.reduction.model_dump())
+
 
+def _hedging(req: RunRequest) -> HedgingPolicy:
+    return HedgingPolicy(**req.hedging.model_dump())
 
-def _resolve_adapter(model: str):
+
+def _resolve_adapter(model: str, stream: bool = False, temperature: Optional[float] = None):
     model = (model or "").strip()
     if model == "mock":
         return MockAdapter(), "mock"
@@ -218,55 +537,125 @@ def _resolve_adapter(model: str):
             missing.append("AZURE_OPENAI_API_VERSION")
         if missing:
             raise HTTPException(status_code=400, detail=f"Missing Azure configuration vars: {', '.join(missing)}")
-        return AzureOpenAIAdapter(deployment=deployment), f"azure:{deployment}"
+        model_name = f"azure:{deployment}"
+        options = generation_options(model_name)
+        if temperature is not None:
+            options["temperature"] = temperature
+        adapter = AzureOpenAIAdapter(
+            deployment=deployment,
+            max_retries=AZURE_OPENAI_MAX_RETRIES,
+            timeout=AZURE_OPENAI_TIMEOUT,
+            stream=stream,
+            **options,
+        )
+        return adapter, model_name
     raise HTTPException(status_code=400, detail="Unknown model; try model=mock or azure:<deployment>")
 
 
 @app.get("/charts/{chart_type}")
-def get_chart(
+async def get_chart(
     chart_type: str, 
+    request: Request,
     regenerate: bool = False,
     model: Optional[List[str]] = Query(None),
     dataset: Optional[List[str]] = Query(None),
+    profile: bool = False,
 ):
     """Get a generated chart image with optional filtering."""
-    # Always regenerate when filters are provided to ensure charts reflect current filter state
-    should_regenerate = regenerate or model or dataset or not CHARTS_DIR.exists()
+    # Charts are re-rendered only when the runs or the filters changed since the last render
+    should_regenerate = regenerate or profile or not CHARTS_DIR.exists() or await run_in_threadpool(_charts_stale, model, dataset)
     
+    headers = {"Cache-Control": REVALIDATE}
     if should_regenerate:
-        generate_all_charts(RUN_DIR, CHARTS_DIR, model_filters=model, dataset_filters=dataset)
+        profiler = await _render_charts(model_filters=model, dataset_filters=dataset, profile=profile, force=regenerate or profile)
+        if profiler.enabled:
+            headers["X-Profile-Dir"] = str(profiler.output_dir)
+    else:
+        CHART_CACHE.inc(result="hit")
     
     chart_file = CHARTS_DIR / f"{chart_type}.png"
-    if not chart_file.exists():
+    etag = file_etag(chart_file)
+    if etag is None:
         raise HTTPException(status_code=404, detail=f"Chart {chart_type} not found")
-    
-    return FileResponse(chart_file, media_type="image/png")
+    if etag_matches(request, etag):
+        return not_modified(etag, REVALIDATE)
+    headers["ETag"] = etag
+    return FileResponse(chart_file, media_type="image/png", headers=headers)
 
 
 @app.post("/charts/regenerate")
-def regenerate_charts(
+async def regenerate_charts(
     model: Optional[List[str]] = Query(None),
     dataset: Optional[List[str]] = Query(None),
+    profile: bool = False,
 ):
     """Regenerate all charts from current runs with optional filtering."""
-    generate_all_charts(RUN_DIR, CHARTS_DIR, model_filters=model, dataset_filters=dataset)
-    return {"status": "ok", "charts_dir": str(CHARTS_DIR), "filters": {"model": model, "dataset": dataset}}
+    profiler = await _render_charts(model_filters=model, dataset_filters=dataset, profile=profile, force=True)
+    response = {"status": "ok", "charts_dir": str(CHARTS_DIR), "filters": {"model": model, "dataset": dataset}}
+    if profiler.enabled:
+        response["profile_dir"] = str(profiler.output_dir)
+    return response
+
+
+async def _render_charts(
+    model_filters: Optional[List[str]] = None,
+    dataset_filters: Optional[List[str]] = None,
+    profile: bool = False,
+    force: bool = False,
+):
+    """
+    Render all charts in the process pool, one render at a time.
+
+    Unforced requests that queued behind a render of the same inputs reuse its output.
+    Profiled renders run in a thread of this process so the profiler can see them.
+    """
+    async with _render_lock:
+        if not force and CHARTS_DIR.exists() and not await run_in_threadpool(_charts_stale, model_filters, dataset_filters):
+            CHART_CACHE.inc(result="hit")
+            return NULL_PROFILER
+        CHART_CACHE.inc(result="miss")
+        profiler = RunProfiler(datetime.now(timezone.utc).strftime("charts-%Y%m%dT%H%M%S%f")) if profile else NULL_PROFILER
+        if not profiler.claim(blocking=False):
+            raise HTTPException(status_code=409, detail="Another profiled run or chart render is in progress; retry later or without profile")
+        start = time.perf_counter()
+        # Read the version before rendering so runs written meanwhile trigger another render
+        key = await run_in_threadpool(_chart_render_key, model_filters, dataset_filters)
+        try:
+            if profiler.enabled:
+                def render():
+                    with profiler.phase("chart_rendering"):
+                        render_charts(RUN_DIR, CHARTS_DIR, model_filters, dataset_filters)
+                await run_in_threadpool(render)
+            else:
+                await run_in_pool(render_charts, RUN_DIR, CHARTS_DIR, model_filters, dataset_filters)
+            (CHARTS_DIR / ".render-key").write_text(key, encoding="utf-8")
+        finally:
+            CHART_RENDER_SECONDS.observe(time.perf_counter() - start)
+            profiler.save()
+        return profiler
+
+
+def _chart_render_key(model_filters: Optional[List[str]], dataset_filters: Optional[List[str]]) -> str:
+    """Identifies the inputs of a render: the run catalog version and the filters."""
+    return make_etag(leaderboard.version(), sorted(model_filters or []), sorted(dataset_filters or []))
+
+
+def _charts_stale(model_filters: Optional[List[str]], dataset_filters: Optional[List[str]]) -> bool:
+    return _chart_render_key(model_filters, dataset_filters) != _last_render_key()
+
+
+def _last_render_key() -> Optional[str]:
+    # Kept next to the charts so every API worker sharing CHARTS_DIR sees it
+    try:
+        return (CHARTS_DIR / ".render-key").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
 
 
 @app.get("/metadata/models")
-def get_models():
+async def get_models():
     """Get available models from registry and discovered from runs."""
-    discovered_models = set()
-    RUN_DIR.mkdir(parents=True, exist_ok=True)
-    for p in Path(RUN_DIR).glob("*.json"):
-        try:
-            with p.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                model = data.get("model")
-                if model:
-                    discovered_models.add(model)
-        except Exception:
-            continue
+    discovered_models = await run_in_threadpool(leaderboard.models)
     
     # Combine registry models with discovered ones
     all_models = {m["id"]: m for m in MODELS}
@@ -282,7 +671,7 @@ def get_models():
 
 
 @app.get("/metadata/datasets")
-def get_datasets(stage: Optional[str] = None):
+async def get_datasets(stage: Optional[str] = None):
     """Get available datasets from registry."""
     if stage:
         return {"datasets": DATASETS.get(stage, [])}
@@ -318,12 +707,36 @@ def stop_run(run_id: str):
     raise HTTPException(status_code=404, detail="Run not found or not running")
 
 
+@app.post("/work/lease")
+def lease_work(req: LeaseRequest):
+    """Give a worker the next batch of a distributed run; ``lease`` is null when idle."""
+    return {"lease": coordinator.lease(req.worker_id, req.max_samples)}
+
+
+@app.post("/work/complete")
+def complete_work(req: LeaseResult):
+    """Accept a worker's results; ``stop`` tells it the run has ended."""
+    try:
+        return coordinator.complete(req.lease_id, req.results)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Lease not found or run already finished")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/work/status")
+def work_status():
+    return coordinator.status()
+
+
 @app.get("/metadata/cost-limits")
-def get_cost_limits():
+async def get_cost_limits():
     """Get cost limits and current daily spend."""
+    # Daily spend reads every run file, so it runs in the threadpool, once
+    daily = await run_in_threadpool(run_state.get_daily_cost)
     return {
         "max_cost_per_run": MAX_COST_PER_RUN,
         "max_cost_per_day": MAX_COST_PER_DAY,
-        "daily_cost": round(run_state.get_daily_cost(), 6),
-        "daily_remaining": round(MAX_COST_PER_DAY - run_state.get_daily_cost(), 6),
+        "daily_cost": round(daily, 6),
+        "daily_remaining": round(MAX_COST_PER_DAY - daily, 6),
     }
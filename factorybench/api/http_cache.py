@@ -0,0 +1,44 @@
+"""
+Conditional-request helpers: strong ETags and 304 responses for polled endpoints.
+
+ETags are derived from what the body is built from (the leaderboard version plus the
+query, or a file's mtime and size), so a poll whose ETag still matches is answered without
+reading, serializing or rendering anything.
+"""
+from typing import Optional
+from pathlib import Path
+import hashlib
+
+from fastapi import Request, Response
+
+# Every resource can change under the same URL, finished runs included ('runs rescore',
+# DELETE /runs/{id}), so clients always revalidate; a matching ETag costs only a 304
+REVALIDATE = "no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the given parts."""
+    digest = hashlib.sha1("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def file_etag(path: Path, *parts) -> Optional[str]:
+    """Strong ETag from a file's mtime and size (plus ``parts``); None if the file is missing."""
+    try:
+        st = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return make_etag(st.st_mtime_ns, st.st_size, *parts)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's ``If-None-Match`` names ``etag`` (weak comparison, per RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
@@ -0,0 +1,117 @@
+"""
+Load test for a running API: poll latency while charts are being re-rendered.
+
+Poller threads hit a cheap endpoint (``/healthz`` or a run's progress) in a loop while
+renderer threads keep forcing chart regeneration. The poll latency percentiles show
+whether slow renders hold up the requests dashboards make every second.
+"""
+from typing import Any, Dict, List, Optional
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+import threading
+import time
+
+from ..metrics.timing import percentile
+
+
+def _get(url: str, timeout: float) -> float:
+    """Seconds taken by one GET; HTTP error statuses count as answered."""
+    start = time.perf_counter()
+    try:
+        with urlopen(url, timeout=timeout) as resp:
+            resp.read()
+    except HTTPError as e:
+        e.read()
+    return time.perf_counter() - start
+
+
+def run_load_test(
+    base_url: str,
+    duration_s: float = 20.0,
+    pollers: int = 8,
+    poll_interval_s: float = 0.05,
+    renderers: int = 2,
+    poll_path: str = "/healthz",
+    chart: str = "model_performance",
+    timeout_s: float = 60.0,
+) -> Dict[str, Any]:
+    """
+    Poll ``poll_path`` from ``pollers`` threads while ``renderers`` threads regenerate charts.
+
+    Args:
+        base_url: API base URL, e.g. ``http://127.0.0.1:5173``
+        duration_s: How long to keep polling and rendering
+        pollers: Concurrent poll loops
+        poll_interval_s: Pause between one poller's requests
+        renderers: Concurrent ``GET /charts/{chart}?regenerate=true`` loops; 0 measures the idle baseline
+        poll_path: Endpoint to poll
+        chart: Chart requested by the renderers
+        timeout_s: Per-request timeout; timed-out requests count as errors
+
+    Returns:
+        Poll latency percentiles (ms), request and error counts, and render times
+    """
+    base_url = base_url.rstrip("/")
+    deadline = time.perf_counter() + duration_s
+    lock = threading.Lock()
+    poll_latencies: List[float] = []
+    render_times: List[float] = []
+    errors = {"poll": 0, "render": 0}
+
+    def loop(url: str, sink: List[float], kind: str, pause: float):
+        while time.perf_counter() < deadline:
+            try:
+                elapsed = _get(url, timeout_s)
+            except (URLError, OSError):
+                with lock:
+                    errors[kind] += 1
+            else:
+                with lock:
+                    sink.append(elapsed)
+            if pause:
+                time.sleep(pause)
+
+    threads = [
+        threading.Thread(target=loop, args=(f"{base_url}{poll_path}", poll_latencies, "poll", poll_interval_s), daemon=True)
+        for _ in range(pollers)
+    ] + [
+        threading.Thread(target=loop, args=(f"{base_url}/charts/{chart}?regenerate=true", render_times, "render", 0.0), daemon=True)
+        for _ in range(renderers)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    ms = [x * 1000.0 for x in poll_latencies]
+    result: Dict[str, Any] = {
+        "duration_s": duration_s,
+        "pollers": pollers,
+        "renderers": renderers,
+        "poll_path": poll_path,
+        "polls": len(ms),
+        "poll_errors": errors["poll"],
+        "renders": len(render_times),
+        "render_errors": errors["render"],
+    }
+    if ms:
+        result.update({
+            "poll_p50_ms": round(percentile(ms, 50), 2),
+            "poll_p95_ms": round(percentile(ms, 95), 2),
+            "poll_p99_ms": round(percentile(ms, 99), 2),
+            "poll_max_ms": round(max(ms), 2),
+        })
+    if render_times:
+        result["render_mean_s"] = round(sum(render_times) / len(render_times), 3)
+    return result
+
+
+def format_result(result: Dict[str, Any], label: Optional[str] = None) -> str:
+    head = f"{label}: " if label else ""
+    if not result["polls"]:
+        return f"{head}no successful polls ({result['poll_errors']} errors)"
+    return (
+        f"{head}{result['polls']} polls  p50={result['poll_p50_ms']} ms  p95={result['poll_p95_ms']} ms  "
+        f"p99={result['poll_p99_ms']} ms  max={result['poll_max_ms']} ms  errors={result['poll_errors']}  "
+        f"renders={result['renders']}"
+    )
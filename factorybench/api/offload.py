@@ -0,0 +1,65 @@
+"""
+Bounded process pool for the API's CPU-bound work.
+
+Chart rendering and parsing large run files hold the GIL for seconds. Running them in a
+small pool of spawned processes keeps the event loop and the request threadpool free for
+health checks and progress polls. The pool is created on first use and sized by
+``FACTORYBENCH_API_PROCESSES``.
+"""
+from typing import Any, Callable, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import asyncio
+import json
+import multiprocessing
+
+from ..config import API_PROCESS_WORKERS
+
+# Run files larger than this are parsed in the pool; smaller ones in a thread
+POOL_PARSE_BYTES = 1_000_000
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that already runs threads and an event loop is unsafe
+        _pool = ProcessPoolExecutor(max_workers=API_PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def run_in_pool(fn: Callable, *args) -> Any:
+    """Await ``fn(*args)`` in the process pool; ``fn`` and its arguments must be picklable."""
+    return await asyncio.get_running_loop().run_in_executor(get_pool(), fn, *args)
+
+
+def read_run_file(path: Path) -> bytes:
+    """
+    Raw bytes of a run file.
+
+    The file is parsed only to reject a partially written checkpoint; the bytes are served as
+    they are, so the API never re-serializes a run.
+
+    Raises:
+        json.JSONDecodeError: The file is not complete JSON
+    """
+    raw = Path(path).read_bytes()
+    json.loads(raw)
+    return raw
+
+
+def render_charts(runs_dir: Path, output_dir: Path, model_filters: Optional[List[str]], dataset_filters: Optional[List[str]]):
+    # Imported here so pool processes that only parse runs never load matplotlib
+    from ..viz.charts import generate_all_charts
+    from ..eval.uncertainty import run_intervals
+
+    generate_all_charts(runs_dir, output_dir, model_filters=model_filters, dataset_filters=dataset_filters,
+                        interval_lookup=lambda run_id: run_intervals(run_id, runs_dir)["intervals"])
@@ -0,0 +1,186 @@
+"""
+Local stand-in for the Azure OpenAI chat-completions endpoint.
+
+Point ``AZURE_OPENAI_ENDPOINT`` at this server to exercise ``AzureOpenAIAdapter``,
+``_resolve_adapter`` and cost tracking offline. Answers are computed from the series in
+the prompt; latency, throttling and token usage are configurable. ``"stream": true``
+requests get server-sent chunks, ``token_ms`` apart; ``ramble_tokens`` appends an
+explanation after the answer, as talkative models do.
+
+    python -m factorybench.cli standin-server --port 8011 --latency-ms 400 --rpm 600
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Any, Deque, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from ..adapters.simulated import SimulatedAdapter, estimate_tokens, extract_series, simulated_answer
+
+
+@dataclass
+class StandinConfig:
+    """Behaviour of the stand-in server."""
+    latency_ms: float = 300.0
+    latency_dist: str = "lognormal"
+    latency_sigma: float = 0.5
+    jitter_ms: float = 0.0
+    throttle_rate: float = 0.0  # share of requests answered with 429
+    error_rate: float = 0.0  # share of requests answered with 500
+    rpm: Optional[int] = None  # requests per minute before 429s, like a deployment quota
+    retry_after_s: float = 1.0
+    accuracy: float = 1.0
+    completion_tokens: int = 16
+    prompt_tokens: Optional[int] = None  # default: estimated from prompt length
+    ramble_tokens: int = 0  # explanation tokens after the answer
+    token_ms: float = 0.0  # delay between streamed tokens
+    seed: Optional[int] = None
+
+
+def _completion_tokens(answer: str, config: StandinConfig, limit: Optional[int]) -> List[str]:
+    """The completion as tokens: the answer in ``completion_tokens`` pieces, then the ramble."""
+    count = max(1, min(config.completion_tokens, len(answer)))
+    bounds = [round(i * len(answer) / count) for i in range(count + 1)]
+    tokens = [answer[a:b] for a, b in zip(bounds, bounds[1:])]
+    if config.ramble_tokens:
+        tokens += ["\n\nExplanation:"] + [f" step{i}" for i in range(config.ramble_tokens - 1)]
+    return tokens[:limit] if limit else tokens
+
+
+def create_standin_app(config: Optional[StandinConfig] = None) -> FastAPI:
+    """Build the stand-in FastAPI app."""
+    config = config or StandinConfig()
+    rng = random.Random(config.seed)
+    # Used only to draw latencies; sleeping happens asynchronously here
+    latency_model = SimulatedAdapter(
+        latency_ms=config.latency_ms,
+        latency_dist=config.latency_dist,
+        latency_sigma=config.latency_sigma,
+        jitter_ms=config.jitter_ms,
+        seed=config.seed,
+        sleep=False,
+    )
+    window: Deque[float] = deque()
+    stats: Dict[str, int] = {"requests": 0, "completed": 0, "throttled": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0, "tokens_streamed": 0}
+
+    app = FastAPI(title="FactoryBench OpenAI stand-in", version="0.1.0")
+
+    def _throttle_response() -> JSONResponse:
+        stats["throttled"] += 1
+        return JSONResponse(
+            status_code=429,
+            content={"error": {"code": "429", "message": "Requests to the ChatCompletions_Create Operation have exceeded the rate limit (stand-in)."}},
+            headers={
+                "retry-after": str(max(1, round(config.retry_after_s))),
+                "retry-after-ms": str(int(config.retry_after_s * 1000)),
+            },
+        )
+
+    def _over_quota(now: float) -> bool:
+        if not config.rpm:
+            return False
+        while window and now - window[0] >= 60.0:
+            window.popleft()
+        if len(window) >= config.rpm:
+            return True
+        window.append(now)
+        return False
+
+    async def _chat_completions(request: Request, model: str) -> JSONResponse:
+        stats["requests"] += 1
+        body: Dict[str, Any] = await request.json()
+        if _over_quota(time.monotonic()):
+            return _throttle_response()
+
+        roll = rng.random()
+        if roll < config.throttle_rate:
+            return _throttle_response()
+
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(latency_model.sample_latency())
+        finally:
+            stats["in_flight"] -= 1
+
+        if roll < config.throttle_rate + config.error_rate:
+            stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": {"code": "500", "message": "Internal server error (stand-in)."}})
+
+        prompt = "\n".join(
+            m.get("content") or "" for m in body.get("messages", []) if isinstance(m.get("content"), str)
+        )
+        answer = simulated_answer(extract_series(prompt), rng.random() < config.accuracy, rng)
+        limit = body.get("max_completion_tokens") or body.get("max_tokens")
+        tokens = _completion_tokens(answer, config, limit)
+        finish_reason = "length" if limit and len(tokens) == limit else "stop"
+        prompt_tokens = config.prompt_tokens if config.prompt_tokens is not None else estimate_tokens(prompt)
+        stats["completed"] += 1
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            return StreamingResponse(_stream(body.get("model") or model, tokens, prompt_tokens, finish_reason, include_usage),
+                                     media_type="text/event-stream")
+        if config.token_ms > 0 and len(tokens) > 1:
+            # Generation time: the whole completion is produced before a non-streamed response
+            await asyncio.sleep(config.token_ms * (len(tokens) - 1) / 1000.0)
+        return JSONResponse(content={
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": finish_reason,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(tokens),
+                "total_tokens": prompt_tokens + len(tokens),
+            },
+        })
+
+    async def _stream(model: str, tokens: List[str], prompt_tokens: int, finish_reason: str, include_usage: bool):
+        chunk_id, created = f"chatcmpl-{uuid.uuid4().hex}", int(time.time())
+
+        def event(choices, **extra) -> str:
+            return "data: " + json.dumps({"id": chunk_id, "object": "chat.completion.chunk", "created": created,
+                                          "model": model, "choices": choices, **extra}) + "\n\n"
+
+        yield event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        # A client that stops reading disconnects; the remaining tokens are never sent
+        for i, token in enumerate(tokens):
+            if i and config.token_ms > 0:
+                await asyncio.sleep(config.token_ms / 1000.0)
+            stats["tokens_streamed"] += 1
+            yield event([{"index": 0, "delta": {"content": token}, "finish_reason": None}])
+        yield event([{"index": 0, "delta": {}, "finish_reason": finish_reason}])
+        if include_usage:
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens), "total_tokens": prompt_tokens + len(tokens)}
+            yield event([], usage=usage)
+        yield "data: [DONE]\n\n"
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def azure_chat_completions(deployment: str, request: Request):
+        return await _chat_completions(request, deployment)
+
+    @app.post("/v1/chat/completions")
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        return await _chat_completions(request, "standin")
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"ok": True}
+
+    @app.get("/stats")
+    async def get_stats():
+        return {"config": asdict(config), **stats}
+
+    return app
@@ -3,9 +3,15 @@ import click
 
 from .data.loader_tl import load_telemetry_literacy
 from .adapters.mock import MockAdapter
-from .adapters.azure_openai import AzureOpenAIAdapter
-from .eval.runner import run_telemetry_literacy
-from .config import AZURE_OPENAI_API_KEY
+from .adapters.azure_openai import AzureOpenAIAdapter, generation_options
+from .adapters.hedged import HedgedAdapter, HedgingPolicy
+from .eval.runner import run_telemetry_literacy, run_root_cause_analysis
+from .eval.shards import parse_shard, select_shard, shard_run_id
+from .eval.subsets import subset_entry
+from .metrics.sequential import EarlyStopping
+from .eval.reduction import InputReduction
+from .eval.serializers import get_serializer
+from .config import AZURE_OPENAI_API_KEY, AZURE_OPENAI_MAX_RETRIES, AZURE_OPENAI_TIMEOUT
 
 
 @click.group()
@@ -21,45 +27,411 @@ def cli():
 @click.option("--fixture-path", default="datasets/stage1.json")
 @click.option("--dataset-id", required=True, help="Dataset id from registry (e.g. local_basic, local_step_functions, local_patterns, hf_factoryset)")
 @click.option("--limit", default=10, type=int)
-def run_stage1(model, dataset_source, hf_slug, hf_split, fixture_path, dataset_id, limit):
+@click.option("--profile", is_flag=True, help="Capture cProfile + tracemalloc per phase into RUN_DIR/profiles/<run_id>")
+@click.option("--shard", default=None, help="Evaluate only shard i/n (0-based) of the loaded samples; merge with 'runs merge'")
+@click.option("--early-stop-half-width", default=None, type=float, help="Stop once every tracked metric's confidence interval is this narrow")
+@click.option("--early-stop-rel", default=None, type=float, help="... or this narrow relative to the metric (e.g. 0.05)")
+@click.option("--early-stop-reference", default=None, help="Stop once the ranking against this run id is decided")
+@click.option("--early-stop-method", default="bernstein", type=click.Choice(["bernstein", "bootstrap"]))
+@click.option("--early-stop-confidence", default=0.95, type=float)
+@click.option("--early-stop-min-samples", default=30, type=int)
+@click.option("--early-stop-check-every", default=10, type=int, help="Samples between checks (or 10% of those seen, if more)")
+@click.option("--reduction", default=None, type=click.Choice(["lttb", "envelope", "chunked"]), help="Shrink long series before prompting")
+@click.option("--reduction-points", default=256, type=int, help="lttb: points kept; envelope: windows")
+@click.option("--reduction-chunk-size", default=1000, type=int, help="chunked: points per prompt")
+@click.option("--prompt-format", default="repr", help="Series format: repr | fixed | csv | start_step | delta, optionally :precision")
+@click.option("--hedge-quantile", default=None, type=float, help="Resend calls slower than this quantile of recent latencies (e.g. 0.95)")
+@click.option("--hedge-max-rate", default=0.05, type=float, help="Most hedged calls per call")
+@click.option("--stream", is_flag=True, help="Stream completions: record time to first token and stop reading once the answer is complete")
+@click.option("--samples-per-prompt", default=1, type=int, help="Completions per prompt (API n); each is scored, with votes and variance in the aggregate")
+@click.option("--temperature", default=None, type=float, help="Sampling temperature (default: the model's config, else 0)")
+@click.option("--max-retries", default=None, type=int, help="Azure client retries per call (default: AZURE_OPENAI_MAX_RETRIES, else the SDK's)")
+@click.option("--timeout", default=None, type=float, help="Azure client timeout per call in seconds (default: AZURE_OPENAI_TIMEOUT, else the SDK's)")
+def run_stage1(model, dataset_source, hf_slug, hf_split, fixture_path, dataset_id, limit, profile, shard,
+               reduction, reduction_points, reduction_chunk_size, prompt_format, hedge_quantile, hedge_max_rate, stream,
+               samples_per_prompt, temperature, max_retries, timeout, **early_stop):
     """Evaluate telemetry_literacy (Stage 1) and write a run JSON."""
     # Validate dataset id against registry
+    from datetime import datetime, timezone
     from .config import DATASETS
+    from .profiling import RunProfiler, NULL_PROFILER
     valid_ids = {d["id"] for d in DATASETS.get("telemetry_literacy", [])}
     if dataset_id not in valid_ids:
         raise click.UsageError(f"Invalid dataset_id '{dataset_id}'. Valid ids: {', '.join(sorted(valid_ids))}")
+    subset = subset_entry(dataset_id)
+    if subset:
+        dataset_source, fixture_path = "local", subset["fixture_path"]
     
-    samples = load_telemetry_literacy(
-        source=dataset_source,
-        path=fixture_path,
-        hf_slug=hf_slug,
-        split=hf_split,
-        limit=limit,
-    )
+    run_id = datetime.now(timezone.utc).strftime("tl-%Y%m%dT%H%M%S")
+    shard_meta, run_id = _shard_options(shard, run_id)
+    early_stopping = _early_stop_options(**early_stop)
+    try:
+        input_reduction = InputReduction(reduction, points=reduction_points, chunk_size=reduction_chunk_size) if reduction else None
+        get_serializer(prompt_format)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    hedging = _hedging_options(hedge_quantile, hedge_max_rate)
+    if samples_per_prompt < 1:
+        raise click.UsageError("--samples-per-prompt must be >= 1")
+    profiler = RunProfiler(run_id) if profile else NULL_PROFILER
+    adapter = None
+    try:
+        with profiler.phase("dataset_load"):
+            samples = load_telemetry_literacy(
+                source=dataset_source,
+                path=fixture_path,
+                hf_slug=hf_slug,
+                split=hf_split,
+                limit=limit,
+            )
+        if shard_meta:
+            samples = select_shard(samples, shard_meta["index"], shard_meta["count"])
+        adapter, model_name = _resolve_adapter(model, hedging, stream=stream, temperature=temperature,
+                                               max_retries=max_retries, timeout=timeout)
+
+        run = run_telemetry_literacy(
+            samples=samples,
+            adapter=adapter,
+            model_name=model_name,
+            dataset_meta={
+                "source": dataset_source,
+                "dataset_id": dataset_id,
+                "hf_slug": hf_slug,
+                "split": hf_split,
+                "limit": limit,
+                "fixture_path": fixture_path,
+                **({"shard": shard_meta} if shard_meta else {}),
+                **({"hedging": hedging.describe()} if hedging else {}),
+            },
+            run_id=run_id,
+            profiler=profiler,
+            early_stopping=early_stopping,
+            reduction=input_reduction,
+            prompt_format=prompt_format,
+            samples_per_prompt=samples_per_prompt,
+        )
+        click.echo(json.dumps({"run_id": run["run_id"], "aggregate": run["aggregate"]}, indent=2))
+    finally:
+        _shutdown_adapter(adapter)
+        _save_profile(profiler)
+
+
+@cli.command("run-stage2")
+@click.option("--model", default="mock", help="mock | azure:<deployment>")
+@click.option("--fixture-path", default=None, help="generate-data output (.json, .jsonl or .fbds); default: the dataset id's fixture")
+@click.option("--dataset-id", default=None, help="Dataset id from registry (e.g. local_rca_basic); default: derived from --fixture-path")
+@click.option("--limit", default=10, type=int)
+@click.option("--profile", is_flag=True, help="Capture cProfile + tracemalloc per phase into RUN_DIR/profiles/<run_id>")
+@click.option("--shard", default=None, help="Evaluate only shard i/n (0-based) of the loaded samples; merge with 'runs merge'")
+@click.option("--early-stop-half-width", default=None, type=float, help="Stop once every tracked metric's confidence interval is this narrow")
+@click.option("--early-stop-rel", default=None, type=float, help="... or this narrow relative to the metric (e.g. 0.05)")
+@click.option("--early-stop-reference", default=None, help="Stop once the ranking against this run id is decided")
+@click.option("--early-stop-method", default="bernstein", type=click.Choice(["bernstein", "bootstrap"]))
+@click.option("--early-stop-confidence", default=0.95, type=float)
+@click.option("--early-stop-min-samples", default=30, type=int)
+@click.option("--early-stop-check-every", default=10, type=int, help="Samples between checks (or 10% of those seen, if more)")
+@click.option("--hedge-quantile", default=None, type=float, help="Resend calls slower than this quantile of recent latencies (e.g. 0.95)")
+@click.option("--hedge-max-rate", default=0.05, type=float, help="Most hedged calls per call")
+@click.option("--stream", is_flag=True, help="Stream completions: record time to first token and stop reading once the answer is complete")
+@click.option("--samples-per-prompt", default=1, type=int, help="Completions per prompt (API n); each is scored, with votes and variance in the aggregate")
+@click.option("--temperature", default=None, type=float, help="Sampling temperature (default: the model's config, else 0)")
+@click.option("--max-retries", default=None, type=int, help="Azure client retries per call (default: AZURE_OPENAI_MAX_RETRIES, else the SDK's)")
+@click.option("--timeout", default=None, type=float, help="Azure client timeout per call in seconds (default: AZURE_OPENAI_TIMEOUT, else the SDK's)")
+def run_stage2(model, fixture_path, dataset_id, limit, profile, shard, hedge_quantile, hedge_max_rate, stream,
+               samples_per_prompt, temperature, max_retries, timeout, **early_stop):
+    """Evaluate root_cause_analysis (Stage 2) and write a run JSON."""
+    from datetime import datetime, timezone
+    from .data.loader_rca import load_root_cause_analysis
+    from .profiling import RunProfiler, NULL_PROFILER
+    
+    dataset_id, fixture_path = _rca_dataset(dataset_id, fixture_path)
+    run_id = datetime.now(timezone.utc).strftime("rca-%Y%m%dT%H%M%S")
+    shard_meta, run_id = _shard_options(shard, run_id)
+    early_stopping = _early_stop_options(**early_stop)
+    hedging = _hedging_options(hedge_quantile, hedge_max_rate)
+    if samples_per_prompt < 1:
+        raise click.UsageError("--samples-per-prompt must be >= 1")
+    profiler = RunProfiler(run_id) if profile else NULL_PROFILER
+    adapter = None
+    try:
+        with profiler.phase("dataset_load"):
+            samples = load_root_cause_analysis(path=fixture_path, limit=limit)
+        if shard_meta:
+            samples = select_shard(samples, shard_meta["index"], shard_meta["count"])
+        adapter, model_name = _resolve_adapter(model, hedging, stream=stream, temperature=temperature,
+                                               max_retries=max_retries, timeout=timeout)
+    
+        run = run_root_cause_analysis(
+            samples=samples,
+            adapter=adapter,
+            model_name=model_name,
+            dataset_meta={
+                "source": "local",
+                "dataset_id": dataset_id,
+                "limit": limit,
+                "fixture_path": fixture_path,
+                **({"shard": shard_meta} if shard_meta else {}),
+                **({"hedging": hedging.describe()} if hedging else {}),
+            },
+            run_id=run_id,
+            profiler=profiler,
+            early_stopping=early_stopping,
+            samples_per_prompt=samples_per_prompt,
+        )
+        click.echo(json.dumps({"run_id": run["run_id"], "aggregate": run["aggregate"]}, indent=2))
+    finally:
+        _shutdown_adapter(adapter)
+        _save_profile(profiler)
+
+
+def _rca_dataset(dataset_id, fixture_path):
+    """
+    Resolve the Stage 2 dataset id and fixture from ``--dataset-id`` and ``--fixture-path``.
+
+    A registry id runs its registered fixture. A fixture outside the registry is recorded as
+    ``file:<name>``, so it never shares a leaderboard group with a registered dataset.
+    """
+    from pathlib import Path
+    from .config import DATASETS
+    entries = {d["id"]: d for d in DATASETS.get("root_cause_analysis", [])}
+    if dataset_id is not None:
+        if dataset_id not in entries:
+            raise click.UsageError(f"Invalid dataset_id '{dataset_id}'. Valid ids: {', '.join(sorted(entries))}")
+        registered = entries[dataset_id]["fixture_path"]
+        if fixture_path is not None and Path(fixture_path).resolve() != Path(registered).resolve():
+            raise click.UsageError(f"--fixture-path is not the fixture of '{dataset_id}' ({registered}); "
+                                   "omit --dataset-id to record the run under the fixture's own id")
+        return dataset_id, registered
+    if fixture_path is None:
+        raise click.UsageError("Provide --dataset-id or --fixture-path")
+    for entry in entries.values():
+        if Path(fixture_path).resolve() == Path(entry["fixture_path"]).resolve():
+            return entry["id"], fixture_path
+    return f"file:{Path(fixture_path).name}", fixture_path
+
+
+def _save_profile(profiler):
+    """Save a profiled command's phases and print their summary."""
+    if not profiler.enabled:
+        return
+    summary = profiler.save()
+    for name, phase in summary["phases"].items():
+        click.echo(f"{name:>16}: {phase['wall_s']:.3f}s  peak {phase['peak_traced_mb']} MB", err=True)
+    click.echo(f"Profile saved to {profiler.output_dir}", err=True)
+
+
+def _shard_options(shard, run_id):
+    """Parse ``--shard i/n`` into dataset metadata and a shard-suffixed run id."""
+    if not shard:
+        return None, run_id
+    try:
+        index, count = parse_shard(shard)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    return {"index": index, "count": count}, shard_run_id(run_id, index, count)
+
+
+def _early_stop_options(early_stop_half_width, early_stop_rel, early_stop_reference, early_stop_method,
+                        early_stop_confidence, early_stop_min_samples, early_stop_check_every):
+    """Build the early-stopping rule from the ``--early-stop-*`` options; None if not requested."""
+    if early_stop_half_width is None and early_stop_rel is None and early_stop_reference is None:
+        return None
+    try:
+        return EarlyStopping(
+            half_width=early_stop_half_width,
+            rel_half_width=early_stop_rel,
+            reference_run=early_stop_reference,
+            confidence=early_stop_confidence,
+            method=early_stop_method,
+            min_samples=early_stop_min_samples,
+            check_every=early_stop_check_every,
+        )
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+
+def _shutdown_adapter(adapter):
+    """Stop a hedged adapter's thread pool; other adapters hold nothing to release."""
+    if isinstance(adapter, HedgedAdapter):
+        adapter.shutdown()
+
+
+def _hedging_options(hedge_quantile, hedge_max_rate):
+    """Build the hedging policy from the ``--hedge-*`` options; None if not requested."""
+    if hedge_quantile is None:
+        return None
+    try:
+        return HedgingPolicy(quantile=hedge_quantile, max_rate=hedge_max_rate)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+
+def _resolve_adapter(model: str, hedging=None, stream: bool = False, temperature=None, max_retries=None, timeout=None):
     if model == "mock":
         adapter, model_name = MockAdapter(), "mock"
     elif model.startswith("azure:"):
         deployment = model.split(":", 1)[1]
         if not AZURE_OPENAI_API_KEY:
             raise click.UsageError("AZURE_OPENAI_API_KEY not configured; use model=mock or set key")
-        adapter, model_name = AzureOpenAIAdapter(deployment=deployment), f"azure:{deployment}"
+        model_name = f"azure:{deployment}"
+        options = generation_options(model_name)
+        if temperature is not None:
+            options["temperature"] = temperature
+        adapter = AzureOpenAIAdapter(
+            deployment=deployment,
+            max_retries=max_retries if max_retries is not None else AZURE_OPENAI_MAX_RETRIES,
+            timeout=timeout if timeout is not None else AZURE_OPENAI_TIMEOUT,
+            stream=stream,
+            **options,
+        )
     else:
         raise click.UsageError("Unknown model; use model=mock or azure:<deployment>")
+    if hedging:
+        adapter = HedgedAdapter(adapter, hedging, label=model_name.split(":", 1)[0])
+    return adapter, model_name
 
-    run = run_telemetry_literacy(
-        samples=samples,
-        adapter=adapter,
-        model_name=model_name,
-        dataset_meta={
-            "source": dataset_source,
-            "dataset_id": dataset_id,
-            "hf_slug": hf_slug,
-            "split": hf_split,
-            "limit": limit,
-            "fixture_path": fixture_path,
-        },
-    )
-    click.echo(json.dumps({"run_id": run["run_id"], "aggregate": run["aggregate"]}, indent=2))
+
+@cli.command("worker")
+@click.option("--coordinator", "coordinator_url", required=True, help="Base URL of the API server coordinating distributed runs")
+@click.option("--worker-id", default=None, help="Name reported to the coordinator (default: host-pid)")
+@click.option("--batch-size", default=8, type=int, help="Samples per lease")
+@click.option("--poll-interval", default=1.0, type=float, help="Seconds between lease attempts when idle")
+@click.option("--max-idle", default=None, type=float, help="Exit after this many idle seconds (default: run forever)")
+@click.option("--hedge-quantile", default=None, type=float, help="Resend calls slower than this quantile of recent latencies (e.g. 0.95)")
+@click.option("--hedge-max-rate", default=0.05, type=float, help="Most hedged calls per call")
+@click.option("--stream", is_flag=True, help="Stream completions: record time to first token and stop reading once the answer is complete")
+@click.option("--max-retries", default=None, type=int, help="Azure client retries per call (default: AZURE_OPENAI_MAX_RETRIES, else the SDK's)")
+@click.option("--timeout", default=None, type=float, help="Azure client timeout per call in seconds (default: AZURE_OPENAI_TIMEOUT, else the SDK's)")
+def worker(coordinator_url, worker_id, batch_size, poll_interval, max_idle, hedge_quantile, hedge_max_rate, stream,
+           max_retries, timeout):
+    """Pull sample batches from a coordinator (POST /runs with distributed=true) and evaluate them."""
+    from .eval.worker import run_worker
+    
+    hedging = _hedging_options(hedge_quantile, hedge_max_rate)
+    adapters = []
+
+    def adapter_factory(model):
+        adapter = _resolve_adapter(model, hedging, stream=stream, max_retries=max_retries, timeout=timeout)[0]
+        adapters.append(adapter)
+        return adapter
+
+    try:
+        stats = run_worker(
+            coordinator_url,
+            adapter_factory,
+            worker_id=worker_id,
+            batch_size=batch_size,
+            poll_interval_s=poll_interval,
+            max_idle_s=max_idle,
+        )
+    finally:
+        for adapter in adapters:
+            _shutdown_adapter(adapter)
+    click.echo(json.dumps(stats))
+
+
+@cli.group("runs")
+def runs_group():
+    """Manage run files."""
+
+
+@runs_group.command("merge")
+@click.argument("run_files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--run-id", default=None, help="Id of the merged run (default: shard id without -s<i>of<n>)")
+@click.option("--allow-partial", is_flag=True, help="Merge even if some shards are missing")
+@click.option("--keep-shards", is_flag=True, help="Leave shard files in RUN_DIR instead of moving them to RUN_DIR/shards/<run_id>/")
+def runs_merge(run_files, run_id, allow_partial, keep_shards):
+    """Merge shard run files into one run in RUN_DIR."""
+    from pathlib import Path
+    from .config import RUN_DIR
+    from .eval.shards import merge_runs
+    from .leaderboard import leaderboard
+    
+    runs = []
+    for path in run_files:
+        with open(path, "r", encoding="utf-8") as f:
+            runs.append(json.load(f))
+    try:
+        merged = merge_runs(runs, run_id=run_id, allow_partial=allow_partial)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    
+    out_path = RUN_DIR / f"{merged['run_id']}.json"
+    if out_path.exists() and str(out_path.resolve()) not in {str(Path(p).resolve()) for p in run_files}:
+        raise click.UsageError(f"{out_path} already exists; pass --run-id")
+    with out_path.open("w", encoding="utf-8") as f:
+        json.dump(merged, f, indent=2)
+    leaderboard.upsert(merged, out_path)
+    
+    # Shard files are moved out of RUN_DIR's top level so listings show the merged run only
+    if not keep_shards:
+        shard_dir = RUN_DIR / "shards" / merged["run_id"]
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        for path in run_files:
+            p = Path(path)
+            if p.resolve() != out_path.resolve():
+                p.replace(shard_dir / p.name)
+                leaderboard.delete(p.stem)
+    
+    click.echo(json.dumps({"run_id": merged["run_id"], "merged_from": merged["dataset"]["merged_from"], "aggregate": merged["aggregate"]}, indent=2))
+
+
+@runs_group.command("reindex")
+def runs_reindex():
+    """Rebuild the leaderboard view from the run files in RUN_DIR."""
+    from .leaderboard import leaderboard
+    
+    click.echo(f"Indexed {leaderboard.rebuild()} runs")
+
+
+@runs_group.command("rescore")
+@click.argument("run_ids", nargs=-1)
+@click.option("--workers", default=None, type=int, help="Processes (default: one per CPU)")
+@click.option("--force", is_flag=True, help="Also re-score runs already at the current scoring version")
+def runs_rescore(run_ids, workers, force):
+    """Score stored predictions again with the current metrics; no model calls (default: every run in RUN_DIR)."""
+    from .eval.rescore import rescore_runs
+
+    if workers is not None and workers < 1:
+        raise click.UsageError("--workers must be >= 1")
+    summary = rescore_runs(run_ids or None, workers=workers, force=force)
+    click.echo(json.dumps(summary, indent=2))
+    if summary["failed"]:
+        raise SystemExit(1)
+
+
+@cli.group("subsets")
+def subsets_group():
+    """Select and register informative anchor subsets."""
+
+
+@subsets_group.command("select")
+@click.option("--dataset-id", default="hf_factoryset", help="Source dataset whose completed Stage 1 runs are the history")
+@click.option("--size", default=100, type=int, help="Number of anchor samples")
+@click.option("--name", default=None, help="Subset name; registered as local_subset_<name> (default: <dataset-id>_<size>)")
+@click.option("--seed", default=0, type=int)
+@click.option("--dry-run", is_flag=True, help="Report the held-out error without registering the subset")
+def subsets_select(dataset_id, size, name, seed, dry_run):
+    """Pick anchors from historical runs and register them as a dataset."""
+    from .eval.subsets import load_history, build_subset, register_subset
+
+    if size < 1:
+        raise click.UsageError("--size must be positive")
+    runs = load_history(dataset_id)
+    try:
+        manifest, samples = build_subset(runs, dataset_id, size, name or f"{dataset_id}_{size}", seed=seed)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    if not dry_run:
+        manifest_path = register_subset(manifest, samples)
+        click.echo(f"Registered {manifest['id']} ({manifest_path})", err=True)
+    click.echo(json.dumps({
+        "id": manifest["id"],
+        "anchors": len(manifest["anchors"]),
+        "population": manifest["population"],
+        "historical_runs": len(manifest["historical_runs"]),
+        "holdout": manifest["holdout"],
+    }, indent=2))
 
 
 @cli.command("components:test")
@@ -80,53 +452,271 @@ def components_test(time_series_encoder, limit):
     click.echo(json.dumps({"run_id": run["run_id"], "aggregate": run["aggregate"]}, indent=2))
 
 
+@cli.command("bench")
+@click.option("--sizes", default="10,100,1000", help="Comma-separated sample counts (e.g. 10,1000,50000)")
+@click.option("--latency-ms", default=0.0, type=float, help="Simulated model latency (ms)")
+@click.option("--latency-dist", default="lognormal", type=click.Choice(["constant", "normal", "lognormal", "exponential"]))
+@click.option("--jitter-ms", default=0.0, type=float, help="Uniform +/- jitter added to each latency (ms)")
+@click.option("--completion-tokens", default=16, type=int)
+@click.option("--error-rate", default=0.0, type=float, help="Share of calls that fail")
+@click.option("--throttle-rate", default=0.0, type=float, help="Share of calls that return 429")
+@click.option("--accuracy", default=1.0, type=float, help="Share of exactly correct answers")
+@click.option("--model-name", default="simulated", help="Model name recorded in the run (selects pricing)")
+@click.option("--series-length", default=64, type=int)
+@click.option("--seed", default=0, type=int)
+@click.option("--output", default="bench_results.json", help="Where to write results JSON")
+@click.option("--baseline", default=None, help="Baseline results JSON to compare against")
+@click.option("--tolerance", default=0.2, type=float, help="Allowed relative regression vs baseline")
+@click.option("--save-baseline", is_flag=True, help="Overwrite --baseline with these results")
+@click.option("--hedge-quantile", default=None, type=float, help="Resend calls slower than this quantile of recent latencies (e.g. 0.95)")
+@click.option("--hedge-max-rate", default=0.05, type=float, help="Most hedged calls per call")
+def bench(sizes, latency_ms, latency_dist, jitter_ms, completion_tokens, error_rate, throttle_rate, accuracy,
+          model_name, series_length, seed, output, baseline, tolerance, save_baseline, hedge_quantile, hedge_max_rate):
+    """Benchmark harness throughput with a latency-simulating adapter."""
+    from pathlib import Path
+    from .eval.bench import run_suite, compare_to_baseline, save_results
+
+    try:
+        size_list = [int(x) for x in sizes.split(",") if x.strip()]
+    except ValueError:
+        raise click.UsageError(f"Invalid --sizes '{sizes}'; expected comma-separated integers")
+    if save_baseline and not baseline:
+        raise click.UsageError("--save-baseline requires --baseline PATH")
+    hedging = _hedging_options(hedge_quantile, hedge_max_rate)
+
+    results = run_suite(
+        sizes=size_list,
+        adapter_options={
+            "latency_ms": latency_ms,
+            "latency_dist": latency_dist,
+            "jitter_ms": jitter_ms,
+            "completion_tokens": completion_tokens,
+            "error_rate": error_rate,
+            "throttle_rate": throttle_rate,
+            "accuracy": accuracy,
+        },
+        model_name=model_name,
+        series_length=series_length,
+        seed=seed,
+        hedging=hedging.describe() if hedging else None,
+    )
+    save_results(results, Path(output))
+
+    for r in results["results"]:
+        click.echo(
+            f"n={r['size']:>6}  {r['samples_per_s']:>10} samples/s  "
+            f"overhead={r['overhead_ms_per_sample']} ms/sample  "
+            f"rss={r['peak_rss_mb']} MB  written={r['bytes_written']} B  p99={r['latency_p99_ms']} ms"
+            + (f"  hedges={r['hedge_rate']:.1%}" if hedging else "")
+        )
+    click.echo(f"Saved to {output}")
+
+    if not baseline:
+        return
+    baseline_path = Path(baseline)
+    if save_baseline:
+        save_results(results, baseline_path)
+        click.echo(f"Baseline updated: {baseline}")
+        return
+    if not baseline_path.exists():
+        raise click.UsageError(f"Baseline not found: {baseline}")
+    with baseline_path.open("r", encoding="utf-8") as f:
+        base = json.load(f)
+    if base.get("config") != results["config"]:
+        click.echo("Warning: baseline was recorded with a different configuration", err=True)
+    regressions = compare_to_baseline(results, base, tolerance=tolerance)
+    if regressions:
+        for reg in regressions:
+            click.echo(
+                f"REGRESSION n={reg['size']} {reg['metric']}: {reg['baseline']} -> {reg['current']} ({reg['change']:+.1%})",
+                err=True,
+            )
+        raise SystemExit(1)
+    click.echo(f"No regressions vs baseline (tolerance {tolerance:.0%})")
+
+
+@cli.command("bench-formats")
+@click.option("--formats", default="repr,fixed,csv,start_step,delta", help="Comma-separated formats, optionally name:precision")
+@click.option("--dataset-id", "dataset_ids", multiple=True, help="Restrict to these bundled datasets (default: all local ones)")
+@click.option("--limit", default=None, type=int, help="Samples per dataset")
+@click.option("--model", default=None, help="Also evaluate each format with this model (mock | azure:<deployment>)")
+@click.option("--tolerance", default=0.05, type=float, help="Allowed relative score loss vs repr when recommending")
+@click.option("--output", default="format_bench.json", help="Where to write results JSON")
+def bench_formats(formats, dataset_ids, limit, model, tolerance, output):
+    """Benchmark prompt tokens and accuracy of the Stage 1 prompt formats."""
+    from pathlib import Path
+    from .eval.bench import save_results
+    from .eval.token_bench import benchmark_formats, recommend
+
+    specs = [f.strip() for f in formats.split(",") if f.strip()]
+    adapter, model_name = _resolve_adapter(model) if model else (None, "mock")
+    try:
+        results = benchmark_formats(specs, dataset_ids=dataset_ids or None, limit=limit, adapter=adapter, model_name=model_name)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    results["recommended"] = recommend(results["rows"], tolerance=tolerance)
+    save_results(results, Path(output))
+
+    for r in results["rows"]:
+        line = (f"{r['dataset_id']:>22} {r['format']:>12}  {r['prompt_tokens_mean']:>9} tok/sample  "
+                f"x{r.get('tokens_vs_repr', '-')} vs repr  floor={r['format_performance_floor']:.4g}")
+        if "performance" in r:
+            line += f"  performance={r['performance']:.4g}  ok_rate={r['ok_rate']:.2f}"
+        click.echo(line)
+    click.echo(f"Tokenizer: {results['tokenizer']}; recommended format: {results['recommended']}")
+    click.echo(f"Saved to {output}")
+
+
+@cli.command("loadtest")
+@click.option("--api", default="http://127.0.0.1:5173", help="Base URL of a running API")
+@click.option("--duration", default=20.0, type=float, help="Seconds per phase")
+@click.option("--pollers", default=8, type=int)
+@click.option("--poll-interval-ms", default=50.0, type=float)
+@click.option("--renderers", default=2, type=int, help="Concurrent forced chart regenerations")
+@click.option("--run-id", default=None, help="Poll this run's /progress instead of /healthz")
+@click.option("--chart", default="model_performance")
+@click.option("--output", default=None, help="Also write both phases' results as JSON")
+def loadtest(api, duration, pollers, poll_interval_ms, renderers, run_id, chart, output):
+    """Measure poll latency on a running API, idle and while charts render."""
+    from .api.loadtest import run_load_test, format_result
+
+    poll_path = f"/runs/{run_id}/progress" if run_id else "/healthz"
+    options = dict(duration_s=duration, pollers=pollers, poll_interval_s=poll_interval_ms / 1000.0,
+                   poll_path=poll_path, chart=chart)
+    idle = run_load_test(api, renderers=0, **options)
+    click.echo(format_result(idle, "idle"))
+    loaded = run_load_test(api, renderers=renderers, **options)
+    click.echo(format_result(loaded, "rendering"))
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"idle": idle, "rendering": loaded}, f, indent=2)
+
+
+@cli.command("standin-server")
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", default=8011, type=int)
+@click.option("--latency-ms", default=300.0, type=float, help="Typical response latency (ms)")
+@click.option("--latency-dist", default="lognormal", type=click.Choice(["constant", "normal", "lognormal", "exponential"]))
+@click.option("--jitter-ms", default=0.0, type=float)
+@click.option("--throttle-rate", default=0.0, type=float, help="Share of requests answered with 429")
+@click.option("--error-rate", default=0.0, type=float, help="Share of requests answered with 500")
+@click.option("--rpm", default=None, type=int, help="Requests per minute before throttling")
+@click.option("--accuracy", default=1.0, type=float, help="Share of exactly correct answers")
+@click.option("--completion-tokens", default=16, type=int)
+@click.option("--ramble-tokens", default=0, type=int, help="Explanation tokens sent after the answer")
+@click.option("--token-ms", default=0.0, type=float, help="Delay between streamed tokens (ms)")
+@click.option("--seed", default=None, type=int)
+def standin_server(host, port, latency_ms, latency_dist, jitter_ms, throttle_rate, error_rate, rpm, accuracy, completion_tokens,
+                   ramble_tokens, token_ms, seed):
+    """Serve a local OpenAI-compatible chat-completions endpoint for offline load tests."""
+    import uvicorn
+    from .api.standin import StandinConfig, create_standin_app
+
+    config = StandinConfig(
+        latency_ms=latency_ms,
+        latency_dist=latency_dist,
+        jitter_ms=jitter_ms,
+        throttle_rate=throttle_rate,
+        error_rate=error_rate,
+        rpm=rpm,
+        accuracy=accuracy,
+        completion_tokens=completion_tokens,
+        ramble_tokens=ramble_tokens,
+        token_ms=token_ms,
+        seed=seed,
+    )
+    click.echo(f"Stand-in endpoint: AZURE_OPENAI_ENDPOINT=http://{host}:{port}")
+    uvicorn.run(create_standin_app(config), host=host, port=port, log_level="warning")
+
+
 # root cause analysis
 @cli.command("generate-data")
 @click.option("--count", default=100, type=int, help="Number of samples to generate")
 @click.option("--fault-ratio", default=0.2, type=float, help="Ratio of anomalies (0.0 to 1.0)")
-@click.option("--output", default="datasets/synthetic_rca.json", help="Output file path")
-def generate_rca_data(count, fault_ratio, output):
+@click.option("--output", default="datasets/synthetic_rca.json", help="Output path (.json, .jsonl or .fbds directory)")
+@click.option("--format", "fmt", default=None, type=click.Choice(["json", "jsonl", "columnar"]), help="Output format (default: from --output suffix)")
+@click.option("--seed", default=None, type=int, help="Seed for reproducible output")
+@click.option("--workers", default=1, type=int, help="Worker processes")
+@click.option("--chunk-size", default=None, type=int, help="Samples generated per chunk (default: sized to the topology)")
+@click.option("--topology", default=None, type=click.Choice(["pump_press", "production_line"]), help="Simulate over a component DAG instead of the simple generator")
+@click.option("--machines", default=4, type=int, help="Cells in the production_line topology")
+@click.option("--faults", default=None, help="Comma-separated fault kinds (leak,drift,stuck,oscillation)")
+@click.option("--length", default=60, type=int, help="Time steps per series (topology simulator)")
+def generate_rca_data(count, fault_ratio, output, fmt, seed, workers, chunk_size, topology, machines, faults, length):
     """Generate synthetic RCA data."""
-    from .generators.rca_simple import generate_batch
-    import json
-    from pathlib import Path
+    import time
+    from .generators.stream import default_chunk_size, generate_to_file
     
-    click.echo(f"Generating {count} samples with fault ratio {fault_ratio}...")
-    samples = generate_batch(count=count, fault_ratio=fault_ratio)
+    if topology:
+        from .generators.topology import FAULT_LIBRARY, TOPOLOGIES, simulate
+        fault_kinds = [f.strip() for f in faults.split(",")] if faults else None
+        unknown = set(fault_kinds or []) - set(FAULT_LIBRARY)
+        if unknown:
+            raise click.UsageError(f"Unknown fault kinds: {', '.join(sorted(unknown))}. Valid: {', '.join(FAULT_LIBRARY)}")
+        topo = TOPOLOGIES[topology](machines) if topology == "production_line" else TOPOLOGIES[topology]()
+        generator = simulate
+        options = {"topology": topo, "faults": fault_kinds, "length": length}
+        metrics, steps = len(topo.sensors), length
+        click.echo(f"Topology {topology}: {len(topo.components)} components, {len(topo.sensors)} sensors, {len(topo.links)} links")
+    else:
+        from .generators.rca_simple import LENGTH, METRIC_NAMES, generate_arrays
+        generator = generate_arrays
+        options = {}
+        metrics, steps = len(METRIC_NAMES), LENGTH
     
-    p = Path(output)
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open("w", encoding="utf-8") as f:
-        json.dump(samples, f, indent=2)
-        
-    click.echo(f"Saved to {output}")
+    click.echo(f"Generating {count} samples with fault ratio {fault_ratio}...")
+    started = time.perf_counter()
+    summary = generate_to_file(
+        generator,
+        output,
+        count,
+        fmt=fmt,
+        seed=seed,
+        chunk_size=chunk_size or default_chunk_size(metrics, steps),
+        workers=workers,
+        fault_ratio=fault_ratio,
+        **options,
+    )
+    click.echo(f"Saved to {output} ({summary['format']}, {time.perf_counter() - started:.2f}s)")
 
 
 @cli.command("preview-data")
-@click.option("--file", required=True, help="Path to JSON data file")
-def preview_data(file):
+@click.option("--file", required=True, help="Path to a JSON, JSONL or columnar (.fbds) dataset")
+@click.option("--limit", default=None, type=int, help="Only scan the first N samples")
+@click.option("--json", "as_json", is_flag=True, help="Print the summary as JSON")
+def preview_data(file, limit, as_json):
     """Preview a dataset file and show summary stats."""
     import json
     from pathlib import Path
+    from .data.inspect import inspect_dataset
     
     p = Path(file)
     if not p.exists():
         raise click.UsageError(f"File not found: {file}")
-        
-    with p.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-        
-    if not isinstance(data, list):
-        raise click.UsageError(f"Expected list of samples, got {type(data).__name__}")
-        
-    count = len(data)
-    anomalies = sum(1 for s in data if s.get("ground_truth", {}).get("root_cause_component") != "None")
     
-    click.echo(f"Dataset Preview: {file}")
+    try:
+        summary = inspect_dataset(p, limit=limit)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    
+    if as_json:
+        click.echo(json.dumps(summary, indent=2))
+        return
+    
+    count = summary["count"]
+    anomalies = summary["anomalies"]
+    click.echo(f"Dataset Preview: {file} ({summary['format']})")
     click.echo(f"Total Samples: {count}")
-    click.echo(f"Anomalies: {anomalies} ({(anomalies/count)*100:.1f}%)")
+    if anomalies is not None and count > 0:
+        click.echo(f"Anomalies: {anomalies} ({(anomalies/count)*100:.1f}%)")
     if count > 0:
-        click.echo("Sample IDs (first 3 IDs): " + ", ".join(s["id"] for s in data[:3]) + "...")
+        click.echo("Sample IDs (first 3 IDs): " + ", ".join(summary["sample_ids"]) + "...")
+    if summary["metric_stats"]:
+        click.echo("Metrics:")
+        for name, m in summary["metric_stats"].items():
+            click.echo(f"  {name}: min={m['min']:.3f} max={m['max']:.3f} mean={m['mean']:.3f}")
+    if summary["length_histogram"]:
+        click.echo("Series lengths: " + ", ".join(f"{length}: {n}" for length, n in summary["length_histogram"].items()))
 
 
 if __name__ == "__main__":
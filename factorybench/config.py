@@ -1,3 +1,4 @@
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -9,10 +10,28 @@ RUN_DIR.mkdir(parents=True, exist_ok=True)
 
 HF_API_TOKEN = os.getenv("HF_API_TOKEN")
 
+# Minimum seconds between incremental run-file checkpoints (the final save always happens)
+CHECKPOINT_INTERVAL_S = float(os.getenv("FACTORYBENCH_CHECKPOINT_INTERVAL", "2.0"))
+
+# Distributed runs: seconds a worker may hold a batch before it is handed to another worker
+LEASE_TIMEOUT_S = float(os.getenv("FACTORYBENCH_LEASE_TIMEOUT", "120"))
+
+# Run progress/stop state: "memory" (single process) or "sqlite" (shared by API workers on one host)
+STATE_BACKEND = os.getenv("FACTORYBENCH_STATE_BACKEND", "memory")
+STATE_DB_PATH = Path(os.getenv("FACTORYBENCH_STATE_DB", str(RUN_DIR / "state.sqlite"))).resolve()
+# Finished runs stay queryable via /runs/{id}/progress for this long
+STATE_TTL_S = float(os.getenv("FACTORYBENCH_STATE_TTL", "3600"))
+
+# Processes the API uses for chart rendering and parsing large run files
+API_PROCESS_WORKERS = int(os.getenv("FACTORYBENCH_API_PROCESSES", "2"))
+
 # Azure OpenAI Configuration
 AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION")
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
+# Client retries and per-request timeout in seconds; unset keeps the openai SDK defaults
+AZURE_OPENAI_MAX_RETRIES = int(os.environ["AZURE_OPENAI_MAX_RETRIES"]) if os.getenv("AZURE_OPENAI_MAX_RETRIES") else None
+AZURE_OPENAI_TIMEOUT = float(os.environ["AZURE_OPENAI_TIMEOUT"]) if os.getenv("AZURE_OPENAI_TIMEOUT") else None
 
 # Dataset Registry
 DATASETS = {
@@ -45,28 +64,60 @@ DATASETS = {
             "hf_slug": "Forgis/FactorySet",
             "split": "train",
         },
-    ]
+    ],
+    "root_cause_analysis": [
+        {
+            "id": "local_rca_basic",
+            "name": "Synthetic RCA (20 samples)",
+            "source": "local",
+            "fixture_path": "datasets/rca_basic.json",
+            "split": "train",
+        },
+    ],
 }
 
+# Anchor subsets written by 'factorybench subsets select' register themselves from their manifests
+SUBSET_DIR = Path(os.getenv("FACTORYBENCH_SUBSET_DIR", "datasets/subsets"))
+for _manifest_path in sorted(SUBSET_DIR.glob("*.manifest.json")):
+    try:
+        with _manifest_path.open("r", encoding="utf-8") as _f:
+            _manifest = json.load(_f)
+        DATASETS.setdefault(_manifest["stage"], []).append({
+            "id": _manifest["id"],
+            "name": _manifest["name"],
+            "source": "local",
+            "fixture_path": _manifest["fixture_path"],
+            "split": "train",
+            "subset_of": _manifest["subset_of"],
+            # Absolute, so runs started from another working directory still find it
+            "manifest": _manifest_path.resolve().as_posix(),
+        })
+    except (json.JSONDecodeError, KeyError, OSError):
+        continue
+
 # Model Registry
+# Optional generation settings per model: max_tokens, max_completion_tokens (reasoning models,
+# whose budget includes reasoning tokens), stop (list of stop sequences) and temperature (default 0)
 MODELS = [
     {"id": "mock", "name": "Mock Adapter", "provider": "local"},
-    {"id": "azure:gpt-4o", "name": "GPT-4o", "provider": "azure"},
-    {"id": "azure:gpt-4o-mini", "name": "GPT-4o Mini", "provider": "azure"},
-    {"id": "azure:o1", "name": "o1 (Reasoning)", "provider": "azure"},
-    {"id": "azure:o1-mini", "name": "o1-mini (Efficient)", "provider": "azure"},
+    {"id": "azure:gpt-4o", "name": "GPT-4o", "provider": "azure", "max_tokens": 256},
+    {"id": "azure:gpt-4o-mini", "name": "GPT-4o Mini", "provider": "azure", "max_tokens": 256},
+    {"id": "azure:o1", "name": "o1 (Reasoning)", "provider": "azure", "max_completion_tokens": 8192},
+    {"id": "azure:o1-mini", "name": "o1-mini (Efficient)", "provider": "azure", "max_completion_tokens": 8192},
 ]
 
 # Azure OpenAI pricing (USD per 1K tokens) - updated Nov 2024
 # Source: https://azure.microsoft.com/en-us/pricing/details/cognitive-services/openai-service/
 # Prices converted from per 1M tokens to per 1K tokens (divide by 1000)
+# cached_input_per_1k applies to prompt tokens the provider served from its prompt cache
+# (usage.prompt_tokens_details.cached_tokens); without it cached tokens bill at input_per_1k
 AZURE_PRICING = {
     # Current generation (2024)
-    "azure:gpt-4o": {"input_per_1k": 0.0025, "output_per_1k": 0.01},
-    "azure:gpt-4o-mini": {"input_per_1k": 0.00015, "output_per_1k": 0.0006},
+    "azure:gpt-4o": {"input_per_1k": 0.0025, "cached_input_per_1k": 0.00125, "output_per_1k": 0.01},
+    "azure:gpt-4o-mini": {"input_per_1k": 0.00015, "cached_input_per_1k": 0.000075, "output_per_1k": 0.0006},
     # o1 series (reasoning models)
-    "azure:o1": {"input_per_1k": 0.015, "output_per_1k": 0.06},
-    "azure:o1-mini": {"input_per_1k": 0.003, "output_per_1k": 0.012},
+    "azure:o1": {"input_per_1k": 0.015, "cached_input_per_1k": 0.0075, "output_per_1k": 0.06},
+    "azure:o1-mini": {"input_per_1k": 0.003, "cached_input_per_1k": 0.0015, "output_per_1k": 0.012},
 }
 
 # Cost Limits (USD)
@@ -0,0 +1,170 @@
+"""
+Columnar on-disk format for large generated RCA datasets.
+
+A dataset is a directory (conventionally ``*.fbds``) containing:
+
+- ``metrics.npy``: float32 array ``(count, metrics, length)``
+- ``ids.npy``: fixed-width ASCII sample ids
+- ``gt_<field>.npy``: int32 ground-truth columns; text fields are stored as codes into
+  the vocabularies in the index
+- ``index.json``: shape, metric names, vocabularies and precomputed summary statistics
+
+All arrays are written and read as memmaps, so writers stream batches in and readers
+never load more than the samples they touch.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from ..generators.batch import GROUND_TRUTH_FIELDS, GROUND_TRUTH_TEXT_FIELDS, SampleBatch
+
+FORMAT_NAME = "factorybench-columnar"
+FORMAT_VERSION = 1
+INDEX_FILE = "index.json"
+METRICS_FILE = "metrics.npy"
+IDS_FILE = "ids.npy"
+ID_DTYPE = "S32"
+
+
+def is_columnar(path: Path) -> bool:
+    return Path(path).is_dir() and (Path(path) / INDEX_FILE).exists()
+
+
+def read_index(path: Path) -> Dict[str, Any]:
+    with (Path(path) / INDEX_FILE).open("r", encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} dataset")
+    return index
+
+
+def _gt_file(field: str) -> str:
+    return f"gt_{field}.npy"
+
+
+class ColumnarWriter:
+    """Stream ``SampleBatch`` objects into a columnar dataset of known size."""
+
+    def __init__(self, path: Path, count: int):
+        self.path = Path(path)
+        self.count = count
+        self.written = 0
+        self._arrays: Dict[str, np.memmap] = {}
+        self._vocab: Dict[str, Dict[str, int]] = {f: {} for f in GROUND_TRUTH_TEXT_FIELDS}
+        self._header: Dict[str, Any] = {}
+        self._sum: Optional[np.ndarray] = None
+        self._min: Optional[np.ndarray] = None
+        self._max: Optional[np.ndarray] = None
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+    def _open(self, batch: SampleBatch):
+        self.path.mkdir(parents=True, exist_ok=True)
+        shape = (self.count, len(batch.metric_names), batch.metrics.shape[2])
+        open_memmap = np.lib.format.open_memmap
+        self._arrays["metrics"] = open_memmap(self.path / METRICS_FILE, mode="w+", dtype=np.float32, shape=shape)
+        self._arrays["ids"] = open_memmap(self.path / IDS_FILE, mode="w+", dtype=ID_DTYPE, shape=(self.count,))
+        for field in GROUND_TRUTH_FIELDS:
+            self._arrays[field] = open_memmap(self.path / _gt_file(field), mode="w+", dtype=np.int32, shape=(self.count,))
+        self._header = {"metric_names": list(batch.metric_names), "length": shape[2], "meta": batch.meta}
+        self._sum = np.zeros(shape[1])
+        self._min = np.full(shape[1], np.inf)
+        self._max = np.full(shape[1], -np.inf)
+
+    def _encode(self, field: str, values: np.ndarray) -> np.ndarray:
+        vocab = self._vocab[field]
+        uniques, inverse = np.unique(values, return_inverse=True)
+        codes = np.array([vocab.setdefault(str(u), len(vocab)) for u in uniques], dtype=np.int32)
+        return codes[inverse]
+
+    def write(self, batch: SampleBatch):
+        if not len(batch):
+            return
+        if not self._arrays:
+            self._open(batch)
+        n = len(batch)
+        lo, hi = self.written, self.written + n
+        if hi > self.count:
+            raise ValueError(f"Writer sized for {self.count} samples, got {hi}")
+        self._arrays["metrics"][lo:hi] = batch.metrics
+        self._arrays["ids"][lo:hi] = np.array(batch.ids, dtype=ID_DTYPE)
+        for field in GROUND_TRUTH_FIELDS:
+            values = batch.ground_truth[field]
+            self._arrays[field][lo:hi] = self._encode(field, values) if field in self._vocab else values
+        self._sum += batch.metrics.sum(axis=(0, 2))
+        self._min = np.minimum(self._min, batch.metrics.min(axis=(0, 2)))
+        self._max = np.maximum(self._max, batch.metrics.max(axis=(0, 2)))
+        self.written = hi
+
+    def close(self) -> Dict[str, Any]:
+        """Flush data and write ``index.json``; returns the index."""
+        if not self._arrays:
+            raise ValueError("No samples written")
+        if self.written != self.count:
+            raise ValueError(f"Expected {self.count} samples, wrote {self.written}")
+        for arr in self._arrays.values():
+            arr.flush()
+
+        vocab = {f: sorted(v, key=v.get) for f, v in self._vocab.items()}
+        component_counts = np.bincount(self._arrays["root_cause_component"], minlength=len(vocab["root_cause_component"]))
+        components = {name: int(c) for name, c in zip(vocab["root_cause_component"], component_counts)}
+        points = self.count * self._header["length"]
+        index = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "count": self.count,
+            **self._header,
+            "anomalies": self.count - components.get("None", 0),
+            "root_cause_components": components,
+            "metric_stats": {
+                name: {"min": float(self._min[j]), "max": float(self._max[j]), "mean": float(self._sum[j] / points)}
+                for j, name in enumerate(self._header["metric_names"])
+            },
+            "vocab": vocab,
+        }
+        with (self.path / INDEX_FILE).open("w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        return index
+
+
+class ColumnarDataset:
+    """Read-only, memory-mapped view of a columnar dataset."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.index = read_index(self.path)
+        self.metric_names: List[str] = self.index["metric_names"]
+        self.metrics = np.load(self.path / METRICS_FILE, mmap_mode="r")
+        self.ids = np.load(self.path / IDS_FILE, mmap_mode="r")
+        self.ground_truth = {f: np.load(self.path / _gt_file(f), mmap_mode="r") for f in GROUND_TRUTH_FIELDS}
+
+    def __len__(self) -> int:
+        return int(self.index["count"])
+
+    def ground_truth_at(self, i: int) -> Dict[str, Any]:
+        vocab = self.index["vocab"]
+        return {
+            f: vocab[f][int(self.ground_truth[f][i])] if f in vocab else int(self.ground_truth[f][i])
+            for f in GROUND_TRUTH_FIELDS
+        }
+
+    def sample_at(self, i: int) -> Dict[str, Any]:
+        """Sample ``i`` in the ``generate-data`` JSON schema."""
+        return {
+            "id": self.ids[i].decode("ascii"),
+            "meta": dict(self.index["meta"]),
+            "ground_truth": self.ground_truth_at(i),
+            "metrics": {name: self.metrics[i, j].astype(float).tolist() for j, name in enumerate(self.metric_names)},
+        }
+
+    def iter_samples(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        n = len(self) if limit is None else min(limit, len(self))
+        for i in range(n):
+            yield self.sample_at(i)
@@ -0,0 +1,175 @@
+"""
+Bounded-memory dataset inspection for ``preview-data``.
+
+JSON arrays and JSONL files are decoded one sample at a time from a sliding read buffer,
+so memory stays proportional to the largest single sample rather than the file. Columnar
+(``.fbds``) datasets are answered from their ``index.json`` without touching the arrays.
+"""
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .columnar import ColumnarDataset, is_columnar, read_index
+
+READ_SIZE = 1 << 20
+SAMPLE_ID_PREVIEW = 3
+
+
+def iter_json_array(path: Path, read_size: int = READ_SIZE) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with Path(path).open("r", encoding="utf-8") as f:
+        buf = f.read(read_size).lstrip()
+        if not buf.startswith("["):
+            raise ValueError(f"Expected list of samples in {path}")
+        pos = 1
+        eof = False
+        while True:
+            # Skip whitespace and separators between elements
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            if pos >= len(buf):
+                if eof:
+                    raise ValueError(f"Unterminated JSON array in {path}")
+                buf, pos = f.read(read_size), 0
+                eof = not buf
+                continue
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                # A scalar is only complete once its separator is in the buffer ("2." decodes as 2)
+                truncated = not isinstance(item, (dict, list)) and not eof and buf[end:].lstrip()[:1] not in (",", "]")
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                truncated = True
+            if truncated:
+                # Element spans the buffer boundary: keep the tail and read more
+                more = f.read(read_size)
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield item
+            pos = end
+            if pos > read_size:
+                buf, pos = buf[pos:], 0
+
+
+def iter_jsonl(path: Path) -> Iterator[Any]:
+    with Path(path).open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def detect_format(path: Path) -> str:
+    """columnar | jsonl | json, from the layout, suffix or first character."""
+    path = Path(path)
+    if is_columnar(path):
+        return "columnar"
+    if path.suffix.lower() == ".jsonl":
+        return "jsonl"
+    with path.open("r", encoding="utf-8") as f:
+        head = f.read(64).lstrip()
+    return "json" if head.startswith("[") else "jsonl"
+
+
+def iter_samples(path: Path) -> Iterator[Dict[str, Any]]:
+    """Stream samples from a JSON array or JSONL file."""
+    return iter_json_array(path) if detect_format(path) == "json" else iter_jsonl(path)
+
+
+def _series(sample: Dict[str, Any]) -> Dict[str, List[float]]:
+    """Per-metric series: RCA samples use ``metrics``, telemetry literacy uses ``values``."""
+    if isinstance(sample.get("metrics"), dict):
+        return sample["metrics"]
+    if isinstance(sample.get("values"), list):
+        return {"values": sample["values"]}
+    return {}
+
+
+class DatasetStats:
+    """Streaming accumulator for counts, anomalies, metric stats and series lengths."""
+
+    def __init__(self):
+        self.count = 0
+        self.labelled = 0
+        self.anomalies = 0
+        self.sample_ids: List[str] = []
+        self.root_cause_components: Counter = Counter()
+        self.length_histogram: Counter = Counter()
+        self._metrics: Dict[str, Dict[str, float]] = {}
+
+    def add(self, sample: Dict[str, Any]):
+        self.count += 1
+        if len(self.sample_ids) < SAMPLE_ID_PREVIEW:
+            self.sample_ids.append(str(sample.get("id")))
+        gt = sample.get("ground_truth")
+        if isinstance(gt, dict):
+            self.labelled += 1
+            component = gt.get("root_cause_component", "None")
+            self.root_cause_components[component] += 1
+            if component != "None":
+                self.anomalies += 1
+        for name, values in _series(sample).items():
+            self.length_histogram[len(values)] += 1
+            if not values:
+                continue
+            m = self._metrics.setdefault(name, {"min": float("inf"), "max": float("-inf"), "sum": 0.0, "points": 0})
+            m["min"] = min(m["min"], min(values))
+            m["max"] = max(m["max"], max(values))
+            m["sum"] += sum(values)
+            m["points"] += len(values)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "anomalies": self.anomalies if self.labelled else None,
+            "root_cause_components": dict(self.root_cause_components),
+            "metric_stats": {
+                name: {"min": m["min"], "max": m["max"], "mean": m["sum"] / m["points"]}
+                for name, m in self._metrics.items()
+            },
+            "length_histogram": dict(sorted(self.length_histogram.items())),
+            "sample_ids": self.sample_ids,
+        }
+
+
+def inspect_dataset(path: Path, limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Summarize a dataset file with bounded memory.
+
+    Args:
+        path: JSON array, JSONL file or columnar ``.fbds`` directory
+        limit: Stop after this many samples (ignored for columnar datasets)
+
+    Returns:
+        Summary with count, anomalies (None when unlabelled), root_cause_components,
+        metric_stats {min, max, mean}, length_histogram and the first sample_ids
+    """
+    path = Path(path)
+    fmt = detect_format(path)
+    if fmt == "columnar":
+        index = read_index(path)
+        ids = ColumnarDataset(path).ids[:SAMPLE_ID_PREVIEW]
+        return {
+            "format": "columnar",
+            "count": index["count"],
+            "anomalies": index["anomalies"],
+            "root_cause_components": index["root_cause_components"],
+            "metric_stats": index["metric_stats"],
+            # Columnar series share one length
+            "length_histogram": {index["length"]: index["count"] * len(index["metric_names"])},
+            "sample_ids": [i.decode("ascii") for i in ids],
+        }
+
+    stats = DatasetStats()
+    for i, sample in enumerate(iter_samples(path)):
+        if limit is not None and i >= limit:
+            break
+        if not isinstance(sample, dict):
+            raise ValueError(f"Expected sample objects, got {type(sample).__name__}")
+        stats.add(sample)
+    return {**stats.summary(), "format": fmt}
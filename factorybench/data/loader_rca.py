@@ -0,0 +1,21 @@
+from typing import Any, Dict, List, Optional
+from itertools import islice
+from pathlib import Path
+
+from .columnar import ColumnarDataset, is_columnar
+from .inspect import iter_samples
+
+
+def load_root_cause_analysis(
+    path: str = "datasets/rca_basic.json",
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Load RCA samples from ``generate-data`` output (JSON, JSONL or columnar .fbds)."""
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"Local dataset not found: {p}")
+    
+    # Stream so a limit on a large dataset only reads the samples it needs
+    if is_columnar(p):
+        return list(ColumnarDataset(p).iter_samples(limit))
+    return list(islice(iter_samples(p), limit))
@@ -0,0 +1,230 @@
+"""
+Throughput benchmarks for the evaluation harness.
+
+Runs ``run_telemetry_literacy`` against a ``SimulatedAdapter`` on synthetic samples and
+measures what the harness itself costs: samples/s, per-sample overhead on top of the
+simulated model latency, peak RSS and bytes written. Results are plain JSON so they can
+be stored as a baseline and compared on later runs.
+"""
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..adapters.hedged import HedgedAdapter, HedgingPolicy
+from ..adapters.simulated import SimulatedAdapter
+from ..state import run_state
+from .runner import run_telemetry_literacy
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore
+
+BENCH_VERSION = 1
+DEFAULT_SIZES = (10, 100, 1000)
+
+# Metric -> direction; used when comparing against a baseline
+TRACKED_METRICS = {
+    "samples_per_s": "higher",
+    "overhead_ms_per_sample": "lower",
+    "peak_rss_mb": "lower",
+    "bytes_written": "lower",
+}
+
+
+def make_samples(count: int, length: int = 64, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic telemetry literacy samples with exact statistics."""
+    rng = random.Random(seed)
+    samples = []
+    for i in range(count):
+        base = rng.uniform(-100.0, 100.0)
+        amp = rng.uniform(0.5, 20.0)
+        values = [round(base + amp * rng.gauss(0.0, 1.0), 3) for _ in range(length)]
+        samples.append({
+            "id": f"bench_{i:06d}",
+            "timestamps": [float(t) for t in range(length)],
+            "values": values,
+            "domain": "synthetic",
+            "subtype": "bench",
+            "statistics": {
+                "mean": sum(values) / length,
+                "min": min(values),
+                "max": max(values),
+            },
+        })
+    return samples
+
+
+def _write_bytes() -> Optional[int]:
+    """Bytes passed to write() by this process so far (Linux only)."""
+    try:
+        with open("/proc/self/io", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def bench_runner(
+    size: int,
+    adapter_options: Optional[Dict[str, Any]] = None,
+    model_name: str = "simulated",
+    series_length: int = 64,
+    seed: int = 0,
+    hedging: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Benchmark a single runner invocation of ``size`` samples in the current process."""
+    samples = make_samples(size, length=series_length, seed=seed)
+    simulated = SimulatedAdapter(seed=seed, **(adapter_options or {}))
+    adapter = HedgedAdapter(simulated, HedgingPolicy(**hedging), label="simulated") if hedging else simulated
+    run_id = f"bench-{size}-{uuid.uuid4().hex[:8]}"
+
+    with tempfile.TemporaryDirectory(prefix="factorybench-bench-") as tmp:
+        written_before = _write_bytes()
+        t0 = time.perf_counter()
+        try:
+            run = run_telemetry_literacy(
+                samples=samples,
+                adapter=adapter,
+                model_name=model_name,
+                dataset_meta={"source": "bench", "dataset_id": "bench_synthetic", "limit": size},
+                run_id=run_id,
+                run_dir=Path(tmp),
+            )
+            wall = time.perf_counter() - t0
+        finally:
+            if isinstance(adapter, HedgedAdapter):
+                adapter.shutdown()
+        written_after = _write_bytes()
+        run_size = (Path(tmp) / f"{run_id}.json").stat().st_size
+    run_state.cleanup_run(run_id)
+
+    processed = len(run["results"])
+    # With hedging, overlapping calls make the summed latency exceed the time spent waiting
+    overhead = max(0.0, wall - simulated.total_latency_s)
+    return {
+        "size": size,
+        "processed": processed,
+        "status": run["status"],
+        "wall_s": round(wall, 6),
+        "model_latency_s": round(simulated.total_latency_s, 6),
+        "samples_per_s": round(processed / wall, 3) if wall > 0 else None,
+        "overhead_ms_per_sample": round(overhead * 1000.0 / processed, 4) if processed else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "bytes_written": (written_after - written_before) if written_before is not None and written_after is not None else None,
+        "run_file_bytes": run_size,
+        "performance": run["aggregate"].get("performance"),
+        "ok_rate": run["aggregate"].get("ok_rate"),
+        "latency_p99_ms": run["aggregate"].get("latency_p99_ms"),
+        "cost_total": run["aggregate"].get("cost_total"),
+        **({"hedge_rate": run["aggregate"].get("hedge_rate", 0.0), "cost_hedge": run["aggregate"].get("cost_hedge", 0.0)} if hedging else {}),
+    }
+
+
+def run_suite(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    adapter_options: Optional[Dict[str, Any]] = None,
+    model_name: str = "simulated",
+    series_length: int = 64,
+    seed: int = 0,
+    isolate: bool = True,
+    hedging: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Benchmark the runner at each size.
+
+    Args:
+        sizes: Sample counts to benchmark
+        adapter_options: Keyword arguments for ``SimulatedAdapter``
+        model_name: Model name recorded in the run (selects pricing)
+        series_length: Points per synthetic series
+        seed: Seed for samples and simulated adapter
+        isolate: Run each size in a fresh process so peak RSS is per size
+        hedging: Keyword arguments for ``HedgingPolicy``; None sends every call once
+
+    Returns:
+        Machine-readable suite results
+    """
+    results = []
+    for size in sizes:
+        args = (size, adapter_options, model_name, series_length, seed, hedging)
+        if isolate:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                results.append(pool.submit(bench_runner, *args).result())
+        else:
+            results.append(bench_runner(*args))
+
+    return {
+        "bench_version": BENCH_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "sizes": list(sizes),
+            "adapter": adapter_options or {},
+            "model": model_name,
+            "series_length": series_length,
+            "seed": seed,
+            **({"hedging": hedging} if hedging else {}),
+        },
+        "results": results,
+    }
+
+
+def compare_to_baseline(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Compare suite results to a baseline, size by size.
+
+    A metric regresses when it is worse than the baseline by more than ``tolerance``
+    (relative). Sizes or metrics missing from either side are skipped.
+
+    Returns:
+        One entry per regressed metric
+    """
+    base_by_size = {r["size"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for cur in current.get("results", []):
+        base = base_by_size.get(cur["size"])
+        if not base:
+            continue
+        for metric, direction in TRACKED_METRICS.items():
+            new, old = cur.get(metric), base.get(metric)
+            if not isinstance(new, (int, float)) or not isinstance(old, (int, float)) or old == 0:
+                continue
+            change = (new - old) / abs(old)
+            worse = -change if direction == "higher" else change
+            if worse > tolerance:
+                regressions.append({
+                    "size": cur["size"],
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": round(change, 4),
+                })
+    return regressions
+
+
+def save_results(results: Dict[str, Any], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
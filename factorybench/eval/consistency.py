@@ -0,0 +1,35 @@
+"""
+Consistency of several completions per prompt.
+
+With ``samples_per_prompt`` = k the runner asks the model for k completions of each
+prompt in one request (the API's ``n``), so they share the prompt's input tokens. Every
+completion is scored on its own. Each result item then carries ``completions`` (text and
+metrics of each), ``vote`` (the stage's majority/median vote over them, scored) and
+``completion_variance`` (sample variance of each per-sample value across completions).
+"""
+from typing import Any, Dict, List, Optional
+import math
+import statistics
+
+
+def completion_variance(values: List[Dict[str, Optional[float]]]) -> Dict[str, float]:
+    """Sample variance of each key over completions; keys with fewer than two values are left out."""
+    out: Dict[str, float] = {}
+    for key in dict.fromkeys(k for v in values for k in v):
+        xs = [v[key] for v in values if isinstance(v.get(key), (int, float)) and not math.isnan(v[key])]
+        if len(xs) >= 2:
+            out[key] = statistics.variance(xs)
+    return out
+
+
+def summarize_consistency(results: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Completions per prompt and the mean within-sample variance of each value, over the results."""
+    with_completions = [r for r in results if r.get("completions")]
+    if not with_completions:
+        return {}
+    agg: Dict[str, float] = {"samples_per_prompt": float(max(len(r["completions"]) for r in with_completions))}
+    variances = [r.get("completion_variance") or {} for r in with_completions]
+    for key in dict.fromkeys(k for v in variances for k in v):
+        vals = [v[key] for v in variances if key in v]
+        agg[f"completion_var_{key}"] = math.fsum(vals) / len(vals)
+    return agg
@@ -0,0 +1,258 @@
+"""
+Work-pulling coordination for distributed evaluation.
+
+The API server owns each distributed run: it keeps the samples, hands out batches to
+``factorybench worker`` processes as leases, and gathers their result items into the run
+file. A lease that is not completed within ``LEASE_TIMEOUT_S`` goes back to the queue, and
+the first result for a sample wins. Stop requests and cost limits are checked through
+``run_state`` before every lease and after every completion, so workers never need to
+know the limits; at most the batches already leased run past a limit.
+"""
+import json
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Any, Deque, Dict, List, Optional
+
+from ..config import RUN_DIR, MAX_COST_PER_RUN, MAX_COST_PER_DAY, CHECKPOINT_INTERVAL_S, LEASE_TIMEOUT_S
+from ..monitoring import SAMPLES_PROCESSED, SAMPLE_GENERATE_SECONDS, TOKENS, COST_USD
+from ..state import run_state
+from ..leaderboard import leaderboard
+from .runner import SCORING_VERSION, StageTask, aggregate_results, usage_cost
+
+
+@dataclass
+class Lease:
+    lease_id: str
+    run_id: str
+    worker_id: str
+    indices: List[int]
+    deadline: float
+    expired: bool = False
+
+
+@dataclass
+class CoordinatedRun:
+    task: StageTask
+    run: Dict[str, Any]
+    samples: List[Dict[str, Any]]
+    out_path: Path
+    daily_cost: float
+    pending: Deque[int] = field(default_factory=deque)
+    results: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    leases: Dict[str, Lease] = field(default_factory=dict)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_total: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+    last_checkpoint: Optional[float] = None
+
+    @property
+    def run_id(self) -> str:
+        return self.run["run_id"]
+
+    @property
+    def model(self) -> str:
+        return self.run["model"]
+
+
+class Coordinator:
+    """Thread-safe queue of distributed runs; FastAPI calls it from its worker threads."""
+
+    def __init__(self, lease_timeout_s: float = LEASE_TIMEOUT_S, run_dir: Optional[Path] = None):
+        self.lease_timeout_s = lease_timeout_s
+        self.run_dir = Path(run_dir or RUN_DIR)
+        self._runs: Dict[str, CoordinatedRun] = {}
+        self._leases: Dict[str, Lease] = {}
+        self._lock = Lock()
+
+    def submit(self, task: StageTask, samples: List[Dict[str, Any]], model_name: str, dataset_meta: Dict[str, Any], run_id: str):
+        """Queue a run for workers; mirrors the start of ``runner.run_stage``."""
+        run_state.start_run(run_id, total_samples=len(samples))
+        daily_cost = run_state.get_daily_cost()
+        if daily_cost >= MAX_COST_PER_DAY:
+            run_state.complete_run(run_id, status="failed", error=f"Daily cost limit reached: ${daily_cost:.2f} >= ${MAX_COST_PER_DAY}")
+            raise RuntimeError(f"Daily cost limit reached: ${daily_cost:.2f}. Maximum allowed: ${MAX_COST_PER_DAY}/day")
+
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        out_path = self.run_dir / f"{run_id}.json"
+        run: Dict[str, Any] = {"run_id": run_id, "stage": task.stage, "model": model_name, "version": "0.1.0"}
+        if out_path.exists():
+            with out_path.open("r", encoding="utf-8") as f:
+                run = json.load(f)
+        run.update({
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "dataset": dataset_meta,
+            "results": [],
+            "aggregate": {},
+            "status": "running",
+            "distributed": True,
+            "scoring_version": SCORING_VERSION,
+        })
+        run.pop("loading_stage", None)
+        with out_path.open("w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        leaderboard.upsert(run, out_path)
+
+        with self._lock:
+            self._runs[run_id] = CoordinatedRun(
+                task=task,
+                run=run,
+                samples=samples,
+                out_path=out_path,
+                daily_cost=daily_cost,
+                pending=deque(range(len(samples))),
+            )
+
+    def lease(self, worker_id: str, max_samples: int) -> Optional[Dict[str, Any]]:
+        """Hand the oldest run's next batch to ``worker_id``; None when there is no work."""
+        now = time.perf_counter()
+        with self._lock:
+            for cr in list(self._runs.values()):
+                if not self._check_limits(cr):
+                    continue
+                self._reclaim_expired(cr, now)
+                indices: List[int] = []
+                while cr.pending and len(indices) < max_samples:
+                    idx = cr.pending.popleft()
+                    # Re-queued samples may have been finished by the late original lease
+                    if idx not in cr.results:
+                        indices.append(idx)
+                if not indices:
+                    continue
+                lease = Lease(uuid.uuid4().hex, cr.run_id, worker_id, indices, now + self.lease_timeout_s)
+                cr.leases[lease.lease_id] = lease
+                self._leases[lease.lease_id] = lease
+                return {
+                    "lease_id": lease.lease_id,
+                    "run_id": cr.run_id,
+                    "stage": cr.task.stage,
+                    "model": cr.model,
+                    "samples": [cr.samples[i] for i in indices],
+                    "lease_timeout_s": self.lease_timeout_s,
+                }
+        return None
+
+    def complete(self, lease_id: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Record a worker's result items for a lease, in lease order.
+
+        Raises:
+            KeyError: Unknown lease, or its run already finished
+            ValueError: Result count does not match the lease
+        """
+        with self._lock:
+            lease = self._leases.get(lease_id)
+            if lease is None or lease.run_id not in self._runs:
+                self._leases.pop(lease_id, None)
+                raise KeyError(lease_id)
+            # A rejected completion leaves the lease in place, so its samples are reclaimed on expiry
+            if len(results) != len(lease.indices):
+                raise ValueError(f"Lease has {len(lease.indices)} samples, got {len(results)} results")
+            cr = self._runs[lease.run_id]
+            del self._leases[lease_id]
+            cr.leases.pop(lease_id, None)
+
+            accepted = 0
+            for idx, item in zip(lease.indices, results):
+                if idx in cr.results:
+                    continue
+                cr.results[idx] = item
+                accepted += 1
+                usage = item.get("usage") or {}
+                prompt_tokens = usage.get("prompt_tokens") or 0
+                cached_tokens = usage.get("cached_tokens") or 0
+                completion_tokens = usage.get("completion_tokens") or 0
+                sample_cost = usage_cost(cr.model, usage)
+                cr.prompt_tokens += prompt_tokens
+                cr.completion_tokens += completion_tokens
+                cr.cost_total += sample_cost
+                SAMPLES_PROCESSED.inc(model=cr.model)
+                SAMPLE_GENERATE_SECONDS.observe((item.get("timing") or {}).get("generate_ms", 0.0) / 1000.0, model=cr.model)
+                TOKENS.inc(prompt_tokens, model=cr.model, kind="prompt")
+                TOKENS.inc(cached_tokens, model=cr.model, kind="cached")
+                TOKENS.inc(completion_tokens, model=cr.model, kind="completion")
+                TOKENS.inc(usage.get("hedge_prompt_tokens", 0) + usage.get("hedge_completion_tokens", 0), model=cr.model, kind="hedge")
+                COST_USD.inc(sample_cost, model=cr.model)
+            run_state.update_progress(cr.run_id, processed_samples=len(cr.results), current_cost=cr.cost_total)
+
+            if len(cr.results) == len(cr.samples):
+                self._finalize(cr, "completed")
+            elif self._check_limits(cr):
+                self._checkpoint(cr)
+            return {"accepted": accepted, "stop": cr.run_id not in self._runs}
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "runs": [
+                    {
+                        "run_id": cr.run_id,
+                        "total_samples": len(cr.samples),
+                        "processed_samples": len(cr.results),
+                        "pending_samples": len(cr.pending),
+                        "active_leases": len(cr.leases),
+                        "workers": sorted({lease.worker_id for lease in cr.leases.values()}),
+                        "current_cost": round(cr.cost_total, 6),
+                    }
+                    for cr in self._runs.values()
+                ]
+            }
+
+    def _reclaim_expired(self, cr: CoordinatedRun, now: float):
+        for lease in cr.leases.values():
+            if not lease.expired and lease.deadline <= now:
+                # Keep the lease so a late completion still counts; the samples go back first
+                lease.expired = True
+                cr.pending.extendleft(reversed(lease.indices))
+
+    def _check_limits(self, cr: CoordinatedRun) -> bool:
+        """Finalize the run if it was stopped or hit a cost limit; True while it may continue."""
+        if run_state.should_stop(cr.run_id):
+            self._finalize(cr, "stopped")
+        elif cr.cost_total >= MAX_COST_PER_RUN:
+            self._finalize(cr, "stopped", f"Cost limit reached: ${cr.cost_total:.4f} >= ${MAX_COST_PER_RUN}")
+        elif cr.daily_cost + cr.cost_total >= MAX_COST_PER_DAY:
+            self._finalize(cr, "stopped", f"Daily cost limit reached: ${cr.daily_cost + cr.cost_total:.2f} >= ${MAX_COST_PER_DAY}")
+        return cr.run_id in self._runs
+
+    def _ordered_results(self, cr: CoordinatedRun) -> List[Dict[str, Any]]:
+        return [cr.results[i] for i in sorted(cr.results)]
+
+    def _checkpoint(self, cr: CoordinatedRun):
+        now = time.perf_counter()
+        if cr.last_checkpoint is not None and now - cr.last_checkpoint < CHECKPOINT_INTERVAL_S:
+            return
+        results = self._ordered_results(cr)
+        cr.run["results"] = results
+        cr.run["aggregate"] = aggregate_results(cr.task, results, cr.model, wall_s=now - cr.started)
+        with cr.out_path.open("w", encoding="utf-8") as f:
+            json.dump(cr.run, f, indent=2)
+        leaderboard.upsert(cr.run, cr.out_path)
+        cr.last_checkpoint = time.perf_counter()
+
+    def _finalize(self, cr: CoordinatedRun, status: str, stop_reason: Optional[str] = None):
+        self._runs.pop(cr.run_id, None)
+        for lease_id in cr.leases:
+            self._leases.pop(lease_id, None)
+        results = self._ordered_results(cr)
+        if cr.task.finalize:
+            cr.task.finalize(cr.samples, results)
+        cr.run["status"] = status
+        if stop_reason:
+            cr.run["stop_reason"] = stop_reason
+        cr.run["results"] = results
+        cr.run["aggregate"] = aggregate_results(cr.task, results, cr.model, wall_s=time.perf_counter() - cr.started)
+        cr.run["ended_at"] = datetime.now(timezone.utc).isoformat()
+        with cr.out_path.open("w", encoding="utf-8") as f:
+            json.dump(cr.run, f, indent=2)
+        leaderboard.upsert(cr.run, cr.out_path)
+        run_state.complete_run(cr.run_id, status=status)
+
+
+# Global singleton instance
+coordinator = Coordinator()
@@ -0,0 +1,175 @@
+"""
+Input reduction for long Stage 1 series.
+
+Long series make prompts expensive or overflow the context window. A reduction rewrites
+what the model sees before the prompt is built:
+
+- ``lttb``: Largest-Triangle-Three-Buckets downsampling to ``points`` original points
+- ``envelope``: ``points`` consecutive windows, each as count/min/max/mean
+- ``chunked``: map-reduce; every ``chunk_size`` points are prompted separately and the
+  partial statistics are combined (count-weighted mean, min of minima, max of maxima)
+
+The ground truth still comes from the full series. The prepared sample carries a
+``reduction`` record so the scorer can report the error the reduction alone introduces
+and the prompt characters it saved.
+"""
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import math
+
+import numpy as np
+
+from ..metrics.telemetry_literacy import parse_prediction, series_stats
+
+MODES = ("none", "lttb", "envelope", "chunked")
+
+
+@dataclass
+class InputReduction:
+    """How ``runner.run_telemetry_literacy`` shrinks series longer than ``min_length``."""
+    mode: str = "lttb"
+    points: int = 256  # lttb: points kept; envelope: windows
+    chunk_size: int = 1000  # chunked: points per prompt
+    min_length: Optional[int] = None  # shorter series are sent whole; default: points (chunk_size when chunked)
+
+    def __post_init__(self):
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown reduction mode '{self.mode}'; use one of {', '.join(MODES)}")
+        if self.points < 3:
+            raise ValueError("Reduction needs points >= 3")
+        if self.chunk_size < 1:
+            raise ValueError("Reduction needs chunk_size >= 1")
+        if self.min_length is None:
+            self.min_length = self.chunk_size if self.mode == "chunked" else self.points
+
+    def describe(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the ``n_out`` points Largest-Triangle-Three-Buckets keeps (first and last included)."""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # The third triangle vertex is the average of the next bucket (the last point for the last bucket)
+        nxt = slice(edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else slice(n - 1, n)
+        avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def envelope(values: np.ndarray, windows: int) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Window start indices and per-window count/min/max/mean of ``windows`` near-equal windows."""
+    n = len(values)
+    size = math.ceil(n / windows)
+    starts = np.arange(0, n, size)
+    counts = np.diff(np.append(starts, n))
+    return starts, {
+        "count": counts,
+        "min": np.minimum.reduceat(values, starts),
+        "max": np.maximum.reduceat(values, starts),
+        "mean": np.add.reduceat(values, starts) / counts,
+    }
+
+
+def _fmt(x: float) -> str:
+    return f"{x:.10g}"
+
+
+def reduce_sample(sample: Dict[str, Any], reduction: InputReduction, build_prompt: Callable[[Dict[str, Any]], str]) -> Dict[str, Any]:
+    """
+    The sample as the model sees it: the original fields plus ``reduced`` (the representation)
+    and ``reduction`` (mode, sizes, prompt characters, statistics of the representation).
+    """
+    values = [float(v) for v in sample.get("values") or []]
+    n = len(values)
+    timestamps = list(sample.get("timestamps") or range(n))
+    mode = reduction.mode if n > reduction.min_length else "none"
+    y = np.asarray(values, dtype=float)
+
+    if mode == "lttb":
+        keep = lttb_indices(np.asarray(timestamps, dtype=float), y, reduction.points)
+        reduced = {"timestamps": [timestamps[i] for i in keep], "values": [values[i] for i in keep]}
+        stats, points_out = series_stats(reduced["values"]), len(keep)
+    elif mode == "envelope":
+        starts, windows = envelope(y, reduction.points)
+        ends = np.append(starts[1:], n) - 1
+        reduced = {
+            "t_start": [timestamps[i] for i in starts],
+            "t_end": [timestamps[i] for i in ends],
+            **{k: v.tolist() for k, v in windows.items()},
+        }
+        stats = {
+            "mean": float(np.dot(windows["count"], windows["mean"]) / n),
+            "min": float(windows["min"].min()),
+            "max": float(windows["max"].max()),
+        }
+        points_out = len(starts)
+    elif mode == "chunked":
+        starts = range(0, n, reduction.chunk_size)
+        reduced = {"chunks": [{"timestamps": timestamps[i:i + reduction.chunk_size], "values": values[i:i + reduction.chunk_size]} for i in starts]}
+        # Partial statistics combine exactly
+        stats, points_out = series_stats(values), n
+    else:
+        reduced, stats, points_out = {}, series_stats(values), n
+
+    prepared = {**sample, "reduced": reduced}
+    prepared["reduction"] = {"mode": mode, "points_in": n, "points_out": points_out, "statistics": stats}
+    prompt = build_reduced_prompt(prepared, build_prompt)
+    prepared["reduction"]["prompt_chars"] = sum(len(p) for p in prompt) if isinstance(prompt, list) else len(prompt)
+    prepared["reduction"]["full_prompt_chars"] = len(build_prompt(sample)) if mode != "none" else prepared["reduction"]["prompt_chars"]
+    return prepared
+
+
+def build_reduced_prompt(sample: Dict[str, Any], build_prompt: Callable[..., str]):
+    """Prompt for a prepared sample; a list of prompts (one per chunk) in chunked mode."""
+    reduction = sample.get("reduction") or {}
+    mode, reduced, n = reduction.get("mode", "none"), sample.get("reduced") or {}, reduction.get("points_in")
+    if mode == "lttb":
+        # The note goes after the base prompt's static instructions so the shared prefix stays intact
+        return build_prompt(reduced, context=(
+            f"The series below keeps {len(reduced['values'])} of the {n} points of a longer series, chosen with a "
+            "shape-preserving downsampling method (first and last points kept). Answer for the full series.\n"
+        ))
+    if mode == "envelope":
+        rows = "\n".join(
+            " ".join(_fmt(reduced[k][i]) for k in ("t_start", "t_end")) + f" {reduced['count'][i]} "
+            + " ".join(_fmt(reduced[k][i]) for k in ("min", "max", "mean"))
+            for i in range(len(reduced["count"]))
+        )
+        return (
+            "A numeric time series is summarized in consecutive windows. "
+            "Compute these statistics of the full series and return only:\n"
+            "mean=<float> min=<float> max=<float>\n"
+            "Output format: mean=<float> min=<float> max=<float>\n"
+            "Windows, one per line as: t_start t_end count min max mean\n"
+            f"Series of {n} points in {len(reduced['count'])} windows:\n"
+            f"{rows}"
+        )
+    if mode == "chunked":
+        return [build_prompt(chunk) for chunk in reduced["chunks"]]
+    return build_prompt(sample)
+
+
+def combine_chunk_answers(sample: Dict[str, Any], texts: List[str]) -> str:
+    """One prediction from per-chunk answers; a statistic is left out unless every chunk answered it."""
+    partials = [parse_prediction(t) for t in texts]
+    counts = [len(c["values"]) for c in (sample.get("reduced") or {}).get("chunks", [])]
+    out = []
+    if partials and all("mean" in p for p in partials):
+        out.append(f"mean={sum(p['mean'] * c for p, c in zip(partials, counts)) / max(1, sum(counts))}")
+    if partials and all("min" in p for p in partials):
+        out.append(f"min={min(p['min'] for p in partials)}")
+    if partials and all("max" in p for p in partials):
+        out.append(f"max={max(p['max'] for p in partials)}")
+    return " ".join(out)
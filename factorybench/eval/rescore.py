@@ -0,0 +1,170 @@
+"""
+Offline re-scoring of stored runs.
+
+When a stage's scoring or aggregation changes, stored runs keep the metrics they were
+written with. ``rescore_runs`` parses every saved ``prediction_text`` again with the
+current stage task and recomputes the aggregate from the stored usage and timings, so no
+model is called and nothing is spent. Run files are spread over a process pool.
+
+Each rewritten run is stamped with ``scoring_version``. Runs already at
+``SCORING_VERSION`` are skipped unless ``force`` is set, and re-scoring is deterministic,
+so running it again changes nothing. Files are replaced atomically: readers see the old
+run or the new one, never a partial write. Runs still in progress are left alone.
+"""
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..config import RUN_DIR
+from ..leaderboard import leaderboard
+from .runner import SCORING_VERSION, TASKS, aggregate_results, rescore_result
+from .subsets import estimate_full_performance
+
+# Stored aggregate keys the results cannot reproduce. Throughput was measured against the
+# unrounded wall clock; the early-stopping summary describes the run as it was stopped.
+KEPT_AGGREGATE_KEYS = ("samples_per_sec", "tokens_per_sec")
+EARLY_STOP_PREFIX = "early_stop_"
+EARLY_STOP_CI_SUFFIXES = ("_ci_low", "_ci_high", "_ci_half_width")
+
+
+def write_run_atomic(run: Dict[str, Any], path: Path):
+    """Write ``run`` to a temporary file next to ``path`` and move it into place."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def rescore_run(run: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Score a run's stored predictions again with the current metrics.
+
+    Args:
+        run: A run file's content; updated in place
+
+    Returns:
+        The run, with new per-sample metrics and aggregate and the current ``scoring_version``
+
+    Raises:
+        ValueError: If the run's stage is unknown
+    """
+    task = TASKS.get(run.get("stage"))
+    if task is None:
+        raise ValueError(f"Unknown stage '{run.get('stage')}'")
+    results = run.get("results") or []
+    for r in results:
+        rescore_result(task, r)
+    if task.finalize:
+        task.finalize(results, results)
+    old = run.get("aggregate") or {}
+    agg = aggregate_results(task, results, run.get("model"), wall_s=old.get("wall_s"))
+    full_estimate = estimate_full_performance((run.get("dataset") or {}).get("dataset_id"), results)
+    if full_estimate is not None:
+        agg["performance_full_estimate"] = full_estimate
+    run["aggregate"] = {**agg, **_kept_aggregate(old)}
+    run["scoring_version"] = SCORING_VERSION
+    run["rescored_at"] = datetime.now(timezone.utc).isoformat()
+    return run
+
+
+def _kept_aggregate(old: Dict[str, Any]) -> Dict[str, Any]:
+    """The allowlisted part of a stored aggregate; everything else is recomputed."""
+    early_stopped = "early_stop_reason" in old
+    return {
+        key: value
+        for key, value in old.items()
+        if key in KEPT_AGGREGATE_KEYS
+        or (early_stopped and (key.startswith(EARLY_STOP_PREFIX) or key.endswith(EARLY_STOP_CI_SUFFIXES)))
+    }
+
+
+def _rescore_file(path: Path, force: bool) -> Dict[str, Any]:
+    with path.open("r", encoding="utf-8") as f:
+        run = json.load(f)
+    outcome: Dict[str, Any] = {"run_id": run.get("run_id", path.stem)}
+    if run.get("status") == "running":
+        return {**outcome, "status": "skipped", "reason": "running"}
+    if not force and run.get("scoring_version", 0) >= SCORING_VERSION:
+        return {**outcome, "status": "skipped", "reason": "current"}
+    try:
+        task = TASKS[run.get("stage")]
+    except KeyError:
+        return {**outcome, "status": "skipped", "reason": f"unknown stage {run.get('stage')}"}
+    before = (run.get("aggregate") or {}).get(task.primary_metric)
+    rescore_run(run)
+    write_run_atomic(run, path)
+    run.pop("results", None)
+    return {
+        **outcome,
+        "status": "rescored",
+        "metric": task.primary_metric,
+        "before": before,
+        "after": run["aggregate"].get(task.primary_metric),
+        # The leaderboard row, without the results, for the parent process to index
+        "run": run,
+    }
+
+
+def _rescore_file_safe(path: Path, force: bool) -> Dict[str, Any]:
+    try:
+        return _rescore_file(path, force)
+    except Exception as e:
+        return {"run_id": path.stem, "status": "failed", "error": f"{type(e).__name__}: {e}"}
+
+
+def run_files(run_ids: Optional[Iterable[str]] = None, run_dir: Optional[Path] = None) -> List[Path]:
+    """Run files in ``run_dir``'s top level (shard files moved aside by a merge are not included)."""
+    run_dir = Path(run_dir or RUN_DIR)
+    if run_ids:
+        return [run_dir / f"{run_id}.json" for run_id in run_ids]
+    return sorted(run_dir.glob("*.json"))
+
+
+def rescore_runs(
+    run_ids: Optional[Iterable[str]] = None,
+    run_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Re-score stored runs in parallel and update the leaderboard view.
+
+    Args:
+        run_ids: Runs to re-score; None re-scores every run file in ``run_dir``
+        run_dir: Directory of run files (default: ``RUN_DIR``)
+        workers: Processes; 1 scores in this process, None uses every CPU
+        force: Also re-score runs already at ``SCORING_VERSION``
+
+    Returns:
+        ``{"scoring_version", "rescored", "skipped", "failed", "wall_s", "runs": [...]}``
+        with one outcome per rescored or failed run
+    """
+    started = time.perf_counter()
+    paths = run_files(run_ids, run_dir)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) <= 1:
+        outcomes = [_rescore_file_safe(p, force) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            outcomes = list(pool.map(_rescore_file_safe, paths, [force] * len(paths), chunksize=max(1, len(paths) // (4 * workers))))
+
+    for path, outcome in zip(paths, outcomes):
+        run = outcome.pop("run", None)
+        if run is not None:
+            leaderboard.upsert(run, path)
+    counts = {status: sum(1 for o in outcomes if o["status"] == status) for status in ("rescored", "skipped", "failed")}
+    return {
+        "scoring_version": SCORING_VERSION,
+        **counts,
+        "wall_s": round(time.perf_counter() - started, 3),
+        "runs": [o for o in outcomes if o["status"] != "skipped"],
+    }
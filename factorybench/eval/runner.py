@@ -1,37 +1,391 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
+from dataclasses import dataclass, replace
+from functools import partial
 from datetime import datetime, timezone
 import json
+import time
 from pathlib import Path
 
-from ..config import RUN_DIR, AZURE_PRICING, MAX_COST_PER_RUN, MAX_COST_PER_DAY
+from ..config import RUN_DIR, AZURE_PRICING, MAX_COST_PER_RUN, MAX_COST_PER_DAY, CHECKPOINT_INTERVAL_S
 from ..adapters.base import ModelAdapter
-from ..metrics.telemetry_literacy import score_sample, aggregate
+from ..adapters.hedged import HEDGE_USAGE_KEYS
+from ..metrics.telemetry_literacy import score_sample, aggregate, sample_performance, answer_complete, vote_prediction, ERROR_KEYS
+from ..metrics import root_cause_analysis as rca
+from ..metrics.sequential import EarlyStopping, SequentialMonitor
+from ..metrics.timing import summarize_timings
 from ..state import run_state
+from ..leaderboard import leaderboard
+from ..profiling import NULL_PROFILER
+from .subsets import estimate_full_performance
+from .consistency import completion_variance, summarize_consistency
+from .reduction import InputReduction, reduce_sample, build_reduced_prompt, combine_chunk_answers
+from .serializers import Serializer, serialize_repr, get_serializer
+from ..monitoring import SAMPLES_PROCESSED, SAMPLE_GENERATE_SECONDS, TOKENS, COST_USD
 
 
-def build_prompt(sample: Dict[str, Any]) -> str:
+# Bump whenever a stage's score or aggregate changes; 'factorybench runs rescore' updates
+# stored runs with an older version from their saved predictions
+SCORING_VERSION = 1
+
+# Prompts put every instruction before the sample data, so all requests of a stage share
+# one static prefix that providers can serve from their prompt cache
+TL_PROMPT_PREFIX = (
+    "You are given a numeric time series with timestamps. Compute and return only these values:\n"
+    "mean=<float> min=<float> max=<float>\n"
+    "Output format: mean=<float> min=<float> max=<float>\n"
+)
+
+RCA_PROMPT_PREFIX = (
+    "You are given one reading per minute from each sensor of an industrial system.\n"
+    "Find the root cause of any anomaly. Use minute indices starting at 0 and an exclusive end; "
+    "answer component \"None\", metric \"None\", start -1 and end -1 for normal operation.\n"
+    'Output format: {"component": "<component>", "metric": "<quantity>", "start": <int>, "end": <int>}\n'
+)
+
+
+def build_prompt(sample: Dict[str, Any], serialize: Serializer = serialize_repr, context: str = "") -> str:
+    """Stage 1 prompt; ``context`` (e.g. how the series was reduced) goes after the static prefix."""
     values = sample.get("values", [])
     timestamps = sample.get("timestamps", [])
     
+    return f"{TL_PROMPT_PREFIX}{context}{serialize(timestamps, values)}"
+
+
+def build_rca_prompt(sample: Dict[str, Any]) -> str:
+    meta = sample.get("meta", {})
+    series = "\n".join(
+        f"{name}: {[round(v, 2) for v in values]}" for name, values in sample.get("metrics", {}).items()
+    )
+    return f"{RCA_PROMPT_PREFIX}Topology: {meta.get('topology', 'unknown')}\n{series}"
+
+
+def input_cost(model_name: str, prompt_tokens: int, cached_tokens: int = 0) -> float:
+    """USD for ``prompt_tokens`` of which ``cached_tokens`` were prompt-cache hits."""
+    pricing = AZURE_PRICING.get(model_name, {})
+    input_rate = pricing.get("input_per_1k", 0.0)
+    cached = min(cached_tokens, prompt_tokens)
+    return ((prompt_tokens - cached) * input_rate + cached * pricing.get("cached_input_per_1k", input_rate)) / 1000.0
+
+
+def output_cost(model_name: str, completion_tokens: int) -> float:
+    return completion_tokens * AZURE_PRICING.get(model_name, {}).get("output_per_1k", 0.0) / 1000.0
+
+
+def hedge_cost(model_name: str, usage: Dict[str, Any]) -> float:
+    """USD spent on duplicate requests sent by ``HedgedAdapter``, billed at the full input rate."""
+    return input_cost(model_name, usage.get("hedge_prompt_tokens") or 0) + output_cost(model_name, usage.get("hedge_completion_tokens") or 0)
+
+
+def usage_cost(model_name: str, usage: Dict[str, Any]) -> float:
+    """USD for one result item's usage, hedged duplicates included."""
     return (
-        "You are given a numeric time series with timestamps. Compute and return only these values:\n"
-        "mean=<float> min=<float> max=<float>\n"
-        f"Timestamps: {timestamps}\n"
-        f"Values: {values}\n"
-        "Output format: mean=<float> min=<float> max=<float>"
+        input_cost(model_name, usage.get("prompt_tokens") or 0, usage.get("cached_tokens") or 0)
+        + output_cost(model_name, usage.get("completion_tokens") or 0)
+        + hedge_cost(model_name, usage)
+    )
+
+
+def _tl_result(s: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": s.get("id"),
+        "values": s.get("values"),
+        "timestamps": s.get("timestamps"),
+        "domain": s.get("domain"),
+        "subtype": s.get("subtype"),
+        "statistics": s.get("statistics"),
+    }
+
+
+def _rca_result(s: Dict[str, Any]) -> Dict[str, Any]:
+    # Sensor series are not copied into the run file; they dominate its size
+    return {"id": s.get("id"), "ground_truth": s.get("ground_truth")}
+
+
+def _rca_aggregate(samples: List[Dict[str, Any]], scores: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ground_truths = [s.get("ground_truth", {}) for s in samples[:len(scores)]]
+    return rca.score_run(ground_truths, scores)["aggregate"]
+
+
+def _tl_sample_values(sample: Dict[str, Any], sc: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    values = {f"{k}_mean": sc.get(k) for k in ERROR_KEYS}
+    # Matches the aggregate's performance whenever every sample parsed completely
+    values["performance"] = sample_performance(sc)
+    return values
+
+
+def _rca_sample_values(sample: Dict[str, Any], prediction: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    scored = rca.score_arrays(rca.ground_truth_arrays([sample.get("ground_truth") or {}]), rca.prediction_arrays([prediction]))
+    return {f"{k}_accuracy": float(scored[f"{k}_correct"][0]) for k in ("detection", "component", "metric")}
+
+
+def _rca_finalize(samples: List[Dict[str, Any]], results: List[Dict[str, Any]]):
+    """Attach vectorized per-sample RCA scores to the results."""
+    if not results:
+        return
+    scored = rca.score_run([r["ground_truth"] or {} for r in results], [r["metrics"] for r in results])["scores"]
+    columns = {k: v.tolist() for k, v in scored.items()}
+    for i, r in enumerate(results):
+        for k, col in columns.items():
+            value = col[i]
+            r["metrics"][k] = None if isinstance(value, float) and value != value else value
+
+
+@dataclass
+class StageTask:
+    """How a stage prompts, scores and aggregates; the evaluation loop is shared."""
+    stage: str
+    run_id_prefix: str
+    build_prompt: Callable[[Dict[str, Any]], str]
+    # (sample, prediction_text) -> per-sample metrics stored in results
+    score: Callable[[Dict[str, Any], str], Dict[str, Any]]
+    # (samples, per-sample metrics) -> quality part of the aggregate
+    aggregate: Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], Dict[str, Any]]
+    # sample -> fields copied into its result item
+    result_fields: Callable[[Dict[str, Any]], Dict[str, Any]]
+    # (samples, results) -> None; runs once before the final save
+    finalize: Optional[Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], None]] = None
+    # (sample, per-sample metrics) -> one value per aggregate key whose mean it estimates;
+    # drives early stopping
+    sample_values: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Optional[float]]]] = None
+    # aggregate key ranked against a reference run
+    primary_metric: str = "performance"
+    higher_is_better: bool = False
+    # known width of the sample_values range; None uses the observed range
+    sample_value_range: Optional[float] = None
+    # sample -> sample as the model sees it (input reduction); build_prompt and score get the result
+    prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    # (sample, answers) -> one prediction text, when build_prompt returns several prompts
+    combine: Optional[Callable[[Dict[str, Any], List[str]], str]] = None
+    # answer text so far -> True once it is complete; streaming adapters stop reading there
+    answer_complete: Optional[Callable[[str], bool]] = None
+    # completions of one prompt -> one voted prediction text
+    vote: Optional[Callable[[List[str]], str]] = None
+    # completions requested per prompt (the API's n); each is scored, see eval/consistency.py
+    samples_per_prompt: int = 1
+
+
+TELEMETRY_LITERACY = StageTask(
+    stage="telemetry_literacy",
+    run_id_prefix="tl",
+    build_prompt=build_prompt,
+    score=score_sample,
+    aggregate=lambda samples, scores: aggregate(scores),
+    result_fields=_tl_result,
+    sample_values=_tl_sample_values,
+    answer_complete=answer_complete,
+    vote=vote_prediction,
+)
+
+ROOT_CAUSE_ANALYSIS = StageTask(
+    stage="root_cause_analysis",
+    run_id_prefix="rca",
+    build_prompt=build_rca_prompt,
+    score=lambda sample, text: rca.parse_prediction(text),
+    aggregate=_rca_aggregate,
+    result_fields=_rca_result,
+    finalize=_rca_finalize,
+    sample_values=_rca_sample_values,
+    answer_complete=rca.answer_complete,
+    vote=rca.vote_prediction,
+    primary_metric="component_accuracy",
+    higher_is_better=True,
+    sample_value_range=1.0,
+)
+
+
+TASKS = {task.stage: task for task in (TELEMETRY_LITERACY, ROOT_CAUSE_ANALYSIS)}
+
+
+def with_prompt_format(task: StageTask, spec: str) -> StageTask:
+    """``task`` rendering series with the ``serializers`` format ``spec`` (Stage 1 only)."""
+    if task.stage != TELEMETRY_LITERACY.stage:
+        raise ValueError(f"Stage {task.stage} does not support prompt formats")
+    return replace(task, build_prompt=partial(build_prompt, serialize=get_serializer(spec)))
+
+
+def with_reduction(task: StageTask, reduction: InputReduction) -> StageTask:
+    """``task`` with its series reduced before prompting (Stage 1 only)."""
+    if task.stage != TELEMETRY_LITERACY.stage:
+        raise ValueError(f"Stage {task.stage} does not support input reduction")
+    result_fields = task.result_fields
+    return replace(
+        task,
+        # Results keep the reduction so they can be scored again offline
+        result_fields=lambda s: {**result_fields(s), "reduction": s.get("reduction")},
+        prepare=partial(reduce_sample, reduction=reduction, build_prompt=task.build_prompt),
+        build_prompt=partial(build_reduced_prompt, build_prompt=task.build_prompt),
+        combine=combine_chunk_answers,
     )
 
 
+def with_samples_per_prompt(task: StageTask, k: int) -> StageTask:
+    """``task`` asking for ``k`` completions of every prompt and scoring each."""
+    if k < 1:
+        raise ValueError("samples_per_prompt must be >= 1")
+    if k > 1 and task.vote is None:
+        raise ValueError(f"Stage {task.stage} does not support several completions per prompt")
+    return replace(task, samples_per_prompt=k)
+
+
+def _completion_texts(gen: Dict[str, Any]) -> List[str]:
+    # Adapters that ignore n return a single text
+    return gen.get("texts") or [gen.get("text", "")]
+
+
+def _score_completions(task: StageTask, sample: Dict[str, Any], predictions: List[str]) -> Dict[str, Any]:
+    scores = [task.score(sample, p) for p in predictions]
+    vote_text = task.vote(predictions)
+    out: Dict[str, Any] = {
+        "completions": [{"prediction_text": p, "metrics": m} for p, m in zip(predictions, scores)],
+        "vote": {"prediction_text": vote_text, "metrics": task.score(sample, vote_text)},
+    }
+    if task.sample_values:
+        out["completion_variance"] = completion_variance([task.sample_values(sample, m) for m in scores])
+    return out
+
+
+def evaluate_sample(task: StageTask, sample: Dict[str, Any], adapter: ModelAdapter) -> Dict[str, Any]:
+    """Prompt, generate and score one sample; returns its result item with usage and timing."""
+    t_start = time.perf_counter()
+    if task.prepare:
+        sample = task.prepare(sample)
+    prompt = task.build_prompt(sample)
+    t_prompt = time.perf_counter()
+    parts = None
+    k = task.samples_per_prompt
+    if isinstance(prompt, list):
+        # Map-reduce: one call per part, answers combined into a single prediction per completion
+        gens = [adapter.generate(p, until=task.answer_complete, n=k) for p in prompt]
+        answers = [_completion_texts(g) for g in gens]
+        parts = [a[0] for a in answers]
+        predictions = [task.combine(sample, [a[j] for a in answers]) for j in range(min(len(a) for a in answers))]
+    else:
+        gens = [adapter.generate(prompt, until=task.answer_complete, n=k)]
+        predictions = _completion_texts(gens[0])
+    pred_text = predictions[0]
+    usages = [g.get("usage", {}) or {} for g in gens]
+    prompt_tokens = sum(u.get("prompt_tokens") or 0 for u in usages)
+    cached_tokens = sum(u.get("cached_tokens") or 0 for u in usages)
+    completion_tokens = sum(u.get("completion_tokens") or 0 for u in usages)
+    all_tokens = sum(u.get("total_tokens") or 0 for u in usages) or (prompt_tokens + completion_tokens)
+    hedging = _hedge_totals(usages)
+    streams = [g["stream"] for g in gens if g.get("stream")]
+    t_generate = time.perf_counter()
+    sc = task.score(sample, pred_text)
+    completions = _score_completions(task, sample, predictions) if k > 1 else {}
+    t_score = time.perf_counter()
+    return {
+        **task.result_fields(sample),
+        **({"prediction_parts": parts} if parts is not None else {}),
+        "prediction_text": pred_text,
+        "metrics": sc,
+        **completions,
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": all_tokens,
+            **(hedging if hedging["hedges"] else {}),
+        },
+        "timing": {
+            "build_prompt_ms": (t_prompt - t_start) * 1000.0,
+            "generate_ms": (t_generate - t_prompt) * 1000.0,
+            "score_ms": (t_score - t_generate) * 1000.0,
+            "persist_ms": 0.0,
+            **(_stream_timing(streams) if streams else {}),
+        },
+    }
+
+
+def rescore_result(task: StageTask, result: Dict[str, Any]):
+    """Score a stored result item's predictions again in place; usage and timing are kept."""
+    old = result.get("metrics") or {}
+    result["metrics"] = task.score(result, result.get("prediction_text") or "")
+    if old.get("reduction") and "reduction" not in result:
+        # Reduced runs from before results kept the reduction: its input-side metrics do not
+        # depend on the prediction, so the stored ones still hold
+        result["metrics"].update({k: v for k, v in old.items() if k == "reduction" or k.startswith("reduction_") or k.endswith("prompt_chars")})
+    if result.get("completions"):
+        result.update(_score_completions(task, result, [c.get("prediction_text") or "" for c in result["completions"]]))
+
+
+def _stream_timing(streams: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Time to first token of the sample's first call, inter-token latency over all calls."""
+    timing = {"stream_cutoff": float(any(s.get("cutoff") for s in streams))}
+    if streams[0].get("ttft_ms") is not None:
+        timing["ttft_ms"] = streams[0]["ttft_ms"]
+    itls = [s["itl_ms"] for s in streams if s.get("itl_ms") is not None]
+    if itls:
+        timing["itl_ms"] = sum(itls) / len(itls)
+    return timing
+
+
+def _hedge_totals(usages: List[Dict[str, Any]]) -> Dict[str, int]:
+    return {key: sum(u.get(key) or 0 for u in usages) for key in HEDGE_USAGE_KEYS}
+
+
 def run_telemetry_literacy(
     samples: List[Dict[str, Any]],
     adapter: ModelAdapter,
     model_name: str,
     dataset_meta: Dict[str, Any],
     run_id: Optional[str] = None,
+    run_dir: Optional[Path] = None,
+    profiler=None,
+    early_stopping: Optional[EarlyStopping] = None,
+    reduction: Optional[InputReduction] = None,
+    prompt_format: Optional[str] = None,
+    samples_per_prompt: int = 1,
+) -> Dict[str, Any]:
+    task = TELEMETRY_LITERACY
+    if prompt_format and prompt_format != "repr":
+        task = with_prompt_format(task, prompt_format)
+        dataset_meta = {**dataset_meta, "prompt_format": prompt_format}
+    if reduction:
+        task = with_reduction(task, reduction)
+        dataset_meta = {**dataset_meta, "reduction": reduction.describe()}
+    if samples_per_prompt > 1:
+        task = with_samples_per_prompt(task, samples_per_prompt)
+        dataset_meta = {**dataset_meta, "samples_per_prompt": samples_per_prompt}
+    return run_stage(task, samples, adapter, model_name, dataset_meta, run_id=run_id, run_dir=run_dir, profiler=profiler,
+                     early_stopping=early_stopping)
+
+
+def run_root_cause_analysis(
+    samples: List[Dict[str, Any]],
+    adapter: ModelAdapter,
+    model_name: str,
+    dataset_meta: Dict[str, Any],
+    run_id: Optional[str] = None,
+    run_dir: Optional[Path] = None,
+    profiler=None,
+    early_stopping: Optional[EarlyStopping] = None,
+    samples_per_prompt: int = 1,
+) -> Dict[str, Any]:
+    task = ROOT_CAUSE_ANALYSIS
+    if samples_per_prompt > 1:
+        task = with_samples_per_prompt(task, samples_per_prompt)
+        dataset_meta = {**dataset_meta, "samples_per_prompt": samples_per_prompt}
+    return run_stage(task, samples, adapter, model_name, dataset_meta, run_id=run_id, run_dir=run_dir, profiler=profiler,
+                     early_stopping=early_stopping)
+
+
+def run_stage(
+    task: StageTask,
+    samples: List[Dict[str, Any]],
+    adapter: ModelAdapter,
+    model_name: str,
+    dataset_meta: Dict[str, Any],
+    run_id: Optional[str] = None,
+    run_dir: Optional[Path] = None,
+    profiler=None,
+    early_stopping: Optional[EarlyStopping] = None,
 ) -> Dict[str, Any]:
     started = datetime.now(timezone.utc)
     if run_id is None:
-        run_id = started.strftime("tl-%Y%m%dT%H%M%S")
+        run_id = started.strftime(f"{task.run_id_prefix}-%Y%m%dT%H%M%S")
+    profiler = profiler or NULL_PROFILER
+    monitor = start_monitor(task, early_stopping, run_dir) if early_stopping else None
     
     # Initialize progress tracking
     progress = run_state.start_run(run_id, total_samples=len(samples))
@@ -44,10 +398,12 @@ def run_telemetry_literacy(
     
     results: List[Dict[str, Any]] = []
     scores: List[Dict[str, Any]] = []
+    timings: List[Dict[str, float]] = []
     
     # Persist initial running state
-    RUN_DIR.mkdir(parents=True, exist_ok=True)
-    out_path = Path(RUN_DIR) / f"{run_id}.json"
+    run_dir = Path(run_dir or RUN_DIR)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    out_path = run_dir / f"{run_id}.json"
     
     # Load existing run if it exists (from API initial creation), otherwise use skeleton
     if out_path.exists():
@@ -56,7 +412,7 @@ def run_telemetry_literacy(
     else:
         run = {
             "run_id": run_id,
-            "stage": "telemetry_literacy",
+            "stage": task.stage,
             "model": model_name,
             "version": "0.1.0",
         }
@@ -68,22 +424,27 @@ def run_telemetry_literacy(
         "results": [],
         "aggregate": {},
         "status": "running",
+        "scoring_version": SCORING_VERSION,
     })
     # Explicitly remove loading_stage
     run.pop("loading_stage", None)
+    if profiler.enabled:
+        run["profile"] = str(profiler.output_dir)
     
-    with out_path.open("w", encoding="utf-8") as f:
+    with profiler.phase("persistence"), out_path.open("w", encoding="utf-8") as f:
         json.dump(run, f, indent=2)
+    leaderboard.upsert(run, out_path)
 
     total_prompt_tokens = 0
+    total_cached_tokens = 0
     total_completion_tokens = 0
     total_tokens = 0
+    hedge_totals = dict.fromkeys(HEDGE_USAGE_KEYS, 0)
     cost_total = 0.0
     
-    # Get pricing info
-    pricing = AZURE_PRICING.get(model_name, {})
-    input_rate = pricing.get("input_per_1k", 0.0)
-    output_rate = pricing.get("output_per_1k", 0.0)
+    last_checkpoint = None
+    loop_started = time.perf_counter()
+    profiler.start("evaluation_loop")
 
     try:
         for idx, s in enumerate(samples):
@@ -104,52 +465,60 @@ def run_telemetry_literacy(
                 run["stop_reason"] = f"Daily cost limit reached: ${daily_cost + cost_total:.2f} >= ${MAX_COST_PER_DAY}"
                 break
             
-            prompt = build_prompt(s)
-            gen = adapter.generate(prompt)
-            pred_text = gen.get("text", "")
-            usage = gen.get("usage", {}) or {}
-            prompt_tokens = usage.get("prompt_tokens") or 0
-            completion_tokens = usage.get("completion_tokens") or 0
-            all_tokens = usage.get("total_tokens") or (prompt_tokens + completion_tokens)
+            result_item = evaluate_sample(task, s, adapter)
+            sc = result_item["metrics"]
+            timing = result_item["timing"]
+            prompt_tokens = result_item["usage"]["prompt_tokens"]
+            cached_tokens = result_item["usage"]["cached_tokens"]
+            completion_tokens = result_item["usage"]["completion_tokens"]
             
             total_prompt_tokens += prompt_tokens
+            total_cached_tokens += cached_tokens
             total_completion_tokens += completion_tokens
-            total_tokens += all_tokens
+            total_tokens += result_item["usage"]["total_tokens"]
+            for key in HEDGE_USAGE_KEYS:
+                hedge_totals[key] += result_item["usage"].get(key, 0)
             
-            # Update cost after each sample
-            cost_input = (total_prompt_tokens / 1000.0) * input_rate
-            cost_output = (total_completion_tokens / 1000.0) * output_rate
-            cost_total = cost_input + cost_output
-
-            sc = score_sample(s, pred_text)
-            scores.append(sc)
+            # Update cost after each sample; hedged duplicates count against the limits too
+            sample_cost = usage_cost(model_name, result_item["usage"])
+            cost_total += sample_cost
+            
+            SAMPLES_PROCESSED.inc(model=model_name)
+            SAMPLE_GENERATE_SECONDS.observe(timing["generate_ms"] / 1000.0, model=model_name)
+            TOKENS.inc(prompt_tokens, model=model_name, kind="prompt")
+            TOKENS.inc(cached_tokens, model=model_name, kind="cached")
+            TOKENS.inc(completion_tokens, model=model_name, kind="completion")
+            TOKENS.inc(result_item["usage"].get("hedge_prompt_tokens", 0) + result_item["usage"].get("hedge_completion_tokens", 0), model=model_name, kind="hedge")
+            COST_USD.inc(sample_cost, model=model_name)
             
-            result_item = {
-                "id": s.get("id"),
-                "values": s.get("values"),
-                "timestamps": s.get("timestamps"),
-                "domain": s.get("domain"),
-                "subtype": s.get("subtype"),
-                "statistics": s.get("statistics"),
-                "prediction_text": pred_text,
-                "metrics": sc,
-                "usage": {
-                    "prompt_tokens": prompt_tokens,
-                    "completion_tokens": completion_tokens,
-                    "total_tokens": all_tokens,
-                },
-            }
+            scores.append(sc)
+            timings.append(timing)
             
             results.append(result_item)
             
             # Update progress
             run_state.update_progress(run_id, processed_samples=idx + 1, current_cost=cost_total)
             
-            # Save incremental progress after every sample
-            run["results"] = results
-            run["aggregate"] = _compute_aggregate(scores, total_prompt_tokens, total_completion_tokens, total_tokens, cost_total, model_name)
-            with out_path.open("w", encoding="utf-8") as f:
-                json.dump(run, f, indent=2)
+            if monitor and monitor.update(task.sample_values(s, sc)):
+                run["status"] = "completed"
+                run["stop_reason"] = f"Early stop ({monitor.reason}) after {len(results)} of {len(samples)} samples"
+                break
+            
+            # Save incremental progress, at most once per checkpoint interval; rewriting the
+            # whole file after every sample is quadratic in run length
+            now = time.perf_counter()
+            if last_checkpoint is None or now - last_checkpoint >= CHECKPOINT_INTERVAL_S:
+                run["results"] = results
+                run["aggregate"] = _compute_aggregate(task.aggregate(samples, scores), total_prompt_tokens, total_completion_tokens, total_tokens, cost_total, model_name,
+                                                      timings=timings, wall_s=time.perf_counter() - loop_started, total_cached_tokens=total_cached_tokens,
+                                                      hedge_totals=hedge_totals)
+                with profiler.phase("persistence"), out_path.open("w", encoding="utf-8") as f:
+                    json.dump(run, f, indent=2)
+                leaderboard.upsert(run, out_path)
+                # Count the interval from the end of the write so slow writes cannot run back to back
+                last_checkpoint = time.perf_counter()
+                # Persist time is attributed to the sample that triggered the checkpoint
+                timing["persist_ms"] = (last_checkpoint - now) * 1000.0
         
         # Mark as completed if we processed all samples
         if len(results) == len(samples) and run["status"] == "running":
@@ -161,14 +530,26 @@ def run_telemetry_literacy(
         run_state.complete_run(run_id, status="failed", error=str(e))
         raise
     finally:
+        profiler.stop("evaluation_loop")
         # Final aggregate and save
-        agg = _compute_aggregate(scores, total_prompt_tokens, total_completion_tokens, total_tokens, cost_total, model_name)
+        if task.finalize:
+            task.finalize(samples, results)
+        agg = _compute_aggregate(task.aggregate(samples, scores), total_prompt_tokens, total_completion_tokens, total_tokens, cost_total, model_name,
+                                 timings=timings, wall_s=time.perf_counter() - loop_started, total_cached_tokens=total_cached_tokens,
+                                 hedge_totals=hedge_totals)
+        if monitor:
+            agg.update(monitor.summary())
+        agg.update(_consistency_aggregate(task, results, agg, model_name))
+        full_estimate = estimate_full_performance(dataset_meta.get("dataset_id"), results)
+        if full_estimate is not None:
+            agg["performance_full_estimate"] = full_estimate
         run["aggregate"] = agg
         run["results"] = results
         run["ended_at"] = datetime.now(timezone.utc).isoformat()
         
-        with out_path.open("w", encoding="utf-8") as f:
+        with profiler.phase("persistence"), out_path.open("w", encoding="utf-8") as f:
             json.dump(run, f, indent=2)
+        leaderboard.upsert(run, out_path)
         
         # Mark run as complete in state manager
         run_state.complete_run(run_id, status=run["status"])
@@ -176,25 +557,112 @@ def run_telemetry_literacy(
     return run
 
 
+def start_monitor(task: StageTask, rule: EarlyStopping, run_dir: Optional[Path] = None) -> SequentialMonitor:
+    """
+    Build the early-stopping monitor for a run of ``task``.
+
+    Raises:
+        ValueError: If the stage cannot stop early, or the reference run is missing, of
+            another stage, or has no value for the stage's primary metric
+    """
+    if task.sample_values is None:
+        raise ValueError(f"Stage {task.stage} does not support early stopping")
+    reference = None
+    if rule.reference_run:
+        ref_path = Path(run_dir or RUN_DIR) / f"{rule.reference_run}.json"
+        if not ref_path.exists():
+            raise ValueError(f"Reference run '{rule.reference_run}' not found")
+        with ref_path.open("r", encoding="utf-8") as f:
+            ref = json.load(f)
+        ref_agg = ref.get("aggregate") or {}
+        if ref.get("stage") != task.stage or not isinstance(ref_agg.get(task.primary_metric), (int, float)):
+            raise ValueError(f"Reference run '{rule.reference_run}' has no {task.stage} {task.primary_metric} to compare against")
+        # A reference that itself stopped early carries its own uncertainty
+        reference = (float(ref_agg[task.primary_metric]), float(ref_agg.get(f"{task.primary_metric}_ci_half_width", 0.0)))
+    return SequentialMonitor(rule, task.primary_metric, task.higher_is_better, reference, task.sample_value_range)
+
+
 def _compute_aggregate(
-    scores: List[Dict[str, Any]],
+    quality: Dict[str, Any],
     total_prompt_tokens: int,
     total_completion_tokens: int,
     total_tokens: int,
     cost_total: float,
-    model_name: str
+    model_name: str,
+    timings: Optional[List[Dict[str, float]]] = None,
+    wall_s: Optional[float] = None,
+    total_cached_tokens: int = 0,
+    hedge_totals: Optional[Dict[str, int]] = None,
 ) -> Dict[str, Any]:
-    """Compute aggregate metrics from scores and usage."""
-    agg = aggregate(scores)
+    """Combine the stage's quality aggregate with usage, cost and per-sample timings."""
+    agg = dict(quality)
     
     agg["prompt_tokens_total"] = float(total_prompt_tokens)
     agg["completion_tokens_total"] = float(total_completion_tokens)
     agg["total_tokens"] = float(total_tokens)
-    agg["cost_input"] = round((total_prompt_tokens / 1000.0) * AZURE_PRICING.get(model_name, {}).get("input_per_1k", 0.0), 6)
-    agg["cost_output"] = round((total_completion_tokens / 1000.0) * AZURE_PRICING.get(model_name, {}).get("output_per_1k", 0.0), 6)
+    agg["cached_tokens_total"] = float(total_cached_tokens)
+    if total_prompt_tokens:
+        agg["cached_token_rate"] = round(total_cached_tokens / total_prompt_tokens, 4)
+    saved = agg.get("prompt_chars_saved_ratio")
+    if isinstance(saved, float) and saved < 1.0:
+        # Input reduction: prompt tokens the full series would have cost, at this run's chars/token
+        agg["prompt_tokens_saved_est"] = round(total_prompt_tokens * saved / (1.0 - saved), 1)
+    agg["cost_input"] = round(input_cost(model_name, total_prompt_tokens, total_cached_tokens), 6)
+    agg["cost_output"] = round(output_cost(model_name, total_completion_tokens), 6)
+    # What the prompt cache saved against billing every prompt token at the full input rate
+    agg["cost_saved_cache"] = round(input_cost(model_name, total_prompt_tokens) - agg["cost_input"], 6)
+    if hedge_totals and hedge_totals.get("hedges"):
+        # cost_total already includes the duplicates; cost_input + cost_output + cost_hedge == cost_total
+        agg["hedges_total"] = float(hedge_totals["hedges"])
+        agg["hedge_win_rate"] = round(hedge_totals["hedge_wins"] / hedge_totals["hedges"], 4)
+        agg["hedge_tokens_total"] = float(hedge_totals["hedge_prompt_tokens"] + hedge_totals["hedge_completion_tokens"])
+        agg["cost_hedge"] = round(hedge_cost(model_name, hedge_totals), 6)
+        if agg.get("samples"):
+            agg["hedge_rate"] = round(hedge_totals["hedges"] / agg["samples"], 4)
     agg["cost_total"] = round(cost_total, 6)
     
     if agg.get("samples"):
         agg["cost_per_sample"] = round(cost_total / agg["samples"], 6)
     
+    for key, value in summarize_timings(timings or [], wall_s=wall_s, total_tokens=total_tokens).items():
+        agg[key] = round(value, 4)
+    
     return agg
+
+
+def aggregate_results(
+    task: StageTask,
+    results: List[Dict[str, Any]],
+    model_name: str,
+    wall_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Recompute a run aggregate from its stored results, e.g. after merging shards."""
+    usages = [r.get("usage") or {} for r in results]
+    prompt_tokens = sum(u.get("prompt_tokens") or 0 for u in usages)
+    cached_tokens = sum(u.get("cached_tokens") or 0 for u in usages)
+    completion_tokens = sum(u.get("completion_tokens") or 0 for u in usages)
+    total_tokens = sum(u.get("total_tokens") or ((u.get("prompt_tokens") or 0) + (u.get("completion_tokens") or 0)) for u in usages)
+    cost_total = sum(usage_cost(model_name, u) for u in usages)
+    timings = [r["timing"] for r in results if r.get("timing")]
+    # Result items carry the fields the stage aggregates need (e.g. RCA ground truth)
+    quality = task.aggregate(results, [r.get("metrics") or {} for r in results])
+    agg = _compute_aggregate(quality, prompt_tokens, completion_tokens, total_tokens, cost_total, model_name,
+                             timings=timings, wall_s=wall_s, total_cached_tokens=cached_tokens, hedge_totals=_hedge_totals(usages))
+    agg.update(_consistency_aggregate(task, results, agg, model_name))
+    return agg
+
+
+def _consistency_aggregate(task: StageTask, results: List[Dict[str, Any]], agg: Dict[str, Any], model_name: str) -> Dict[str, Any]:
+    """Vote score, mean completion variance and amortized cost of a run with several completions per prompt."""
+    out = summarize_consistency(results)
+    if not out:
+        return out
+    voted = [r for r in results if r.get("vote")]
+    vote_agg = task.aggregate(voted, [r["vote"]["metrics"] for r in voted])
+    if task.primary_metric in vote_agg:
+        out[f"vote_{task.primary_metric}"] = vote_agg[task.primary_metric]
+    completions = sum(len(r.get("completions") or [None]) for r in results)
+    out["cost_per_completion"] = round(agg.get("cost_total", 0.0) / completions, 6)
+    # Input the same completions would have cost as one request each
+    out["cost_saved_by_n"] = round(input_cost(model_name, int(agg.get("prompt_tokens_total", 0))) * (completions - len(results)) / len(results), 6)
+    return out
@@ -0,0 +1,135 @@
+"""
+Numeric serialization formats for Stage 1 prompts.
+
+``repr`` is the original rendering (Python lists at full float precision). The compact
+formats print numbers with at most ``precision`` decimals and no trailing zeros:
+
+- ``fixed``: comma-separated timestamps and values
+- ``csv``: a ``t,value`` table, one row per point
+- ``start_step``: uniform timestamps as ``start=.. step=.. count=..``, values comma-separated
+- ``delta``: ``start_step`` timestamps; the first value, then differences from the previous value
+
+A format is chosen with a spec such as ``fixed`` or ``delta:2`` (two decimals).
+``parse_values`` reads the value series back out of a prompt in any format.
+"""
+from functools import partial
+from typing import Callable, List, Optional, Sequence
+import re
+
+FORMATS = ("repr", "fixed", "csv", "start_step", "delta")
+DEFAULT_PRECISION = 4
+
+_NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_DELTA_LABEL = "Values (first value, then change from the previous value):"
+
+Serializer = Callable[[Sequence[float], Sequence[float]], str]
+
+
+def format_number(x: float, precision: int = DEFAULT_PRECISION) -> str:
+    """``x`` with at most ``precision`` decimals, without trailing zeros or ``.0``."""
+    text = f"{float(x):.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text in ("-0", "") else text
+
+
+def _joined(xs: Sequence[float], precision: int) -> str:
+    return ",".join(format_number(x, precision) for x in xs)
+
+
+def uniform_step(timestamps: Sequence[float]) -> Optional[float]:
+    """The constant step between timestamps, or None if they are not evenly spaced."""
+    if len(timestamps) < 2:
+        return None
+    step = timestamps[1] - timestamps[0]
+    tolerance = 1e-9 * max(1.0, abs(step))
+    for a, b in zip(timestamps, timestamps[1:]):
+        if abs((b - a) - step) > tolerance:
+            return None
+    return step
+
+
+def _timestamps_line(timestamps: Sequence[float], precision: int) -> str:
+    step = uniform_step(timestamps)
+    if step is None:
+        return f"Timestamps: {_joined(timestamps, precision)}"
+    return f"Timestamps: start={format_number(timestamps[0], precision)} step={format_number(step, precision)} count={len(timestamps)}"
+
+
+def serialize_repr(timestamps: Sequence[float], values: Sequence[float], precision: int = DEFAULT_PRECISION) -> str:
+    return f"Timestamps: {list(timestamps)}\nValues: {list(values)}"
+
+
+def serialize_fixed(timestamps: Sequence[float], values: Sequence[float], precision: int = DEFAULT_PRECISION) -> str:
+    return f"Timestamps: {_joined(timestamps, precision)}\nValues: {_joined(values, precision)}"
+
+
+def serialize_csv(timestamps: Sequence[float], values: Sequence[float], precision: int = DEFAULT_PRECISION) -> str:
+    rows = "\n".join(f"{format_number(t, precision)},{format_number(v, precision)}" for t, v in zip(timestamps, values))
+    return f"t,value\n{rows}"
+
+
+def serialize_start_step(timestamps: Sequence[float], values: Sequence[float], precision: int = DEFAULT_PRECISION) -> str:
+    return f"{_timestamps_line(timestamps, precision)}\nValues: {_joined(values, precision)}"
+
+
+def serialize_delta(timestamps: Sequence[float], values: Sequence[float], precision: int = DEFAULT_PRECISION) -> str:
+    # Differences of the rounded values, so summing them back gives the rounded series
+    rounded = [round(float(v), precision) for v in values]
+    deltas = [format_number(rounded[0], precision)] if rounded else []
+    for prev, cur in zip(rounded, rounded[1:]):
+        d = format_number(cur - prev, precision)
+        deltas.append(d if d.startswith("-") else f"+{d}")
+    return f"{_timestamps_line(timestamps, precision)}\n{_DELTA_LABEL} {','.join(deltas)}"
+
+
+_SERIALIZERS = {
+    "repr": serialize_repr,
+    "fixed": serialize_fixed,
+    "csv": serialize_csv,
+    "start_step": serialize_start_step,
+    "delta": serialize_delta,
+}
+
+
+def get_serializer(spec: str) -> Serializer:
+    """
+    Serializer for a ``name`` or ``name:precision`` spec.
+
+    Raises:
+        ValueError: Unknown format or invalid precision
+    """
+    name, _, precision = (spec or "repr").partition(":")
+    if name not in _SERIALIZERS:
+        raise ValueError(f"Unknown prompt format '{name}'; use one of {', '.join(FORMATS)}")
+    if not precision:
+        return _SERIALIZERS[name]
+    if not precision.isdigit():
+        raise ValueError(f"Invalid precision in prompt format '{spec}'; expected e.g. {name}:3")
+    return partial(_SERIALIZERS[name], precision=int(precision))
+
+
+def parse_values(prompt: str) -> List[float]:
+    """The value series of a prompt in any of the formats; empty if none is found."""
+    lines = prompt.splitlines()
+    for i, line in enumerate(lines):
+        if line.startswith(_DELTA_LABEL):
+            total, out = 0.0, []
+            for d in _NUMBER_RE.findall(line[len(_DELTA_LABEL):]):
+                total += float(d)
+                out.append(total)
+            return out
+        if line.startswith("Values:"):
+            return [float(v) for v in _NUMBER_RE.findall(line[len("Values:"):])]
+        if line == "t,value":
+            out = []
+            for row in lines[i + 1:]:
+                parts = row.split(",")
+                if len(parts) != 2:
+                    break
+                try:
+                    out.append(float(parts[1]))
+                except ValueError:
+                    break
+            return out
+    return []
@@ -0,0 +1,116 @@
+"""
+Deterministic dataset sharding and merging of shard runs.
+
+A sample belongs to shard ``blake2b(id) % count``, so every machine that loads the same
+dataset with the same limit agrees on the split without coordinating. Shard runs record
+``dataset.shard`` and are merged back into a single run with the aggregate recomputed
+from the combined results.
+"""
+import hashlib
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .runner import TASKS, aggregate_results
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse ``"i/n"`` (0-based index) into ``(i, n)``."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}'; expected i/n, e.g. 0/4")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}'; need 0 <= i < n")
+    return index, count
+
+
+def shard_of(sample_id: Any, count: int) -> int:
+    # Python's hash() is salted per process, so use a stable digest
+    digest = hashlib.blake2b(str(sample_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+def select_shard(samples: List[Dict[str, Any]], index: int, count: int) -> List[Dict[str, Any]]:
+    """Samples assigned to shard ``index`` of ``count``; samples without an id hash their position."""
+    if count == 1:
+        return list(samples)
+    return [s for pos, s in enumerate(samples) if shard_of(s.get("id", f"#{pos}"), count) == index]
+
+
+def shard_run_id(run_id: str, index: int, count: int) -> str:
+    return f"{run_id}-s{index}of{count}"
+
+
+def merge_runs(runs: List[Dict[str, Any]], run_id: Optional[str] = None, allow_partial: bool = False) -> Dict[str, Any]:
+    """
+    Merge shard runs of one evaluation into a single run.
+
+    Args:
+        runs: Shard run dicts (as written to RUN_DIR)
+        run_id: Id for the merged run (default: first shard's id without the shard suffix)
+        allow_partial: Merge even if some shards are missing
+
+    Returns:
+        Run dict with concatenated results and an aggregate recomputed from them
+
+    Raises:
+        ValueError: If runs are not shards of the same evaluation, shards are missing or
+            duplicated, or results overlap
+    """
+    if not runs:
+        raise ValueError("No runs to merge")
+    shards = [(r.get("dataset") or {}).get("shard") for r in runs]
+    if any(s is None for s in shards):
+        missing = [r.get("run_id") for r, s in zip(runs, shards) if s is None]
+        raise ValueError(f"Not shard runs: {', '.join(map(str, missing))}")
+
+    first = runs[0]
+    for key in ("stage", "model"):
+        values = {r.get(key) for r in runs}
+        if len(values) > 1:
+            raise ValueError(f"Shards disagree on {key}: {sorted(map(str, values))}")
+    base_dataset = {k: v for k, v in (first.get("dataset") or {}).items() if k != "shard"}
+    for r in runs[1:]:
+        if {k: v for k, v in r["dataset"].items() if k != "shard"} != base_dataset:
+            raise ValueError(f"Shard {r.get('run_id')} was run on a different dataset configuration")
+
+    counts = {s["count"] for s in shards}
+    if len(counts) > 1:
+        raise ValueError(f"Shards disagree on shard count: {sorted(counts)}")
+    count = counts.pop()
+    indices = [s["index"] for s in shards]
+    if len(set(indices)) != len(indices):
+        raise ValueError("Duplicate shard indices")
+    missing = sorted(set(range(count)) - set(indices))
+    if missing and not allow_partial:
+        raise ValueError(f"Missing shards {missing} of {count}")
+
+    ordered = sorted(runs, key=lambda r: r["dataset"]["shard"]["index"])
+    results = [item for r in ordered for item in r.get("results", [])]
+    ids = [item.get("id") for item in results if item.get("id") is not None]
+    if len(ids) != len(set(ids)):
+        raise ValueError("Shard results overlap; were the shards loaded with the same dataset and limit?")
+
+    statuses = {r.get("status", "completed") for r in runs}
+    status = "failed" if "failed" in statuses else "stopped" if statuses - {"completed"} or missing else "completed"
+    # Shards run in parallel, so the merged wall clock is the slowest shard
+    walls = [r.get("aggregate", {}).get("wall_s") for r in runs]
+    wall_s = max((w for w in walls if w is not None), default=None)
+
+    task = TASKS[first["stage"]]
+    merged_id = run_id or re.sub(r"-s\d+of\d+$", "", first["run_id"])
+    return {
+        "run_id": merged_id,
+        "stage": first["stage"],
+        "model": first["model"],
+        "version": first.get("version", "0.1.0"),
+        "started_at": min(r.get("started_at", "") for r in runs),
+        "ended_at": max(r.get("ended_at", "") for r in runs) or datetime.now(timezone.utc).isoformat(),
+        "dataset": {**base_dataset, "merged_from": [r["run_id"] for r in ordered], "shard_count": count},
+        "results": results,
+        "aggregate": aggregate_results(task, results, first["model"], wall_s=wall_s),
+        "status": status,
+        # Results keep the metrics their shard scored them with
+        "scoring_version": min(r.get("scoring_version", 0) for r in runs),
+    }
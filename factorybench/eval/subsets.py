@@ -0,0 +1,260 @@
+"""
+Informative anchor subsets of a large dataset, selected from historical runs.
+
+Every completed Stage 1 run on the source dataset contributes one row to a response
+matrix of per-sample ``performance`` (runs x samples). Samples are clustered by how all
+models did on them, so a cluster groups samples of similar difficulty that separate the
+models the same way. The sample nearest each centroid becomes an anchor, weighted by its
+cluster's share of the dataset. A new model is then run on the anchors only, and the
+weighted mean of its anchor scores estimates its full-dataset ``performance``.
+"""
+import json
+import math
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config import RUN_DIR, DATASETS, SUBSET_DIR
+from ..metrics.telemetry_literacy import sample_performance
+
+STAGE = "telemetry_literacy"
+
+
+def load_history(dataset_id: str, run_dir: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Completed Stage 1 runs on ``dataset_id`` that kept per-sample results."""
+    runs = []
+    for path in sorted(Path(run_dir or RUN_DIR).glob("*.json")):
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                run = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            continue
+        if (
+            run.get("stage") == STAGE
+            and run.get("status") == "completed"
+            and (run.get("dataset") or {}).get("dataset_id") == dataset_id
+            and run.get("results")
+        ):
+            runs.append(run)
+    return runs
+
+
+def response_matrix(runs: List[Dict[str, Any]]) -> Tuple[List[Any], np.ndarray]:
+    """
+    Per-sample performance of every run on the samples all runs evaluated.
+
+    Returns:
+        Sample ids in first-run order, and a (runs x samples) array; a sample a model
+        failed to answer is filled with the other runs' mean for it
+    """
+    per_run = [{r.get("id"): sample_performance(r.get("metrics") or {}) for r in run["results"]} for run in runs]
+    common = set(per_run[0]).intersection(*per_run[1:])
+    ids = [sid for sid in per_run[0] if sid in common and sid is not None]
+    matrix = np.array([[np.nan if p[sid] is None else p[sid] for sid in ids] for p in per_run], dtype=float)
+    answered = ~np.isnan(matrix).all(axis=0)
+    ids = [sid for sid, keep in zip(ids, answered) if keep]
+    matrix = matrix[:, answered]
+    fill = np.nanmean(matrix, axis=0)
+    matrix = np.where(np.isnan(matrix), fill, matrix)
+    return ids, matrix
+
+
+def item_statistics(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Difficulty (mean error across runs) and discrimination of every sample.
+
+    Discrimination is the correlation, across runs, between a sample's error and the run's
+    overall performance; samples near 1 rank models the way the full dataset does.
+    """
+    difficulty = matrix.mean(axis=0)
+    overall = matrix.mean(axis=1)
+    dx = matrix - difficulty
+    dy = (overall - overall.mean())[:, None]
+    denom = np.sqrt((dx ** 2).sum(axis=0) * (dy ** 2).sum())
+    discrimination = np.divide((dx * dy).sum(axis=0), denom, out=np.zeros_like(difficulty), where=denom > 0)
+    return {"difficulty": difficulty, "discrimination": discrimination}
+
+
+def _kmeans(points: np.ndarray, k: int, rng: np.random.Generator, iterations: int = 50) -> np.ndarray:
+    """Lloyd's k-means with k-means++ seeding; returns each point's cluster label."""
+    n = len(points)
+    centers = [points[rng.integers(n)]]
+    dist = ((points - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = dist.sum()
+        idx = rng.choice(n, p=dist / total) if total > 0 else rng.integers(n)
+        centers.append(points[idx])
+        dist = np.minimum(dist, ((points - points[idx]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+    labels = np.zeros(n, dtype=np.int64)
+    for i in range(iterations):
+        # |p - c|^2 without the constant |p|^2 term
+        new = np.argmin((centers ** 2).sum(axis=1) - 2.0 * points @ centers.T, axis=1)
+        if i and np.array_equal(new, labels):
+            break
+        labels = new
+        for c in range(k):
+            members = labels == c
+            if members.any():
+                centers[c] = points[members].mean(axis=0)
+    return labels
+
+
+def select_anchors(matrix: np.ndarray, size: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pick ``size`` anchor samples from a (runs x samples) response matrix.
+
+    Returns:
+        Anchor column indices and their weights (cluster share of the samples, summing to 1)
+    """
+    n = matrix.shape[1]
+    if size >= n:
+        return np.arange(n), np.full(n, 1.0 / n)
+    points = matrix.T
+    labels = _kmeans(points, size, np.random.default_rng(seed))
+    anchors, weights = [], []
+    for c in np.unique(labels):
+        members = np.flatnonzero(labels == c)
+        centroid = points[members].mean(axis=0)
+        anchors.append(members[np.argmin(((points[members] - centroid) ** 2).sum(axis=1))])
+        weights.append(len(members) / n)
+    return np.array(anchors), np.array(weights)
+
+
+def estimate_performance(values: List[Optional[float]], weights: List[float]) -> Optional[float]:
+    """Weighted anchor mean; anchors the model did not answer are left out and the weights renormalized."""
+    pairs = [(v, w) for v, w in zip(values, weights) if v is not None and math.isfinite(v)]
+    total = sum(w for _, w in pairs)
+    return math.fsum(v * w for v, w in pairs) / total if total > 0 else None
+
+
+def evaluate_holdout(
+    matrix: np.ndarray,
+    size: int,
+    seed: int = 0,
+    random_trials: int = 200,
+    actual: Optional[Sequence[Optional[float]]] = None,
+) -> Dict[str, Any]:
+    """
+    Leave-one-run-out error of the anchor estimate against each run's full performance.
+
+    Anchors are selected without the held-out run, which is then scored on them only. A
+    uniformly random subset of the same size is reported alongside as the baseline.
+    ``actual`` holds each run's reported ``performance``; runs without one are compared
+    against their mean over the matrix.
+    """
+    runs = matrix.shape[0]
+    if runs < 3:
+        return {"runs": runs, "note": "need at least 3 historical runs for a held-out estimate"}
+    rng = np.random.default_rng(seed)
+    errors, random_errors = [], []
+    for held in range(runs):
+        anchors, weights = select_anchors(np.delete(matrix, held, axis=0), size, seed)
+        reported = actual[held] if actual is not None else None
+        target = float(reported) if isinstance(reported, (int, float)) else float(matrix[held].mean())
+        errors.append(abs(float(matrix[held, anchors] @ weights) - target))
+        draws = np.argsort(rng.random((random_trials, matrix.shape[1])), axis=1)[:, :min(size, matrix.shape[1])]
+        random_errors.append(float(np.abs(matrix[held, draws].mean(axis=1) - target).mean()))
+    return {
+        "runs": runs,
+        "anchor_mae": float(np.mean(errors)),
+        "anchor_max_error": float(np.max(errors)),
+        "random_mae": float(np.mean(random_errors)),
+    }
+
+
+def build_subset(
+    runs: List[Dict[str, Any]],
+    source_dataset: str,
+    size: int,
+    name: str,
+    seed: int = 0,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Select anchors from historical runs and describe them as a dataset.
+
+    Returns:
+        The manifest (registry entry, weights, per-anchor statistics, held-out error) and
+        the anchor samples, rebuilt from the fields runs store with each result
+
+    Raises:
+        ValueError: Fewer than 2 runs, or no sample evaluated by all of them
+    """
+    if len(runs) < 2:
+        raise ValueError(f"Need at least 2 completed runs on '{source_dataset}', found {len(runs)}")
+    ids, matrix = response_matrix(runs)
+    if not ids:
+        raise ValueError("The historical runs have no answered samples in common")
+    anchors, weights = select_anchors(matrix, size, seed)
+    stats = item_statistics(matrix)
+    by_id = {r.get("id"): r for r in runs[0]["results"]}
+    fields = ("id", "values", "timestamps", "domain", "subtype", "statistics")
+    samples = [{k: by_id[ids[i]].get(k) for k in fields} for i in anchors]
+    subset_id = f"local_subset_{name}"
+    manifest = {
+        "id": subset_id,
+        "name": f"{name} ({len(samples)} anchors of {source_dataset})",
+        "stage": STAGE,
+        "subset_of": source_dataset,
+        "fixture_path": (SUBSET_DIR / f"{subset_id}.json").as_posix(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "seed": seed,
+        "population": len(ids),
+        "historical_runs": [r["run_id"] for r in runs],
+        "anchors": [
+            {
+                "id": ids[i],
+                "weight": float(w),
+                "difficulty": float(stats["difficulty"][i]),
+                "discrimination": float(stats["discrimination"][i]),
+            }
+            for i, w in zip(anchors, weights)
+        ],
+        "holdout": evaluate_holdout(matrix, size, seed, actual=[(r.get("aggregate") or {}).get("performance") for r in runs]),
+    }
+    return manifest, samples
+
+
+def register_subset(manifest: Dict[str, Any], samples: List[Dict[str, Any]]) -> Path:
+    """Write the anchor samples and the manifest ``config`` loads into ``DATASETS``."""
+    fixture = Path(manifest["fixture_path"])
+    fixture.parent.mkdir(parents=True, exist_ok=True)
+    with fixture.open("w", encoding="utf-8") as f:
+        json.dump(samples, f, indent=2)
+    manifest_path = fixture.with_name(f"{manifest['id']}.manifest.json")
+    with manifest_path.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    entry = {k: manifest[k] for k in ("id", "name", "fixture_path", "subset_of")}
+    registry = DATASETS.setdefault(STAGE, [])
+    registry[:] = [d for d in registry if d["id"] != manifest["id"]]
+    registry.append({**entry, "source": "local", "split": "train", "manifest": manifest_path.resolve().as_posix()})
+    return manifest_path
+
+
+def subset_entry(dataset_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Registry entry of an anchor subset, or None for ordinary datasets."""
+    for entry in DATASETS.get(STAGE, []):
+        if entry["id"] == dataset_id and entry.get("subset_of"):
+            return entry
+    return None
+
+
+def estimate_full_performance(dataset_id: Optional[str], results: List[Dict[str, Any]]) -> Optional[float]:
+    """
+    Estimated ``performance`` on the source dataset for a run on an anchor subset.
+
+    None for other datasets, and when the manifest is missing or unreadable: the estimate
+    is extra information and must never keep a run from being saved.
+    """
+    entry = subset_entry(dataset_id)
+    if entry is None or not results:
+        return None
+    try:
+        with Path(entry["manifest"]).open("r", encoding="utf-8") as f:
+            weights = {a["id"]: float(a["weight"]) for a in json.load(f)["anchors"]}
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+    scored = [(sample_performance(r.get("metrics") or {}), weights[r.get("id")]) for r in results if r.get("id") in weights]
+    return estimate_performance([v for v, _ in scored], [w for _, w in scored])
@@ -0,0 +1,138 @@
+"""
+Token-efficiency benchmark for Stage 1 prompt formats.
+
+For every bundled local dataset and every format in ``serializers``, measures prompt
+tokens and characters per sample and the error the format itself introduces (statistics
+of the series read back from the prompt versus the ground truth). With a model, it also
+runs the samples in each format and reports performance, ok rate and billed prompt tokens.
+Tokens are counted with tiktoken when it is installed, and otherwise with a
+pre-tokenizer approximation of cl100k (digit runs split into groups of three).
+"""
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..adapters.base import ModelAdapter
+from ..config import DATASETS
+from ..data.loader_tl import load_telemetry_literacy
+from ..metrics.telemetry_literacy import series_stats
+from ..state import run_state
+from ..tokens import count_tokens, tokenizer_name
+from .runner import build_prompt, run_telemetry_literacy
+from .serializers import FORMATS, get_serializer, parse_values
+
+def bundled_datasets(dataset_ids: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """Stage 1 registry entries whose fixture file is present locally."""
+    out = []
+    for entry in DATASETS.get("telemetry_literacy", []):
+        if entry.get("source") != "local" or not Path(entry.get("fixture_path", "")).exists():
+            continue
+        if dataset_ids and entry["id"] not in dataset_ids:
+            continue
+        out.append(entry)
+    return out
+
+
+def _format_floor(samples: List[Dict[str, Any]], spec: str) -> Optional[float]:
+    """Mean performance of an exact reading of the prompt: the error the format alone causes."""
+    serialize = get_serializer(spec)
+    errors = []
+    for s in samples:
+        truth = s.get("statistics") or {}
+        read = series_stats(parse_values(build_prompt(s, serialize=serialize)))
+        if all(k in truth for k in read):
+            errors.append(sum(abs(read[k] - truth[k]) for k in read) / 3.0)
+    return sum(errors) / len(errors) if errors else None
+
+
+def benchmark_formats(
+    formats: Sequence[str] = FORMATS,
+    dataset_ids: Optional[Sequence[str]] = None,
+    limit: Optional[int] = None,
+    adapter: Optional[ModelAdapter] = None,
+    model_name: str = "mock",
+) -> Dict[str, Any]:
+    """
+    Measure every format on every bundled dataset.
+
+    Args:
+        formats: Format specs (``name`` or ``name:precision``)
+        dataset_ids: Restrict to these registry ids
+        limit: Samples per dataset
+        adapter: Also evaluate each format with this model; None measures tokens only
+
+    Returns:
+        ``{"tokenizer", "model", "rows": [...]}`` with one row per (dataset, format)
+    """
+    for spec in formats:
+        get_serializer(spec)
+    rows = []
+    for entry in bundled_datasets(dataset_ids):
+        samples = load_telemetry_literacy(source="local", path=entry["fixture_path"], limit=limit)
+        baseline_tokens = None
+        for spec in formats:
+            serialize = get_serializer(spec)
+            prompts = [build_prompt(s, serialize=serialize) for s in samples]
+            tokens = sum(count_tokens(p) for p in prompts) / max(1, len(prompts))
+            if baseline_tokens is None and spec.partition(":")[0] == "repr":
+                baseline_tokens = tokens
+            row = {
+                "dataset_id": entry["id"],
+                "format": spec,
+                "samples": len(samples),
+                "prompt_tokens_mean": round(tokens, 1),
+                "prompt_chars_mean": round(sum(len(p) for p in prompts) / max(1, len(prompts)), 1),
+                "format_performance_floor": _format_floor(samples, spec),
+            }
+            if adapter is not None:
+                row.update(_evaluate(samples, spec, adapter, model_name, entry["id"]))
+            rows.append(row)
+        if baseline_tokens:
+            for row in rows:
+                if row["dataset_id"] == entry["id"]:
+                    row["tokens_vs_repr"] = round(row["prompt_tokens_mean"] / baseline_tokens, 3)
+    return {"tokenizer": tokenizer_name(), "model": model_name if adapter is not None else None, "rows": rows}
+
+
+def _evaluate(samples: List[Dict[str, Any]], spec: str, adapter: ModelAdapter, model_name: str, dataset_id: str) -> Dict[str, Any]:
+    run_id = f"formats-{uuid.uuid4().hex[:8]}"
+    with tempfile.TemporaryDirectory(prefix="factorybench-formats-") as tmp:
+        run = run_telemetry_literacy(samples, adapter, model_name, {"source": "bench", "dataset_id": dataset_id},
+                                     run_id=run_id, run_dir=Path(tmp), prompt_format=spec)
+    run_state.cleanup_run(run_id)
+    agg = run["aggregate"]
+    return {
+        "performance": agg.get("performance"),
+        "ok_rate": agg.get("ok_rate"),
+        "usage_prompt_tokens_mean": agg.get("prompt_tokens_total", 0.0) / max(1.0, agg.get("samples", 0.0) or 1.0),
+        "cost_total": agg.get("cost_total"),
+    }
+
+
+def recommend(rows: List[Dict[str, Any]], tolerance: float = 0.05) -> Optional[str]:
+    """
+    Cheapest format whose score stays within ``tolerance`` (relative) of ``repr`` on every dataset.
+
+    Uses model performance when the benchmark ran a model, else the format's own error floor.
+    """
+    formats = list(dict.fromkeys(r["format"] for r in rows))
+    by_dataset: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for r in rows:
+        by_dataset.setdefault(r["dataset_id"], {})[r["format"]] = r
+    metric = "performance" if any("performance" in r for r in rows) else "format_performance_floor"
+
+    def acceptable(spec: str) -> bool:
+        for per_format in by_dataset.values():
+            base = next((r for f, r in per_format.items() if f.partition(":")[0] == "repr"), None)
+            row = per_format.get(spec)
+            if base is None or row is None or row.get(metric) is None or base.get(metric) is None:
+                return False
+            # Lower is better; allow an absolute slack for near-zero baselines
+            if row[metric] > base[metric] * (1.0 + tolerance) + 1e-3:
+                return False
+        return True
+
+    cost = {f: sum(r["prompt_tokens_mean"] for r in rows if r["format"] == f) for f in formats}
+    candidates = [f for f in formats if acceptable(f)]
+    return min(candidates, key=cost.get) if candidates else None
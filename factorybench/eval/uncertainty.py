@@ -0,0 +1,150 @@
+"""
+Cached bootstrap intervals and paired tests for run files.
+
+A run's fingerprint is its file's modification time and size, so a cache hit needs a
+``stat`` and no JSON parsing. Intervals are kept in memory and under
+``RUN_DIR/.cache/ci/`` (shared by API workers and restarts); paired tests are cheap
+enough to keep in memory only.
+"""
+import json
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import RUN_DIR
+from ..metrics.bootstrap import DEFAULT_RESAMPLES, bootstrap_intervals, paired_test
+
+_MAX_ENTRIES = 1024
+_intervals: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_paired: "OrderedDict[Tuple[str, ...], Dict[str, Any]]" = OrderedDict()
+_lock = Lock()
+
+
+def run_fingerprint(path: Path, resamples: int = DEFAULT_RESAMPLES, confidence: float = 0.95) -> str:
+    st = path.stat()
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}-{resamples}-{confidence}"
+
+
+def _remember(cache: OrderedDict, key, value: Dict[str, Any]):
+    with _lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > _MAX_ENTRIES:
+            cache.popitem(last=False)
+
+
+def _recall(cache: OrderedDict, key) -> Optional[Dict[str, Any]]:
+    with _lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _load_run(run_id: str, run_dir: Path) -> Tuple[Path, Dict[str, Any]]:
+    path = run_dir / f"{run_id}.json"
+    if not path.exists():
+        raise FileNotFoundError(run_id)
+    with path.open("r", encoding="utf-8") as f:
+        return path, json.load(f)
+
+
+def run_intervals(
+    run_id: str,
+    run_dir: Optional[Path] = None,
+    resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = 0.95,
+    cached_only: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    Bootstrap intervals of a run's aggregate metrics, computed once per fingerprint.
+
+    With ``cached_only``, returns None instead of computing intervals that are not cached.
+
+    Raises:
+        FileNotFoundError: No such run
+    """
+    run_dir = Path(run_dir or RUN_DIR)
+    path = run_dir / f"{run_id}.json"
+    if not path.exists():
+        raise FileNotFoundError(run_id)
+    fingerprint = run_fingerprint(path, resamples, confidence)
+    cached = _recall(_intervals, (run_id, fingerprint))
+    if cached is not None:
+        return cached
+
+    cache_path = run_dir / ".cache" / "ci" / f"{run_id}.json"
+    try:
+        with cache_path.open("r", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("fingerprint") == fingerprint:
+            _remember(_intervals, (run_id, fingerprint), stored)
+            return stored
+    except (OSError, json.JSONDecodeError):
+        pass
+    if cached_only:
+        return None
+
+    _, run = _load_run(run_id, run_dir)
+    results = run.get("results") or []
+    entry = {
+        "run_id": run_id,
+        "fingerprint": fingerprint,
+        "resamples": resamples,
+        "confidence": confidence,
+        "samples": len(results),
+        "intervals": bootstrap_intervals(run.get("stage", "telemetry_literacy"), results, resamples, confidence),
+    }
+    _remember(_intervals, (run_id, fingerprint), entry)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    tmp.replace(cache_path)
+    return entry
+
+
+def compare_runs(
+    run_a: str,
+    run_b: str,
+    run_dir: Optional[Path] = None,
+    resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = 0.95,
+) -> Dict[str, Any]:
+    """
+    Paired test of ``run_a`` minus ``run_b`` on their common samples.
+
+    Raises:
+        FileNotFoundError: Either run is missing
+        ValueError: The runs are of different stages or datasets
+    """
+    run_dir = Path(run_dir or RUN_DIR)
+    path_a, path_b = run_dir / f"{run_a}.json", run_dir / f"{run_b}.json"
+    for run_id, path in ((run_a, path_a), (run_b, path_b)):
+        if not path.exists():
+            raise FileNotFoundError(run_id)
+    key = (run_a, run_fingerprint(path_a, resamples, confidence), run_b, run_fingerprint(path_b, resamples, confidence))
+    cached = _recall(_paired, key)
+    if cached is not None:
+        return cached
+
+    _, a = _load_run(run_a, run_dir)
+    _, b = _load_run(run_b, run_dir)
+    stage = a.get("stage", "telemetry_literacy")
+    if b.get("stage", "telemetry_literacy") != stage:
+        raise ValueError("Runs are of different stages")
+    dataset_a = (a.get("dataset") or {}).get("dataset_id")
+    if dataset_a != (b.get("dataset") or {}).get("dataset_id"):
+        raise ValueError("Paired tests need runs on the same dataset")
+    entry = {
+        "run_a": run_a,
+        "run_b": run_b,
+        "stage": stage,
+        "dataset_id": dataset_a,
+        "metric": "performance" if stage == "telemetry_literacy" else "component_accuracy",
+        "confidence": confidence,
+        **paired_test(stage, a.get("results") or [], b.get("results") or [], resamples, confidence),
+    }
+    _remember(_paired, key, entry)
+    return entry
@@ -0,0 +1,93 @@
+"""
+Distributed evaluation worker: pulls sample batches from a coordinating API server.
+
+The worker only needs credentials for the run's model. Prompting, generation and
+scoring happen here via ``runner.evaluate_sample``; cost limits and stop requests are
+enforced by the coordinator, which answers ``stop`` once a run should end.
+"""
+import json
+import os
+import socket
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Callable, Dict, Optional
+
+from ..adapters.base import ModelAdapter
+from .runner import TASKS, evaluate_sample
+
+# model id -> adapter; raise to refuse a model this worker cannot serve
+AdapterFactory = Callable[[str], ModelAdapter]
+
+
+def _post(url: str, payload: Dict[str, Any], timeout: float = 60.0) -> Dict[str, Any]:
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+def run_worker(
+    coordinator_url: str,
+    adapter_factory: AdapterFactory,
+    worker_id: Optional[str] = None,
+    batch_size: int = 8,
+    poll_interval_s: float = 1.0,
+    max_idle_s: Optional[float] = None,
+) -> Dict[str, int]:
+    """
+    Lease batches from ``coordinator_url`` until idle for ``max_idle_s`` (forever if None).
+
+    Args:
+        coordinator_url: Base URL of the FactoryBench API server
+        adapter_factory: Builds the adapter for a run's model id
+        worker_id: Name reported to the coordinator (default: host-pid)
+        batch_size: Samples per lease
+        poll_interval_s: Wait between lease attempts when there is no work
+        max_idle_s: Exit after this long without work
+
+    Returns:
+        Counts of leases and samples processed
+    """
+    base = coordinator_url.rstrip("/")
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    adapters: Dict[str, ModelAdapter] = {}
+    stats = {"leases": 0, "samples": 0, "rejected": 0}
+    idle_since = time.monotonic()
+
+    while True:
+        try:
+            lease = _post(f"{base}/work/lease", {"worker_id": worker_id, "max_samples": batch_size}).get("lease")
+        except (urllib.error.URLError, OSError) as e:
+            print(f"Coordinator unreachable ({e}); retrying", file=sys.stderr)
+            lease = None
+        if not lease:
+            if max_idle_s is not None and time.monotonic() - idle_since >= max_idle_s:
+                return stats
+            time.sleep(poll_interval_s)
+            continue
+
+        model = lease["model"]
+        if model not in adapters:
+            adapters[model] = adapter_factory(model)
+        task = TASKS[lease["stage"]]
+        results = [evaluate_sample(task, sample, adapters[model]) for sample in lease["samples"]]
+        try:
+            reply = _post(f"{base}/work/complete", {"lease_id": lease["lease_id"], "worker_id": worker_id, "results": results})
+            stats["samples"] += reply.get("accepted", 0)
+        except urllib.error.HTTPError as e:
+            # 404: the run finished or was stopped while this batch was in flight
+            if e.code != 404:
+                raise
+            stats["rejected"] += len(results)
+        except (urllib.error.URLError, OSError) as e:
+            # The lease times out on the coordinator and the batch is handed out again
+            print(f"Could not report lease {lease['lease_id']} ({e})", file=sys.stderr)
+            stats["rejected"] += len(results)
+        stats["leases"] += 1
+        idle_since = time.monotonic()
@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+GROUND_TRUTH_FIELDS = ("root_cause_component", "root_cause_metric", "anomaly_start", "anomaly_end", "description")
+GROUND_TRUTH_TEXT_FIELDS = ("root_cause_component", "root_cause_metric", "description")
+
+NORMAL_GROUND_TRUTH = {
+    "root_cause_component": "None",
+    "root_cause_metric": "None",
+    "anomaly_start": -1,
+    "anomaly_end": -1,
+    "description": "Normal operation.",
+}
+
+
+@dataclass
+class SampleBatch:
+    """
+    A block of generated RCA samples held as arrays.
+
+    ``metrics`` has shape ``(count, len(metric_names), length)``. ``ground_truth`` maps
+    each field of ``GROUND_TRUTH_FIELDS`` to a ``(count,)`` array. ``meta`` is shared by
+    every sample in the batch.
+    """
+    ids: List[str]
+    metric_names: List[str]
+    metrics: np.ndarray
+    ground_truth: Dict[str, np.ndarray]
+    meta: Dict[str, Any]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def ground_truth_at(self, i: int) -> Dict[str, Any]:
+        return {k: self.ground_truth[k][i].item() for k in GROUND_TRUTH_FIELDS}
+
+    def iter_samples(self) -> Iterator[Dict[str, Any]]:
+        """Yield samples in the ``generate-data`` JSON schema."""
+        for i, sample_id in enumerate(self.ids):
+            yield {
+                "id": sample_id,
+                "meta": dict(self.meta),
+                "ground_truth": self.ground_truth_at(i),
+                "metrics": {name: self.metrics[i, j].tolist() for j, name in enumerate(self.metric_names)},
+            }
+
+    def to_samples(self) -> List[Dict[str, Any]]:
+        return list(self.iter_samples())
+
+
+def sample_ids(count: int, offset: int = 0, prefix: str = "sample_syn_") -> List[str]:
+    """Ids of the samples at dataset positions ``offset`` onwards; unique within a generated dataset."""
+    return [f"{prefix}{i:08x}" for i in range(offset, offset + count)]
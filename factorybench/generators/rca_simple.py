@@ -1,89 +1,78 @@
-import random
-import uuid
+from typing import Any, Dict, List, Optional
+
 import numpy as np
-from typing import List, Dict, Any
 
-def generate_batch(count: int = 100, fault_ratio: float = 0.2) -> List[Dict[str, Any]]:
+from .batch import NORMAL_GROUND_TRUTH, SampleBatch, sample_ids
+
+TOPOLOGY = "Hydraulic Pump -> Press Machine"
+METRIC_NAMES = ["pump_pressure", "pump_temp", "press_cycle_time"]
+# 1 metrics point per minute
+LENGTH = 60
+
+# Normal pressure is like 150, temp like 60, cycle time like 200ms
+BASELINES = np.array([150.0, 60.0, 200.0])
+NOISE_STD = np.array([5.0, 2.0, 10.0])
+# Hydraulic leak: pressure drops to ~90, cycle time spikes to ~350
+FAULT_SHIFT = np.array([-60.0, 0.0, 150.0])
+
+
+def generate_arrays(count: int, fault_ratio: float = 0.2, rng: Optional[np.random.Generator] = None, id_offset: int = 0) -> SampleBatch:
     """
-    Generates a batch of synthetic samples for RCA testing using a 
+    Generate ``count`` samples at once as a ``(count, metrics, length)`` array.
+
+    Args:
+        count: Number of samples to generate.
+        fault_ratio: Approximate percentage of samples that should be anomalous.
+        rng: NumPy generator; pass a seeded one for reproducible output.
+        id_offset: Dataset position of the first sample, which numbers the sample ids.
+
+    Returns:
+        A SampleBatch in the ``generate-data`` schema.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+
+    is_anomaly = rng.random(count) < fault_ratio
+    metrics = rng.standard_normal((count, len(METRIC_NAMES), LENGTH))
+    metrics *= NOISE_STD[None, :, None]
+    metrics += BASELINES[None, :, None]
+
+    # Fault of Hydraulic Leak -> Pressure drop, Cycle time increase, in a random window
+    start = rng.integers(10, 41, size=count)
+    end = np.minimum(start + rng.integers(10, 21, size=count), LENGTH)
+    t = np.arange(LENGTH)
+    window = (t[None, :] >= start[:, None]) & (t[None, :] < end[:, None]) & is_anomaly[:, None]
+    for j, shift in enumerate(FAULT_SHIFT):
+        if shift:
+            metrics[:, j, :] += shift * window
+
+    ground_truth = {
+        "root_cause_component": np.where(is_anomaly, "Hydraulic Pump", NORMAL_GROUND_TRUTH["root_cause_component"]),
+        "root_cause_metric": np.where(is_anomaly, "pressure", NORMAL_GROUND_TRUTH["root_cause_metric"]),
+        "anomaly_start": np.where(is_anomaly, start, -1),
+        "anomaly_end": np.where(is_anomaly, end, -1),
+        "description": np.where(is_anomaly, "Hydraulic leak causing pressure drop and press slowdown.", NORMAL_GROUND_TRUTH["description"]),
+    }
+
+    return SampleBatch(
+        ids=sample_ids(count, id_offset),
+        metric_names=list(METRIC_NAMES),
+        metrics=metrics,
+        ground_truth=ground_truth,
+        meta={"topology": TOPOLOGY, "duration_minutes": LENGTH},
+    )
+
+
+def generate_batch(count: int = 100, fault_ratio: float = 0.2, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Generates a batch of synthetic samples for RCA testing using a
     simplified variation strategy.
-    
+
     Args:
         count: Number of samples to generate.
         fault_ratio: Approximate percentage of samples that should be anomalous.
-    
+        seed: Optional seed for reproducible output.
+
     Returns:
         A list of sample dictionaries matching the schema.
     """
-    samples = []
-    
-    for i in range(count):
-        is_anomaly = random.random() < fault_ratio
-        sample_id = f"sample_syn_{uuid.uuid4().hex[:8]}"
-        
-        # 1 metrics point per minute
-        duration = 60
-        length = 60
-
-        # Normal pressure is like 150, anomaly drops to 80-90
-        base_pressure = 150.0
-        pressure_noise = np.random.normal(0, 5, length)
-        pressure = base_pressure + pressure_noise
-        
-        # Normal temp is like 60, anomaly drops to 40-50 
-        base_temp = 60.0
-        temp_noise = np.random.normal(0, 2, length)
-        temp = base_temp + temp_noise
-        
-        # Cycle time like 200ms, anomaly spikes to 350ms
-        base_cycle = 200.0
-        cycle_noise = np.random.normal(0, 10, length)
-        cycle_time = base_cycle + cycle_noise
-        
-        ground_truth = {}
-        
-        if is_anomaly:
-            # Fault of Hydraulic Leak -> Pressure drop, Cycle time increase
-            # random start/end window
-            start_idx = random.randint(10, 40)
-            duration_fault = random.randint(10, 20)
-            end_idx = min(start_idx + duration_fault, length)
-            
-            # fault effects
-            # drop to ~90
-            pressure[start_idx:end_idx] -= 60
-            # spike to ~350
-            cycle_time[start_idx:end_idx] += 150
-            
-            ground_truth = {
-                "root_cause_component": "Hydraulic Pump",
-                "root_cause_metric": "pressure",
-                "anomaly_start": start_idx,
-                "anomaly_end": end_idx,
-                "description": "Hydraulic leak causing pressure drop and press slowdown."
-            }
-        else:
-            ground_truth = {
-                "root_cause_component": "None",
-                "root_cause_metric": "None",
-                "anomaly_start": -1,
-                "anomaly_end": -1,
-                "description": "Normal operation."
-            }
-            
-        sample = {
-            "id": sample_id,
-            "meta": {
-                "topology": "Hydraulic Pump -> Press Machine",
-                "duration_minutes": duration
-            },
-            "ground_truth": ground_truth,
-            "metrics": {
-                "pump_pressure": pressure.tolist(),
-                "pump_temp": temp.tolist(),
-                "press_cycle_time": cycle_time.tolist()
-            }
-        }
-        samples.append(sample)
-        
-    return samples
+    return generate_arrays(count, fault_ratio, np.random.default_rng(seed)).to_samples()
@@ -0,0 +1,137 @@
+"""
+Chunked, seeded and optionally multi-process dataset generation with streaming output.
+
+The requested count is split into fixed-size chunks. Each chunk gets its own child of
+``np.random.SeedSequence(seed)``, so output depends on ``seed`` and ``chunk_size`` but
+not on the number of workers. Sample ids number the samples by dataset position, so
+they are unique across chunks. Only ``2 * workers`` chunks are in flight at a time, which
+keeps memory bounded no matter how many samples are written.
+"""
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+import numpy as np
+
+from ..data.columnar import ColumnarWriter
+from .batch import SampleBatch
+
+FORMATS = ("json", "jsonl", "columnar")
+# Values per chunk when no chunk size is given (~128 MB of float64)
+DEFAULT_CHUNK_VALUES = 16_000_000
+
+# (count, rng, id_offset, **options) -> SampleBatch
+Generator = Callable[..., SampleBatch]
+
+
+def default_chunk_size(metrics: int, length: int) -> int:
+    """10k samples, fewer when one chunk's series would exceed ``DEFAULT_CHUNK_VALUES`` values."""
+    return max(1, min(10_000, DEFAULT_CHUNK_VALUES // max(1, metrics * length)))
+
+
+def infer_format(path: Path) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".jsonl":
+        return "jsonl"
+    if suffix == ".fbds":
+        return "columnar"
+    return "json"
+
+
+def _generate_chunk(generator: Generator, count: int, offset: int, seed_seq: np.random.SeedSequence, fmt: str, options: Dict[str, Any]) -> Union[SampleBatch, str]:
+    batch = generator(count, rng=np.random.default_rng(seed_seq), id_offset=offset, **options)
+    if fmt == "columnar":
+        return batch
+    # Serialize in the worker so the parent only copies bytes to disk
+    sep = ",\n" if fmt == "json" else "\n"
+    return sep.join(json.dumps(s) for s in batch.iter_samples())
+
+
+def iter_chunks(
+    generator: Generator,
+    count: int,
+    seed: Optional[int] = None,
+    chunk_size: int = 10_000,
+    workers: int = 1,
+    fmt: str = "columnar",
+    **options: Any,
+) -> Iterator[Union[SampleBatch, str]]:
+    """Yield generated chunks in order; strings for json/jsonl, batches for columnar."""
+    offsets = range(0, count, chunk_size)
+    sizes = [min(chunk_size, count - start) for start in offsets]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(sizes, offsets, seeds))
+
+    if workers <= 1:
+        for n, offset, seed_seq in tasks:
+            yield _generate_chunk(generator, n, offset, seed_seq, fmt, options)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        task_iter = iter(tasks)
+        for n, offset, seed_seq in task_iter:
+            pending.append(pool.submit(_generate_chunk, generator, n, offset, seed_seq, fmt, options))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            yield pending.popleft().result()
+            nxt = next(task_iter, None)
+            if nxt is not None:
+                pending.append(pool.submit(_generate_chunk, generator, *nxt, fmt, options))
+
+
+def generate_to_file(
+    generator: Generator,
+    path: Path,
+    count: int,
+    fmt: Optional[str] = None,
+    seed: Optional[int] = None,
+    chunk_size: int = 10_000,
+    workers: int = 1,
+    **options: Any,
+) -> Dict[str, Any]:
+    """
+    Generate ``count`` samples straight to ``path``.
+
+    Args:
+        generator: Batch generator, e.g. ``rca_simple.generate_arrays``
+        path: Output file (json/jsonl) or directory (columnar)
+        count: Number of samples
+        fmt: json | jsonl | columnar; inferred from the suffix when omitted
+        seed: Seed for reproducible output
+        chunk_size: Samples per chunk (and per worker task)
+        workers: Worker processes; 1 generates in-process
+        **options: Passed to the generator (e.g. fault_ratio)
+
+    Returns:
+        Summary with format, path and count
+    """
+    fmt = fmt or infer_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Valid: {', '.join(FORMATS)}")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    chunks = iter_chunks(generator, count, seed=seed, chunk_size=chunk_size, workers=workers, fmt=fmt, **options)
+
+    if fmt == "columnar":
+        with ColumnarWriter(path, count) as writer:
+            for batch in chunks:
+                writer.write(batch)
+        return {"format": fmt, "path": str(path), "count": count}
+
+    with path.open("w", encoding="utf-8") as f:
+        if fmt == "json":
+            f.write("[\n")
+        first = True
+        for text in chunks:
+            if not text:
+                continue
+            if not first:
+                f.write(",\n" if fmt == "json" else "\n")
+            f.write(text)
+            first = False
+        f.write("\n]\n" if fmt == "json" else "\n")
+    return {"format": fmt, "path": str(path), "count": count}
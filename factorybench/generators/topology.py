@@ -0,0 +1,311 @@
+"""
+Topology-driven multivariate fault simulator for RCA datasets.
+
+A ``Topology`` is a DAG of sensors grouped into components. ``Link`` edges carry
+deviations from one sensor to another with a gain and a lag in time steps, which is
+how a fault at a pump shows up later at the press downstream. Links are compiled into
+a sparse transfer matrix (CSR by target sensor, one block per topological level) and
+fault effects are propagated over whole batches at once:
+
+    E[target] = I[target] + sum_links gain * shift(E[source], lag)
+
+Sources always sit on an earlier level than their targets, so one pass over the levels
+is exact and costs O(links * batch * length). Only anomalous samples are propagated.
+Output keeps the ``generate-data`` ``ground_truth`` schema.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .batch import NORMAL_GROUND_TRUTH, SampleBatch, sample_ids
+
+
+@dataclass
+class Sensor:
+    name: str
+    component: str
+    metric: str  # physical quantity reported as root_cause_metric, e.g. "pressure"
+    baseline: float
+    noise_std: float
+
+
+@dataclass
+class Link:
+    source: str  # sensor name
+    target: str  # sensor name
+    gain: float
+    lag: int = 0
+
+
+@dataclass
+class FaultType:
+    """A fault kind and how its effect on the root sensor evolves over the window."""
+    kind: str  # leak | drift | stuck | oscillation
+    description: str  # formatted with component and metric
+    magnitude_sigma: Tuple[float, float]  # effect size range, in root-sensor noise std
+    metrics: Optional[Sequence[str]] = None  # eligible root metrics; None means any
+    propagates: bool = True  # sensor faults (stuck) do not change the physical process
+
+
+FAULT_LIBRARY: Dict[str, FaultType] = {
+    "leak": FaultType("leak", "{component} leak causing {metric} drop.", (8.0, 14.0), metrics=("pressure", "flow")),
+    "drift": FaultType("drift", "{component} {metric} sensor drifting.", (4.0, 10.0)),
+    "stuck": FaultType("stuck", "{component} {metric} sensor stuck at a constant reading.", (0.0, 0.0), propagates=False),
+    "oscillation": FaultType("oscillation", "{component} {metric} oscillating (control loop instability).", (3.0, 8.0)),
+}
+
+
+@dataclass
+class Topology:
+    sensors: List[Sensor]
+    links: List[Link] = field(default_factory=list)
+
+    @property
+    def sensor_names(self) -> List[str]:
+        return [s.name for s in self.sensors]
+
+    @property
+    def components(self) -> List[str]:
+        return list(dict.fromkeys(s.component for s in self.sensors))
+
+    def describe(self) -> str:
+        """Component-level edges, e.g. ``Hydraulic Pump -> Press Machine``."""
+        owner = {s.name: s.component for s in self.sensors}
+        edges = dict.fromkeys(
+            (owner[l.source], owner[l.target]) for l in self.links if owner[l.source] != owner[l.target]
+        )
+        if not edges:
+            return ", ".join(self.components)
+        return ", ".join(f"{a} -> {b}" for a, b in edges)
+
+    def levels(self) -> List[int]:
+        """Longest path (in links) from any root to each sensor; raises on cycles."""
+        index = {n: i for i, n in enumerate(self.sensor_names)}
+        indeg = [0] * len(index)
+        out: List[List[int]] = [[] for _ in index]
+        for l in self.links:
+            out[index[l.source]].append(index[l.target])
+            indeg[index[l.target]] += 1
+        level = [0] * len(index)
+        queue = [i for i, d in enumerate(indeg) if d == 0]
+        seen = 0
+        while queue:
+            i = queue.pop()
+            seen += 1
+            for j in out[i]:
+                level[j] = max(level[j], level[i] + 1)
+                indeg[j] -= 1
+                if indeg[j] == 0:
+                    queue.append(j)
+        if seen != len(index):
+            raise ValueError("Topology links contain a cycle")
+        return level
+
+
+class TransferMatrix:
+    """Sparse sensor-to-sensor transfer matrix, one CSR-by-target block per DAG level."""
+
+    def __init__(self, topology: Topology, length: int):
+        index = {n: i for i, n in enumerate(topology.sensor_names)}
+        level = topology.levels()
+        t = np.arange(length)
+        self.blocks: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        for lvl in range(1, max(level, default=0) + 1):
+            links = sorted((l for l in topology.links if level[index[l.target]] == lvl), key=lambda l: index[l.target])
+            src = np.array([index[l.source] for l in links])
+            tgt = np.array([index[l.target] for l in links])
+            lag = np.array([l.lag for l in links])
+            gain = np.array([l.gain for l in links])
+            # Per-link shifted time index; weight zeroes the steps before the lag kicks in
+            time_idx = t[None, :] - lag[:, None]
+            weight = gain[:, None] * (time_idx >= 0)
+            targets, starts = np.unique(tgt, return_index=True)
+            self.blocks.append((src[:, None], np.maximum(time_idx, 0), weight, targets, starts))
+
+    def propagate(self, injected: np.ndarray) -> np.ndarray:
+        """Propagate ``(batch, sensors, length)`` injected deviations through the DAG."""
+        effects = injected.copy()
+        for src, time_idx, weight, targets, starts in self.blocks:
+            contrib = effects[:, src, time_idx] * weight[None, :, :]
+            # Sum contributions per target sensor (links are sorted by target)
+            effects[:, targets, :] += np.add.reduceat(contrib, starts, axis=1)
+        return effects
+
+
+def _fault_shapes(kind: str, start: np.ndarray, end: np.ndarray, magnitude: np.ndarray, length: int, rng: np.random.Generator) -> np.ndarray:
+    """Additive effect over time for each faulty sample, ``(n, length)``."""
+    t = np.arange(length)[None, :]
+    s, e = start[:, None], end[:, None]
+    in_window = (t >= s) & (t < e)
+    span = np.maximum(e - s, 1)
+    if kind == "leak":
+        ramp = np.maximum(span // 4, 1)
+        shape = -np.clip((t - s + 1) / ramp, 0.0, 1.0)
+    elif kind == "drift":
+        sign = rng.choice((-1.0, 1.0), size=(len(start), 1))
+        shape = sign * (t - s + 1) / span
+    elif kind == "oscillation":
+        period = rng.uniform(4.0, 10.0, size=(len(start), 1))
+        shape = np.sin(2.0 * np.pi * (t - s) / period)
+    else:
+        raise ValueError(f"No additive shape for fault kind '{kind}'")
+    return shape * in_window * magnitude[:, None]
+
+
+def simulate(
+    count: int,
+    rng: Optional[np.random.Generator] = None,
+    topology: Optional[Topology] = None,
+    fault_ratio: float = 0.2,
+    faults: Optional[Sequence[str]] = None,
+    length: int = 60,
+    id_offset: int = 0,
+) -> SampleBatch:
+    """
+    Simulate ``count`` multivariate samples over ``topology``.
+
+    Args:
+        count: Number of samples
+        rng: NumPy generator; pass a seeded one for reproducible output
+        topology: Sensor DAG (default: ``pump_press()``)
+        fault_ratio: Approximate share of anomalous samples
+        faults: Fault kinds from ``FAULT_LIBRARY`` to draw from (default: all)
+        length: Time steps per series (one per minute)
+        id_offset: Dataset position of the first sample, which numbers the sample ids
+
+    Returns:
+        SampleBatch in the ``generate-data`` schema
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    topology = topology or pump_press()
+    fault_types = [FAULT_LIBRARY[k] for k in (faults or list(FAULT_LIBRARY))]
+    sensors = topology.sensors
+    baseline = np.array([s.baseline for s in sensors])
+    noise = np.array([s.noise_std for s in sensors])
+
+    values = rng.standard_normal((count, len(sensors), length))
+    values *= noise[None, :, None]
+    values += baseline[None, :, None]
+
+    is_anomaly = rng.random(count) < fault_ratio
+    anomalous = np.flatnonzero(is_anomaly)
+    n = len(anomalous)
+    start = rng.integers(length // 6, length * 2 // 3 + 1, size=n)
+    end = np.minimum(start + rng.integers(length // 6, length // 3 + 1, size=n), length)
+    kind_idx = rng.integers(0, len(fault_types), size=n)
+    root = np.empty(n, dtype=np.int64)
+
+    injected = np.zeros((n, len(sensors), length))
+    stuck_rows: List[np.ndarray] = []
+    for k, fault in enumerate(fault_types):
+        rows = np.flatnonzero(kind_idx == k)
+        if not len(rows):
+            continue
+        eligible = [i for i, s in enumerate(sensors) if fault.metrics is None or s.metric in fault.metrics]
+        if not eligible:
+            eligible = list(range(len(sensors)))
+        root[rows] = np.array(eligible)[rng.integers(0, len(eligible), size=len(rows))]
+        if not fault.propagates:
+            stuck_rows.append(rows)
+            continue
+        magnitude = rng.uniform(*fault.magnitude_sigma, size=len(rows)) * noise[root[rows]]
+        injected[rows, root[rows], :] = _fault_shapes(fault.kind, start[rows], end[rows], magnitude, length, rng)
+
+    if n:
+        values[anomalous] += TransferMatrix(topology, length).propagate(injected)
+    # Stuck sensors repeat their reading at fault onset; nothing downstream changes
+    for rows in stuck_rows:
+        t = np.arange(length)[None, :]
+        window = (t >= start[rows, None]) & (t < end[rows, None])
+        sample_rows, sensor_rows = anomalous[rows], root[rows]
+        held = values[sample_rows, sensor_rows, start[rows]]
+        values[sample_rows, sensor_rows, :] = np.where(window, held[:, None], values[sample_rows, sensor_rows, :])
+
+    ground_truth: Dict[str, Any] = {
+        "root_cause_component": np.full(count, NORMAL_GROUND_TRUTH["root_cause_component"], dtype=object),
+        "root_cause_metric": np.full(count, NORMAL_GROUND_TRUTH["root_cause_metric"], dtype=object),
+        "anomaly_start": np.full(count, -1),
+        "anomaly_end": np.full(count, -1),
+        "description": np.full(count, NORMAL_GROUND_TRUTH["description"], dtype=object),
+    }
+    if n:
+        components = np.array([s.component for s in sensors], dtype=object)
+        metrics = np.array([s.metric for s in sensors], dtype=object)
+        ground_truth["root_cause_component"][anomalous] = components[root]
+        ground_truth["root_cause_metric"][anomalous] = metrics[root]
+        ground_truth["anomaly_start"][anomalous] = start
+        ground_truth["anomaly_end"][anomalous] = end
+        ground_truth["description"][anomalous] = [
+            fault_types[k].description.format(component=c, metric=m)
+            for k, c, m in zip(kind_idx.tolist(), components[root], metrics[root])
+        ]
+
+    for key in ("root_cause_component", "root_cause_metric", "description"):
+        ground_truth[key] = ground_truth[key].astype(str)
+
+    return SampleBatch(
+        ids=sample_ids(count, id_offset),
+        metric_names=topology.sensor_names,
+        metrics=values,
+        ground_truth=ground_truth,
+        meta={"topology": topology.describe(), "duration_minutes": length},
+    )
+
+
+def pump_press() -> Topology:
+    """The ``rca_simple`` system: a hydraulic pump feeding a press."""
+    return Topology(
+        sensors=[
+            Sensor("pump_pressure", "Hydraulic Pump", "pressure", 150.0, 5.0),
+            Sensor("pump_temp", "Hydraulic Pump", "temperature", 60.0, 2.0),
+            Sensor("press_cycle_time", "Press Machine", "cycle_time", 200.0, 10.0),
+        ],
+        links=[
+            Link("pump_pressure", "press_cycle_time", gain=-2.5, lag=1),
+            Link("pump_pressure", "pump_temp", gain=0.1, lag=2),
+        ],
+    )
+
+
+# Per-machine template: (component suffix, sensors as (metric, baseline, noise)), upstream first
+_MACHINE_TEMPLATE = [
+    ("Hydraulic Pump", [("pressure", 150.0, 5.0), ("flow", 40.0, 1.5), ("temperature", 60.0, 2.0)]),
+    ("Press", [("force", 800.0, 20.0), ("cycle_time", 200.0, 10.0), ("vibration", 2.0, 0.2)]),
+    ("Conveyor", [("speed", 1.2, 0.05), ("motor_current", 12.0, 0.6)]),
+]
+
+
+def production_line(machines: int = 4) -> Topology:
+    """
+    A serial line of ``machines`` pump/press/conveyor cells (8 sensors each); every
+    conveyor feeds the next cell's press, so faults travel down the line.
+    """
+    sensors: List[Sensor] = []
+    links: List[Link] = []
+
+    def sid(m: int, component: str, metric: str) -> str:
+        return f"m{m}_{component.lower().replace(' ', '_')}_{metric}"
+
+    for m in range(1, machines + 1):
+        for component, specs in _MACHINE_TEMPLATE:
+            for metric, base, std in specs:
+                sensors.append(Sensor(sid(m, component, metric), f"M{m} {component}", metric, base, std))
+        links += [
+            Link(sid(m, "Hydraulic Pump", "pressure"), sid(m, "Hydraulic Pump", "flow"), gain=0.25, lag=0),
+            Link(sid(m, "Hydraulic Pump", "pressure"), sid(m, "Hydraulic Pump", "temperature"), gain=0.1, lag=2),
+            Link(sid(m, "Hydraulic Pump", "pressure"), sid(m, "Press", "force"), gain=4.0, lag=1),
+            Link(sid(m, "Press", "force"), sid(m, "Press", "cycle_time"), gain=-0.6, lag=1),
+            Link(sid(m, "Press", "force"), sid(m, "Press", "vibration"), gain=0.01, lag=0),
+            Link(sid(m, "Press", "cycle_time"), sid(m, "Conveyor", "speed"), gain=-0.004, lag=2),
+            Link(sid(m, "Conveyor", "speed"), sid(m, "Conveyor", "motor_current"), gain=8.0, lag=0),
+        ]
+        if m > 1:
+            links.append(Link(sid(m - 1, "Conveyor", "speed"), sid(m, "Press", "cycle_time"), gain=-120.0, lag=3))
+    return Topology(sensors=sensors, links=links)
+
+
+TOPOLOGIES = {
+    "pump_press": pump_press,
+    "production_line": production_line,
+}
@@ -0,0 +1,228 @@
+"""
+Leaderboard materialized view over the run files in RUN_DIR.
+
+One row per run plus the best run of every (model, dataset) pair live in
+``RUN_DIR/.index/leaderboard.sqlite``. The runner, the coordinator, the API and
+``runs merge`` update a single row whenever they write or remove a run file, so listing,
+sorting and filtering never parse run files. The index is rebuilt from RUN_DIR when it
+does not exist yet, or on ``factorybench runs reindex``.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+from threading import local
+import json
+import sqlite3
+
+from .config import RUN_DIR
+
+# Aggregate fields stored as columns so they can be sorted on
+AGGREGATE_COLUMNS = (
+    "samples", "ok_rate", "mean_abs_err_mean", "min_abs_err_mean", "max_abs_err_mean",
+    "performance", "cost_per_sample", "cost_total",
+)
+SORT_COLUMNS = {
+    "run_id": "run_id", "stage": "stage", "model": "model", "status": "status",
+    "dataset": "dataset_id", "started_at": "started_at",
+    **{c: c for c in AGGREGATE_COLUMNS},
+    # Column names used by the leaderboard page
+    "mean_err": "mean_abs_err_mean", "min_err": "min_abs_err_mean", "max_err": "max_abs_err_mean",
+}
+
+
+def best_run_key(run: Dict[str, Any]) -> Tuple[float, str]:
+    """Best run of a (model, dataset) pair: most samples processed, then most recent."""
+    return (run.get("aggregate", {}).get("samples", 0) or 0, run.get("started_at", "") or "")
+
+
+def summarize_run(run: Dict[str, Any]) -> Dict[str, Any]:
+    """The listing item ``GET /runs`` and ``GET /leaderboard`` return for a run."""
+    return {
+        "run_id": run.get("run_id"),
+        "stage": run.get("stage"),
+        "model": run.get("model"),
+        "status": run.get("status", "completed"),
+        "aggregate": run.get("aggregate", {}),
+        "dataset": run.get("dataset", {}),
+        "started_at": run.get("started_at"),
+    }
+
+
+class LeaderboardIndex:
+    """SQLite-backed view; one connection per thread, like ``SQLiteStateBackend``."""
+
+    def __init__(self, run_dir: Path, path: Optional[Path] = None):
+        self.run_dir = Path(run_dir).resolve()
+        self.path = Path(path or self.run_dir / ".index" / "leaderboard.sqlite")
+        self._local = local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fresh = not self.path.exists()
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            columns = ", ".join(f"{c} REAL" for c in AGGREGATE_COLUMNS)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs (run_id TEXT PRIMARY KEY, stage TEXT, model TEXT, dataset_id TEXT, "
+                f"status TEXT, started_at TEXT, {columns}, item TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS runs_group ON runs (model, dataset_id, samples, started_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS best (model TEXT, dataset_id TEXT, run_id TEXT NOT NULL, PRIMARY KEY (model, dataset_id))")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._local.conn = conn
+            if fresh:
+                self.rebuild()
+        return conn
+
+    def _owns(self, path: Path) -> bool:
+        return Path(path).resolve().parent == self.run_dir
+
+    def _bump(self, conn: sqlite3.Connection):
+        conn.execute("INSERT INTO meta (key, value) VALUES ('version', 1) ON CONFLICT(key) DO UPDATE SET value = value + 1")
+
+    def _refresh_best(self, conn: sqlite3.Connection, model: str, dataset_id: str):
+        row = conn.execute(
+            "SELECT run_id FROM runs WHERE model IS ? AND dataset_id IS ? "
+            "ORDER BY COALESCE(samples, 0) DESC, COALESCE(started_at, '') DESC LIMIT 1",
+            (model, dataset_id),
+        ).fetchone()
+        if row:
+            conn.execute("INSERT OR REPLACE INTO best (model, dataset_id, run_id) VALUES (?, ?, ?)", (model, dataset_id, row[0]))
+        else:
+            conn.execute("DELETE FROM best WHERE model IS ? AND dataset_id IS ?", (model, dataset_id))
+
+    def _write(self, conn: sqlite3.Connection, run: Dict[str, Any]):
+        item = summarize_run(run)
+        agg = item["aggregate"] or {}
+        dataset_id = (item["dataset"] or {}).get("dataset_id")
+        values = [agg.get(c) if isinstance(agg.get(c), (int, float)) else None for c in AGGREGATE_COLUMNS]
+        conn.execute(
+            f"INSERT OR REPLACE INTO runs (run_id, stage, model, dataset_id, status, started_at, {', '.join(AGGREGATE_COLUMNS)}, item) "
+            f"VALUES ({', '.join('?' * (7 + len(AGGREGATE_COLUMNS)))})",
+            (item["run_id"], item["stage"], item["model"], dataset_id, item["status"], item["started_at"], *values, json.dumps(item)),
+        )
+        current = conn.execute(
+            "SELECT r.run_id, r.samples, r.started_at FROM best b JOIN runs r ON r.run_id = b.run_id "
+            "WHERE b.model IS ? AND b.dataset_id IS ?",
+            (item["model"], dataset_id),
+        ).fetchone()
+        if current and current[0] == item["run_id"]:
+            # The best run itself changed; it may no longer be the best
+            self._refresh_best(conn, item["model"], dataset_id)
+        elif current is None or best_run_key(run) >= (current[1] or 0, current[2] or ""):
+            conn.execute("INSERT OR REPLACE INTO best (model, dataset_id, run_id) VALUES (?, ?, ?)", (item["model"], dataset_id, item["run_id"]))
+
+    def upsert(self, run: Dict[str, Any], path: Optional[Path] = None):
+        """Record a run written to ``path`` (default: its file in RUN_DIR); other directories are ignored."""
+        if path is not None and not self._owns(path):
+            return
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write(conn, run)
+            self._bump(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, run_id: str):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT model, dataset_id FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+                if conn.execute("SELECT 1 FROM best WHERE run_id = ?", (run_id,)).fetchone():
+                    self._refresh_best(conn, row[0], row[1])
+                self._bump(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def rebuild(self) -> int:
+        """Re-read every run file in RUN_DIR; returns the number indexed."""
+        conn = self._conn()
+        count = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM runs")
+            conn.execute("DELETE FROM best")
+            for p in sorted(self.run_dir.glob("*.json")):
+                try:
+                    with p.open("r", encoding="utf-8") as f:
+                        run = json.load(f)
+                except (json.JSONDecodeError, OSError):
+                    continue
+                run.setdefault("run_id", p.stem)
+                self._write(conn, run)
+                count += 1
+            self._bump(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return count
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Listing item of one run, or None if it is not indexed."""
+        row = self._conn().execute("SELECT item FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def models(self) -> List[str]:
+        """Distinct models with at least one run."""
+        rows = self._conn().execute("SELECT DISTINCT model FROM runs WHERE model IS NOT NULL ORDER BY model").fetchall()
+        return [row[0] for row in rows]
+
+    def version(self) -> int:
+        """Increases with every change to the view."""
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def query(
+        self,
+        models: Optional[List[str]] = None,
+        datasets: Optional[List[str]] = None,
+        stage: Optional[str] = None,
+        best_only: bool = False,
+        sort: str = "run_id",
+        order: str = "desc",
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Filtered, sorted page of listing items.
+
+        Raises:
+            ValueError: Unknown sort column
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort '{sort}'. Valid: {', '.join(sorted(SORT_COLUMNS))}")
+        where, params = [], []
+        for column, values in (("model", models), ("dataset_id", datasets)):
+            if values:
+                where.append(f"r.{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if stage:
+            where.append("r.stage = ?")
+            params.append(stage)
+        source = "runs r JOIN best b ON b.run_id = r.run_id" if best_only else "runs r"
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        column = SORT_COLUMNS[sort]
+        fallback = "0" if column in AGGREGATE_COLUMNS else "''"
+        direction = "ASC" if order == "asc" else "DESC"
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM {source}{clause}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT r.item FROM {source}{clause} ORDER BY COALESCE(r.{column}, {fallback}) {direction}, r.run_id {direction} "
+            "LIMIT ? OFFSET ?",
+            (*params, -1 if limit is None else limit, offset),
+        ).fetchall()
+        return {"items": [json.loads(row[0]) for row in rows], "count": total, "version": self.version()}
+
+
+# Global singleton instance
+leaderboard = LeaderboardIndex(RUN_DIR)
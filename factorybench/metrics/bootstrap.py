@@ -0,0 +1,142 @@
+"""
+Vectorized bootstrap confidence intervals and paired tests over per-sample scores.
+
+Each block of resamples is drawn as one index matrix, turned into per-sample draw counts
+with a single ``bincount`` and reduced with one matrix product. Blocks bound memory on
+50k-sample runs; 2000 resamples of 50k samples take about two seconds, and small runs
+take milliseconds.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .telemetry_literacy import ERROR_KEYS, sample_performance
+
+DEFAULT_RESAMPLES = 2000
+# Elements of a (resamples x samples) count block evaluated at once
+_BLOCK_ELEMENTS = 4_000_000
+
+# Per-sample result metric -> aggregate key it averages into
+STAGE_COLUMNS = {
+    "telemetry_literacy": {k: f"{k}_mean" for k in ERROR_KEYS},
+    "root_cause_analysis": {
+        "detection_correct": "detection_accuracy",
+        "component_correct": "component_accuracy",
+        "metric_correct": "metric_accuracy",
+    },
+}
+
+
+def metric_columns(stage: str, results: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """One array per aggregate key, one entry per result; NaN where the sample has no value."""
+    columns = {}
+    for metric, key in STAGE_COLUMNS.get(stage, {}).items():
+        values = [(r.get("metrics") or {}).get(metric) for r in results]
+        columns[key] = np.array([float(v) if isinstance(v, (int, float)) else np.nan for v in values], dtype=float)
+    return columns
+
+
+def _resampled_means(data: np.ndarray, resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """(resamples x metrics) NaN-aware column means of bootstrap resamples of ``data`` rows."""
+    n, k = data.shape
+    present = ~np.isnan(data)
+    # Sums and counts of present values come out of one matrix product per block
+    stacked = np.hstack([np.where(present, data, 0.0), present.astype(float)])
+    out = np.empty((resamples, k))
+    block = max(1, _BLOCK_ELEMENTS // n)
+    for start in range(0, resamples, block):
+        rows = min(resamples, start + block) - start
+        # How often each sample is drawn in each resample, via one bincount over offset indices
+        idx = rng.integers(0, n, size=(rows, n), dtype=np.int64)
+        idx += (np.arange(rows, dtype=np.int64) * n)[:, None]
+        counts = np.bincount(idx.ravel(), minlength=rows * n).reshape(rows, n).astype(float)
+        totals = counts @ stacked
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[start:start + rows] = totals[:, :k] / totals[:, k:]
+    return out
+
+
+def _interval(point: float, draws: np.ndarray, confidence: float) -> Dict[str, float]:
+    alpha = (1.0 - confidence) / 2.0
+    draws = draws[~np.isnan(draws)]
+    if not draws.size:
+        return {"value": point, "low": point, "high": point}
+    low, high = np.quantile(draws, [alpha, 1.0 - alpha])
+    return {"value": point, "low": float(low), "high": float(high)}
+
+
+def bootstrap_intervals(
+    stage: str,
+    results: List[Dict[str, Any]],
+    resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Percentile bootstrap interval for every per-sample aggregate key of a run.
+
+    Samples are resampled jointly across metrics. Stage 1 ``performance`` is rebuilt from
+    the three error means of each resample, exactly as the aggregate defines it.
+
+    Returns:
+        ``{aggregate_key: {"value", "low", "high"}}``
+    """
+    columns = metric_columns(stage, results)
+    if not columns or not results:
+        return {}
+    keys = list(columns)
+    data = np.column_stack([columns[k] for k in keys])
+    draws = _resampled_means(data, resamples, np.random.default_rng(seed))
+    with np.errstate(invalid="ignore"):
+        points = np.nanmean(data, axis=0) if (~np.isnan(data)).any() else np.full(len(keys), np.nan)
+    intervals = {
+        key: _interval(float(points[i]), draws[:, i], confidence)
+        for i, key in enumerate(keys)
+        if not np.isnan(points[i])
+    }
+    if stage == "telemetry_literacy":
+        # The aggregate counts a missing error mean as 0
+        perf_draws = np.nan_to_num(draws).mean(axis=1)
+        intervals["performance"] = _interval(float(np.nan_to_num(points).mean()), perf_draws, confidence)
+    return intervals
+
+
+def _sample_scores(stage: str, results: List[Dict[str, Any]]) -> Dict[Any, Optional[float]]:
+    """Per-sample primary score by id: Stage 1 performance, Stage 2 component correctness."""
+    if stage == "telemetry_literacy":
+        return {r.get("id"): sample_performance(r.get("metrics") or {}) for r in results}
+    return {r.get("id"): (r.get("metrics") or {}).get("component_correct") for r in results}
+
+
+def paired_test(
+    stage: str,
+    results_a: List[Dict[str, Any]],
+    results_b: List[Dict[str, Any]],
+    resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Paired bootstrap test of run A minus run B on the samples both scored.
+
+    Pairs by sample id, so both runs must share a dataset. The p-value is two-sided: twice
+    the share of resampled mean differences on the far side of zero.
+    """
+    a = _sample_scores(stage, results_a)
+    b = _sample_scores(stage, results_b)
+    common = [sid for sid in a if sid is not None and sid in b and a[sid] is not None and b[sid] is not None]
+    out: Dict[str, Any] = {"paired_samples": len(common)}
+    if len(common) < 2:
+        return out
+    diff = np.array([float(a[sid]) - float(b[sid]) for sid in common])
+    draws = _resampled_means(diff[:, None], resamples, np.random.default_rng(seed))[:, 0]
+    interval = _interval(float(diff.mean()), draws, confidence)
+    tail = min((draws <= 0).mean(), (draws >= 0).mean())
+    out.update({
+        "mean_diff": interval["value"],
+        "diff_low": interval["low"],
+        "diff_high": interval["high"],
+        # A bootstrap cannot resolve p below 1/resamples
+        "p_value": float(min(1.0, max(2.0 * tail, 1.0 / resamples))),
+    })
+    return out
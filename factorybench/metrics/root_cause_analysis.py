@@ -0,0 +1,167 @@
+from collections import Counter
+from typing import Any, Dict, List, Optional
+import json
+import re
+
+import numpy as np
+
+NONE_LABEL = "none"
+ONSET_TOLERANCE = 5
+
+_FIELD_RE = re.compile(r'"?(component|metric|start|end)"?\s*[:=]\s*"?([^",}\n]*)', re.IGNORECASE)
+
+
+def _label(value: Any) -> str:
+    """Normalize a component/metric label for comparison ("Hydraulic Pump" -> "hydraulic_pump")."""
+    text = str(value if value is not None else "").strip().lower().replace(" ", "_")
+    return text if text and text not in ("null", "n/a", "-") else NONE_LABEL
+
+
+def _index(value: Any) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return -1
+
+
+def answer_complete(text: str) -> bool:
+    """True once ``text`` holds a closed JSON answer with all four fields."""
+    match = re.search(r"\{.*?\}", text or "", re.DOTALL)
+    if not match:
+        return False
+    try:
+        obj = json.loads(match.group(0))
+    except ValueError:
+        return False
+    return isinstance(obj, dict) and {"component", "metric", "start", "end"} <= {str(k).lower() for k in obj}
+
+
+def parse_prediction(text: str) -> Dict[str, Any]:
+    """
+    Parse ``{"component": ..., "metric": ..., "start": int, "end": int}`` from model output.
+
+    Falls back to ``key: value`` / ``key=value`` lines. Missing fields default to
+    ``None``/-1; ``parsed`` is False when no field was found.
+    """
+    fields: Dict[str, str] = {}
+    match = re.search(r"\{.*?\}", text or "", re.DOTALL)
+    if match:
+        try:
+            obj = json.loads(match.group(0))
+            if isinstance(obj, dict):
+                fields = {k.lower(): v for k, v in obj.items() if isinstance(k, str)}
+        except ValueError:
+            pass
+    if not fields:
+        fields = {k.lower(): v.strip() for k, v in _FIELD_RE.findall(text or "")}
+    return {
+        "parsed": bool(fields),
+        "component": _label(fields.get("component")),
+        "metric": _label(fields.get("metric")),
+        "start": _index(fields.get("start")),
+        "end": _index(fields.get("end")),
+    }
+
+
+def vote_prediction(texts: List[str]) -> str:
+    """
+    Majority-vote answer of several completions.
+
+    The most frequent (component, metric) pair among parsed answers wins (earliest on a
+    tie); start and end are the medians of the answers that named it.
+    """
+    parsed = [p for p in (parse_prediction(t) for t in texts) if p["parsed"]]
+    if not parsed:
+        return texts[0] if texts else ""
+    # most_common keeps first-seen order among equal counts
+    component, metric = Counter((p["component"], p["metric"]) for p in parsed).most_common(1)[0][0]
+    voters = [p for p in parsed if (p["component"], p["metric"]) == (component, metric)]
+    return json.dumps({
+        "component": component,
+        "metric": metric,
+        "start": int(np.median([p["start"] for p in voters])),
+        "end": int(np.median([p["end"] for p in voters])),
+    })
+
+
+def ground_truth_arrays(ground_truths: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    return {
+        "component": np.array([_label(g.get("root_cause_component")) for g in ground_truths], dtype=str),
+        "metric": np.array([_label(g.get("root_cause_metric")) for g in ground_truths], dtype=str),
+        "start": np.array([_index(g.get("anomaly_start")) for g in ground_truths], dtype=np.int64),
+        "end": np.array([_index(g.get("anomaly_end")) for g in ground_truths], dtype=np.int64),
+    }
+
+
+def prediction_arrays(predictions: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    return {
+        "parsed": np.array([p["parsed"] for p in predictions], dtype=bool),
+        "component": np.array([p["component"] for p in predictions], dtype=str),
+        "metric": np.array([p["metric"] for p in predictions], dtype=str),
+        "start": np.array([p["start"] for p in predictions], dtype=np.int64),
+        "end": np.array([p["end"] for p in predictions], dtype=np.int64),
+    }
+
+
+def score_arrays(gt: Dict[str, np.ndarray], pred: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Score a whole run at once.
+
+    Windows are half-open ``[start, end)`` as produced by ``generate-data``. ``iou`` and
+    ``onset_error`` are NaN for samples whose ground truth is normal operation; a missing
+    or empty predicted window on an anomalous sample scores IoU 0 and no onset error.
+    Unparseable predictions are wrong on every classification.
+    """
+    parsed = pred["parsed"]
+    gt_anomaly = gt["component"] != NONE_LABEL
+    pred_anomaly = pred["component"] != NONE_LABEL
+    pred_window = (pred["start"] >= 0) & (pred["end"] > pred["start"])
+
+    # Accept a predicted sensor name that contains the quantity ("pump_pressure" ~ "pressure")
+    metric_match = (pred["metric"] == gt["metric"]) | (gt_anomaly & (np.char.find(pred["metric"], gt["metric"]) >= 0))
+
+    inter = np.clip(np.minimum(pred["end"], gt["end"]) - np.maximum(pred["start"], gt["start"]), 0, None)
+    union = (gt["end"] - gt["start"]) + (pred["end"] - pred["start"]) - inter
+    iou = np.where(pred_window, inter / np.maximum(union, 1), 0.0)
+    onset = np.abs(pred["start"] - gt["start"]).astype(float)
+
+    return {
+        "detection_correct": parsed & (gt_anomaly == pred_anomaly),
+        "component_correct": parsed & (pred["component"] == gt["component"]),
+        "metric_correct": parsed & metric_match,
+        "iou": np.where(gt_anomaly, iou, np.nan),
+        "onset_error": np.where(gt_anomaly & pred_window, onset, np.nan),
+    }
+
+
+def _nanmean(values: np.ndarray) -> Optional[float]:
+    values = values[~np.isnan(values)]
+    return float(values.mean()) if values.size else None
+
+
+def aggregate(scores: Dict[str, np.ndarray], parsed: np.ndarray) -> Dict[str, float]:
+    agg: Dict[str, float] = {}
+    n = len(parsed)
+    if not n:
+        return agg
+    agg["samples"] = float(n)
+    agg["parse_rate"] = float(parsed.mean())
+    agg["detection_accuracy"] = float(scores["detection_correct"].mean())
+    agg["component_accuracy"] = float(scores["component_correct"].mean())
+    agg["metric_accuracy"] = float(scores["metric_correct"].mean())
+    anomalous = ~np.isnan(scores["iou"])
+    agg["anomalies"] = float(anomalous.sum())
+    for key, value in (("window_iou_mean", _nanmean(scores["iou"])), ("onset_error_mean", _nanmean(scores["onset_error"]))):
+        if value is not None:
+            agg[key] = value
+    if anomalous.any():
+        within = scores["onset_error"][anomalous] <= ONSET_TOLERANCE
+        agg[f"onset_within_{ONSET_TOLERANCE}"] = float(within.mean())
+    return agg
+
+
+def score_run(ground_truths: List[Dict[str, Any]], predictions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Vectorized per-sample scores and run aggregate for parsed predictions."""
+    pred = prediction_arrays(predictions)
+    scores = score_arrays(ground_truth_arrays(ground_truths), pred)
+    return {"scores": scores, "aggregate": aggregate(scores, pred["parsed"])}
@@ -0,0 +1,203 @@
+"""
+Running confidence intervals for sequential early stopping.
+
+A ``SequentialMonitor`` sees one value per metric after every sample and tests whether
+the run can stop at ``min_samples`` and then every ``check_every`` samples or every 10%
+more samples, whichever is further apart. Because the test is repeated, check ``k``
+uses error level ``delta / (k * (k + 1))``; the levels sum to ``delta``, so the reported
+interval holds at the stated confidence however many checks ran.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import math
+
+import numpy as np
+
+METHODS = ("bernstein", "bootstrap")
+
+
+@dataclass
+class EarlyStopping:
+    """Opt-in stopping rule for ``runner.run_stage``."""
+    half_width: Optional[float] = None  # stop when every tracked interval is this narrow
+    rel_half_width: Optional[float] = None  # ... or this narrow relative to its mean
+    reference_run: Optional[str] = None  # stop once the ranking against this run is decided
+    confidence: float = 0.95
+    method: str = "bernstein"
+    min_samples: int = 30
+    check_every: int = 10
+    bootstrap_resamples: int = 2000
+
+    def __post_init__(self):
+        if self.half_width is None and self.rel_half_width is None and self.reference_run is None:
+            raise ValueError("Early stopping needs a half-width target or a reference run")
+        if self.method not in METHODS:
+            raise ValueError(f"Unknown early stopping method '{self.method}'; use {' or '.join(METHODS)}")
+        if not 0.0 < self.confidence < 1.0:
+            raise ValueError("Confidence must be between 0 and 1")
+        if self.min_samples < 2 or self.check_every < 1:
+            raise ValueError("Early stopping needs min_samples >= 2 and check_every >= 1")
+
+
+class _RunningStat:
+    """Welford mean/variance plus range; keeps the values for the bootstrap."""
+
+    def __init__(self, keep_values: bool):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.low = math.inf
+        self.high = -math.inf
+        self.values: Optional[List[float]] = [] if keep_values else None
+
+    def push(self, x: float):
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self._m2 += d * (x - self.mean)
+        self.low = min(self.low, x)
+        self.high = max(self.high, x)
+        if self.values is not None:
+            self.values.append(x)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+
+def bernstein_half_width(n: int, variance: float, value_range: float, delta: float) -> float:
+    """
+    Two-sided empirical-Bernstein half-width (Maurer & Pontil, 2009).
+
+    The bound assumes values in a known range; the observed range stands in for it, as
+    error metrics have no fixed upper bound.
+    """
+    if n < 2:
+        return math.inf
+    log_term = math.log(4.0 / delta)
+    return math.sqrt(2.0 * variance * log_term / n) + 7.0 * value_range * log_term / (3.0 * (n - 1))
+
+
+def bootstrap_half_width(values: np.ndarray, delta: float, resamples: int, rng: np.random.Generator) -> float:
+    """Half the width of the percentile bootstrap interval for the mean, resampled in one batch."""
+    if values.size < 2:
+        return math.inf
+    idx = rng.integers(0, values.size, size=(resamples, values.size))
+    means = values[idx].mean(axis=1)
+    low, high = np.quantile(means, [delta / 2.0, 1.0 - delta / 2.0])
+    return float(high - low) / 2.0
+
+
+class SequentialMonitor:
+    """
+    Tracks per-sample values of aggregate metrics and decides when a run may stop.
+
+    Args:
+        rule: Stopping rule
+        primary: Metric compared against the reference run
+        higher_is_better: Direction of ``primary``
+        reference: ``(value, half_width)`` of ``primary`` in the reference run
+        value_range: Known width of the per-sample value range (1.0 for accuracies);
+            the observed range is used when None
+    """
+
+    def __init__(
+        self,
+        rule: EarlyStopping,
+        primary: str,
+        higher_is_better: bool = False,
+        reference: Optional[Tuple[float, float]] = None,
+        value_range: Optional[float] = None,
+    ):
+        self.rule = rule
+        self.primary = primary
+        self.higher_is_better = higher_is_better
+        self.reference = reference
+        self.value_range = value_range
+        # One entry per aggregate key the stage reports per sample
+        self.stats: Dict[str, _RunningStat] = {}
+        self.samples = 0
+        self.checks = 0
+        self.next_check = rule.min_samples
+        self.reason: Optional[str] = None
+        self._rng = np.random.default_rng(0)
+        self._intervals: Dict[str, Tuple[float, float]] = {}
+
+    def _delta(self, check: int) -> float:
+        return (1.0 - self.rule.confidence) / (check * (check + 1))
+
+    def _half_width(self, stat: _RunningStat, delta: float) -> float:
+        if self.rule.method == "bootstrap":
+            return bootstrap_half_width(np.asarray(stat.values), delta, self.rule.bootstrap_resamples, self._rng)
+        value_range = self.value_range if self.value_range is not None else stat.high - stat.low
+        return bernstein_half_width(stat.n, stat.variance, value_range, delta)
+
+    def _compute_intervals(self, delta: float):
+        self._intervals = {m: (stat.mean, self._half_width(stat, delta)) for m, stat in self.stats.items() if stat.n}
+
+    def update(self, values: Dict[str, Optional[float]]) -> Optional[str]:
+        """Record one sample; returns the stopping reason once the run should stop."""
+        self.samples += 1
+        for metric, value in values.items():
+            stat = self.stats.get(metric)
+            if stat is None:
+                stat = self.stats[metric] = _RunningStat(keep_values=self.rule.method == "bootstrap")
+            if value is not None and math.isfinite(value):
+                stat.push(float(value))
+        if self.samples < self.next_check:
+            return None
+        self.next_check = self.samples + max(self.rule.check_every, self.samples // 10)
+        self.checks += 1
+        self._compute_intervals(self._delta(self.checks))
+        self.reason = self._decide()
+        return self.reason
+
+    def _reference_decided(self) -> bool:
+        if self.reference is None or self.primary not in self._intervals:
+            return False
+        mean, hw = self._intervals[self.primary]
+        ref_value, ref_hw = self.reference
+        return abs(mean - ref_value) > hw + ref_hw
+
+    def _decide(self) -> Optional[str]:
+        if self._reference_decided():
+            return "reference_decided"
+        if len(self._intervals) < len(self.stats):
+            return None
+        if self.rule.half_width is not None and all(hw <= self.rule.half_width for _, hw in self._intervals.values()):
+            return "half_width"
+        if self.rule.rel_half_width is not None and all(
+            hw <= self.rule.rel_half_width * abs(mean) for mean, hw in self._intervals.values()
+        ):
+            return "half_width"
+        return None
+
+    def ranking(self) -> Optional[str]:
+        """``better``/``worse`` than the reference run once decided, else ``undecided``."""
+        if self.reference is None:
+            return None
+        if not self._reference_decided():
+            return "undecided"
+        better = self._intervals[self.primary][0] > self.reference[0]
+        return "better" if better == self.higher_is_better else "worse"
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate fields: stopping reason, method, and each tracked metric's interval."""
+        if self.reason is None:
+            # Ran out of samples; report at the level the next check would have used
+            self._compute_intervals(self._delta(self.checks + 1))
+        out: Dict[str, Any] = {
+            "early_stop_reason": self.reason or "samples_exhausted",
+            "early_stop_method": self.rule.method,
+            "early_stop_confidence": self.rule.confidence,
+            "early_stop_checks": float(self.checks),
+        }
+        for metric, (mean, hw) in self._intervals.items():
+            if math.isfinite(hw):
+                out[f"{metric}_ci_low"] = mean - hw
+                out[f"{metric}_ci_high"] = mean + hw
+                out[f"{metric}_ci_half_width"] = hw
+        if self.reference is not None:
+            out["early_stop_reference"] = self.rule.reference_run
+            out["early_stop_ranking"] = self.ranking()
+        return out
@@ -1,5 +1,8 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import math
+import statistics
+
+ERROR_KEYS = ("mean_abs_err", "min_abs_err", "max_abs_err")
 
 
 def parse_prediction(text: str) -> Dict[str, float]:
@@ -16,6 +19,30 @@ def parse_prediction(text: str) -> Dict[str, float]:
     return out
 
 
+def answer_complete(text: str) -> bool:
+    """
+    True once ``text`` holds mean, min and max and none of them can still grow.
+
+    A streamed answer may end mid-number ("max=12" before "3.5" arrives), so the last
+    token only counts once whitespace or a comma follows it.
+    """
+    text = text.replace(",", " ")
+    if text and not text[-1].isspace():
+        text = text[:len(text) - len(text.split()[-1])]
+    return all(k in parse_prediction(text) for k in ("mean", "min", "max"))
+
+
+def vote_prediction(texts: List[str]) -> str:
+    """Median-vote answer of several completions: each statistic's median over the completions that gave it."""
+    parsed = [parse_prediction(t) for t in texts]
+    out = []
+    for k in ("mean", "min", "max"):
+        values = [p[k] for p in parsed if k in p]
+        if values:
+            out.append(f"{k}={statistics.median(values)}")
+    return " ".join(out)
+
+
 def series_stats(series: List[float]) -> Dict[str, float]:
     if not series:
         return {"mean": math.nan, "min": math.nan, "max": math.nan}
@@ -36,9 +63,28 @@ def score_sample(sample: Dict[str, Any], pred_text: str) -> Dict[str, Any]:
             metrics[f"{k}_abs_err"] = abs(pred[k] - statistics[k])
         else:
             metrics["ok"] = False
+
+    # Input reduction (eval/reduction.py): the error an exact reading of the reduced input
+    # would still have, and the prompt size with and without the reduction
+    reduction = sample.get("reduction")
+    if reduction:
+        metrics["reduction"] = reduction["mode"]
+        for k in ("mean", "min", "max"):
+            if k in statistics:
+                metrics[f"reduction_{k}_abs_err"] = abs(reduction["statistics"][k] - statistics[k])
+        metrics["prompt_chars"] = reduction["prompt_chars"]
+        metrics["full_prompt_chars"] = reduction["full_prompt_chars"]
     return metrics
 
 
+def sample_performance(metrics: Dict[str, Any]) -> Optional[float]:
+    """Per-sample performance (mean of the three absolute errors); None unless all three parsed."""
+    errors = [metrics.get(k) for k in ERROR_KEYS]
+    if any(not isinstance(e, (int, float)) for e in errors):
+        return None
+    return sum(errors) / 3.0
+
+
 def aggregate(scores: List[Dict[str, Any]]) -> Dict[str, float]:
     agg: Dict[str, float] = {}
     if not scores:
@@ -47,7 +93,8 @@ def aggregate(scores: List[Dict[str, Any]]) -> Dict[str, float]:
     for k in keys:
         vals = [s.get(k) for s in scores if isinstance(s.get(k), (int, float))]
         if vals:
-            agg[f"{k}_mean"] = sum(vals) / len(vals)
+            # fsum is order-independent, so merged shard runs aggregate exactly
+            agg[f"{k}_mean"] = math.fsum(vals) / len(vals)
     agg["samples"] = float(len(scores))
     agg["ok_rate"] = sum(1 for s in scores if s.get("ok")) / max(1, len(scores))
     
@@ -56,5 +103,12 @@ def aggregate(scores: List[Dict[str, Any]]) -> Dict[str, float]:
     min_err = agg.get("min_abs_err_mean", 0.0)
     max_err = agg.get("max_abs_err_mean", 0.0)
     agg["performance"] = (mean_err + min_err + max_err) / 3.0
+
+    floors = [agg.get(f"reduction_{k}_mean") for k in ERROR_KEYS]
+    if all(isinstance(f, float) for f in floors):
+        agg["reduction_performance_floor"] = sum(floors) / 3.0
+    full_chars = sum(s.get("full_prompt_chars", 0) for s in scores)
+    if full_chars:
+        agg["prompt_chars_saved_ratio"] = 1.0 - sum(s.get("prompt_chars", 0) for s in scores) / full_chars
     
     return agg
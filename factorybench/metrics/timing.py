@@ -0,0 +1,62 @@
+from typing import Any, Dict, List, Optional
+import math
+
+PHASES = ("build_prompt", "generate", "score", "persist")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (q in [0, 100]), matching numpy's default."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100.0
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def summarize_timings(
+    timings: List[Dict[str, float]],
+    wall_s: Optional[float] = None,
+    total_tokens: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Aggregate per-sample phase timings (``<phase>_ms``) into run-level speed metrics.
+
+    Model latency is the ``generate`` phase; throughput uses the run's wall clock.
+    """
+    agg: Dict[str, Any] = {}
+    if not timings:
+        return agg
+
+    latencies = [t["generate_ms"] for t in timings if isinstance(t.get("generate_ms"), (int, float))]
+    if latencies:
+        agg["latency_mean_ms"] = sum(latencies) / len(latencies)
+        agg["latency_p50_ms"] = percentile(latencies, 50)
+        agg["latency_p95_ms"] = percentile(latencies, 95)
+        agg["latency_p99_ms"] = percentile(latencies, 99)
+
+    # Streamed calls only
+    ttfts = [t["ttft_ms"] for t in timings if isinstance(t.get("ttft_ms"), (int, float))]
+    if ttfts:
+        agg["ttft_p50_ms"] = percentile(ttfts, 50)
+        agg["ttft_p95_ms"] = percentile(ttfts, 95)
+    itls = [t["itl_ms"] for t in timings if isinstance(t.get("itl_ms"), (int, float))]
+    if itls:
+        agg["itl_ms_mean"] = sum(itls) / len(itls)
+    cutoffs = [t["stream_cutoff"] for t in timings if isinstance(t.get("stream_cutoff"), (int, float))]
+    if cutoffs:
+        agg["stream_cutoff_rate"] = sum(cutoffs) / len(cutoffs)
+
+    for phase in PHASES:
+        if phase == "generate":
+            continue
+        vals = [t[f"{phase}_ms"] for t in timings if isinstance(t.get(f"{phase}_ms"), (int, float))]
+        if vals:
+            agg[f"{phase}_ms_mean"] = sum(vals) / len(vals)
+
+    if wall_s and wall_s > 0:
+        agg["wall_s"] = wall_s
+        agg["samples_per_sec"] = len(timings) / wall_s
+        agg["tokens_per_sec"] = total_tokens / wall_s
+    return agg
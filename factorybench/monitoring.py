@@ -0,0 +1,185 @@
+"""
+In-process metrics registry rendered in the Prometheus text exposition format.
+
+Metrics are plain counters, gauges and histograms keyed by label values. Each update
+is a dict lookup and an add under a lock, cheap enough for the per-sample and
+per-request hot paths. All FactoryBench metrics are declared at the bottom of this
+module so every import site shares the same instances.
+"""
+import bisect
+import math
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _label_str(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(f'{extra[0]}="{extra[1]}"')
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{self._label_str(k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][idx] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()]
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (math.inf,), counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{self._label_str(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_str(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._label_str(key)} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))  # type: ignore[return-value]
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# API
+HTTP_REQUESTS = REGISTRY.counter("factorybench_http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+HTTP_LATENCY = REGISTRY.histogram("factorybench_http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+CHART_CACHE = REGISTRY.counter("factorybench_chart_cache_total", "Chart requests served from cache (hit) or re-rendered (miss)", ("result",))
+CHART_RENDER_SECONDS = REGISTRY.histogram("factorybench_chart_render_seconds", "Time spent in generate_all_charts", buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+
+# Runs
+QUEUED_RUNS = REGISTRY.gauge("factorybench_queued_runs", "Runs accepted but still loading their dataset")
+ACTIVE_RUNS = REGISTRY.gauge("factorybench_active_runs", "Runs currently evaluating samples")
+RUNS_FINISHED = REGISTRY.counter("factorybench_runs_finished_total", "Runs that reached a terminal status", ("status",))
+SAMPLES_PROCESSED = REGISTRY.counter("factorybench_samples_processed_total", "Samples evaluated", ("model",))
+SAMPLE_GENERATE_SECONDS = REGISTRY.histogram("factorybench_generate_duration_seconds", "Model call latency per sample", ("model",))
+TOKENS = REGISTRY.counter("factorybench_tokens_total", "Tokens consumed", ("model", "kind"))
+COST_USD = REGISTRY.counter("factorybench_cost_usd_total", "Estimated spend in USD", ("model",))
+
+# Adapters
+ADAPTER_REQUESTS = REGISTRY.counter("factorybench_adapter_requests_total", "Model adapter calls", ("adapter",))
+ADAPTER_ERRORS = REGISTRY.counter("factorybench_adapter_errors_total", "Failed model adapter calls by kind (throttle or error)", ("adapter", "kind"))
+ADAPTER_HEDGES = REGISTRY.counter("factorybench_adapter_hedges_total", "Duplicate requests sent for slow model calls, by which call answered first", ("adapter", "winner"))
+
+
+def error_kind(error: BaseException) -> str:
+    """Classify an adapter exception as ``throttle`` (HTTP 429) or ``error``."""
+    if type(error).__name__ == "RateLimitError" or getattr(error, "status_code", None) == 429:
+        return "throttle"
+    return "error"
@@ -0,0 +1,189 @@
+"""
+Opt-in per-phase profiling for runs and API requests.
+
+Each phase (dataset load, evaluation loop, persistence, chart rendering) gets its own
+cProfile profile and tracemalloc peak. Phases may nest: while an inner phase is active
+the outer one is paused, so every function call and every second of wall time is
+attributed to exactly one phase.
+tracemalloc is process-wide, and from Python 3.12 so is the profiling hook cProfile
+installs, so only one ``RunProfiler`` may be active per process at a time. A profiler
+claims that slot when it starts (or earlier, via ``claim``) and frees it in ``save``.
+Output goes to ``RUN_DIR/profiles/<id>/``:
+
+- ``<phase>.prof``: pstats dump, viewable with snakeviz, tuna or flameprof
+- ``summary.json``: wall time, peak traced memory and top functions per phase
+"""
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from .config import RUN_DIR
+
+PROFILE_DIR = RUN_DIR / "profiles"
+
+# Held by the active RunProfiler, from claim() to save()
+_active = Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Another profiler is active in this process."""
+
+
+class _PhaseStats:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.wall_s = 0.0
+        self.calls = 0
+        self.peak_bytes = 0
+        self.net_bytes = 0
+
+
+class RunProfiler:
+    """Collect cProfile and tracemalloc data per named phase."""
+
+    enabled = True
+
+    def __init__(self, profile_id: str, output_dir: Optional[Path] = None):
+        self.profile_id = profile_id
+        self.output_dir = Path(output_dir or PROFILE_DIR / profile_id)
+        self._phases: Dict[str, _PhaseStats] = {}
+        # Active phases: [name, start of current segment, traced memory at start]
+        self._stack: List[list] = []
+        self._started_tracemalloc = False
+        self._claimed = False
+
+    def claim(self, blocking: bool = True) -> bool:
+        """Take the process's profiling slot; False if ``blocking`` is off and another profiler holds it."""
+        if not self._claimed:
+            self._claimed = _active.acquire(blocking)
+        return self._claimed
+
+    def release(self):
+        """Free the profiling slot without saving, e.g. when the profiled work never started."""
+        if self._claimed:
+            self._claimed = False
+            _active.release()
+
+    def start(self, name: str):
+        if not self.claim(blocking=False):
+            raise ProfilerBusy("Another profiled run or render is active in this process")
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self._stack:
+            self._pause(self._stack[-1])
+        stats = self._phases.setdefault(name, _PhaseStats())
+        stats.calls += 1
+        tracemalloc.reset_peak()
+        self._stack.append([name, time.perf_counter(), tracemalloc.get_traced_memory()[0]])
+        stats.profile.enable()
+
+    def stop(self, name: str):
+        if not self._stack or self._stack[-1][0] != name:
+            raise RuntimeError(f"Profiler phase '{name}' is not the innermost active phase")
+        _, started, mem_start = self._stack.pop()
+        stats = self._phases[name]
+        stats.profile.disable()
+        current, peak = tracemalloc.get_traced_memory()
+        stats.wall_s += time.perf_counter() - started
+        stats.peak_bytes = max(stats.peak_bytes, peak)
+        stats.net_bytes += current - mem_start
+        if self._stack:
+            self._resume(self._stack[-1])
+
+    def _pause(self, entry: list):
+        stats = self._phases[entry[0]]
+        stats.profile.disable()
+        stats.wall_s += time.perf_counter() - entry[1]
+        stats.peak_bytes = max(stats.peak_bytes, tracemalloc.get_traced_memory()[1])
+
+    def _resume(self, entry: list):
+        tracemalloc.reset_peak()
+        entry[1] = time.perf_counter()
+        self._phases[entry[0]].profile.enable()
+
+    @contextmanager
+    def phase(self, name: str):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def save(self, top: int = 15) -> Dict[str, Any]:
+        """Write ``.prof`` files and ``summary.json``; stop tracemalloc if we started it and free the slot."""
+        try:
+            while self._stack:
+                self.stop(self._stack[-1][0])
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+        finally:
+            self.release()
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        phases: Dict[str, Any] = {}
+        for name, stats in self._phases.items():
+            prof_path = self.output_dir / f"{name}.prof"
+            stats.profile.dump_stats(str(prof_path))
+            phases[name] = {
+                "wall_s": round(stats.wall_s, 6),
+                "calls": stats.calls,
+                "peak_traced_mb": round(stats.peak_bytes / (1024 * 1024), 3),
+                "net_allocated_mb": round(stats.net_bytes / (1024 * 1024), 3),
+                "profile": prof_path.name,
+                "top_cumulative": _top_functions(stats.profile, top),
+            }
+        summary = {"profile_id": self.profile_id, "phases": phases}
+        with (self.output_dir / "summary.json").open("w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+class NullProfiler:
+    """Drop-in for ``RunProfiler`` when profiling is off."""
+
+    enabled = False
+    output_dir = None
+
+    def claim(self, blocking: bool = True) -> bool:
+        return True
+
+    def release(self):
+        pass
+
+    def start(self, name: str):
+        pass
+
+    def stop(self, name: str):
+        pass
+
+    @contextmanager
+    def phase(self, name: str):
+        yield
+
+    def save(self, top: int = 15) -> Dict[str, Any]:
+        return {}
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def _top_functions(profile: cProfile.Profile, limit: int) -> List[Dict[str, Any]]:
+    try:
+        st = pstats.Stats(profile, stream=io.StringIO())
+    except TypeError:
+        # Phase never recorded any calls
+        return []
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _) in st.stats.items():  # type: ignore[attr-defined]
+        rows.append({"function": f"{Path(filename).name}:{line}({func})", "calls": nc, "tottime_s": round(tt, 6), "cumtime_s": round(ct, 6)})
+    rows.sort(key=lambda r: r["cumtime_s"], reverse=True)
+    return rows[:limit]
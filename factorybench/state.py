@@ -1,10 +1,14 @@
-"""In-memory state management for active benchmark runs."""
-from typing import Dict, Optional
-from dataclasses import dataclass, field
+"""State management for active benchmark runs, in memory or shared through SQLite."""
+from typing import Dict, List, Optional
+from dataclasses import dataclass, replace
 from datetime import datetime, date
-from threading import Lock
+from threading import Lock, local
 from pathlib import Path
 import json
+import sqlite3
+import time
+
+from .monitoring import ACTIVE_RUNS, RUNS_FINISHED
 
 
 @dataclass
@@ -17,63 +21,188 @@ class RunProgress:
     should_stop: bool = False
     status: str = "running"  # running, stopped, completed, failed
     error: Optional[str] = None
-    
+    finished_at: Optional[float] = None  # epoch seconds; drives TTL eviction
+
+
+class MemoryStateBackend:
+    """Process-local run state; every API worker process sees only its own runs."""
 
-class RunStateManager:
-    """Thread-safe manager for active run states."""
-    
     def __init__(self):
-        self._active_runs: Dict[str, RunProgress] = {}
+        self._runs: Dict[str, RunProgress] = {}
         self._lock = Lock()
+
+    def put(self, progress: RunProgress):
+        with self._lock:
+            self._runs[progress.run_id] = replace(progress)
+
+    def get(self, run_id: str) -> Optional[RunProgress]:
+        with self._lock:
+            progress = self._runs.get(run_id)
+            return replace(progress) if progress else None
+
+    def update(self, run_id: str, **fields) -> Optional[RunProgress]:
+        """Apply ``fields`` atomically; returns the state before the update."""
+        with self._lock:
+            progress = self._runs.get(run_id)
+            if progress is None:
+                return None
+            before = replace(progress)
+            for key, value in fields.items():
+                setattr(progress, key, value)
+            return before
+
+    def request_stop(self, run_id: str) -> bool:
+        with self._lock:
+            progress = self._runs.get(run_id)
+            if progress and progress.status == "running":
+                progress.should_stop = True
+                return True
+            return False
+
+    def delete(self, run_id: str):
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def evict_finished(self, before: float) -> int:
+        with self._lock:
+            expired = [k for k, p in self._runs.items() if p.finished_at is not None and p.finished_at < before]
+            for run_id in expired:
+                del self._runs[run_id]
+            return len(expired)
+
+    def all(self) -> List[RunProgress]:
+        with self._lock:
+            return [replace(p) for p in self._runs.values()]
+
+
+class SQLiteStateBackend:
+    """
+    Run state in a SQLite file, shared by every process on the host.
+
+    Lets ``uvicorn --workers N`` answer progress polls and stop requests for runs executing
+    in another worker. Uses WAL so readers never block the writer, and one connection per
+    thread because FastAPI serves sync handlers from a thread pool.
+    """
+
+    _COLUMNS = ("run_id", "total_samples", "processed_samples", "current_cost", "should_stop", "status", "error", "finished_at")
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS run_progress ("
+                "run_id TEXT PRIMARY KEY, total_samples INTEGER NOT NULL, processed_samples INTEGER NOT NULL, "
+                "current_cost REAL NOT NULL, should_stop INTEGER NOT NULL, status TEXT NOT NULL, error TEXT, finished_at REAL)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _row(self, row) -> Optional[RunProgress]:
+        if row is None:
+            return None
+        values = dict(zip(self._COLUMNS, row))
+        values["should_stop"] = bool(values["should_stop"])
+        return RunProgress(**values)
+
+    def put(self, progress: RunProgress):
+        p = progress
+        self._conn().execute(
+            f"INSERT OR REPLACE INTO run_progress ({', '.join(self._COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (p.run_id, p.total_samples, p.processed_samples, p.current_cost, int(p.should_stop), p.status, p.error, p.finished_at),
+        )
+
+    def get(self, run_id: str) -> Optional[RunProgress]:
+        cur = self._conn().execute(f"SELECT {', '.join(self._COLUMNS)} FROM run_progress WHERE run_id = ?", (run_id,))
+        return self._row(cur.fetchone())
+
+    def update(self, run_id: str, **fields) -> Optional[RunProgress]:
+        conn = self._conn()
+        # IMMEDIATE takes the write lock up front so the read and the update are atomic
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.get(run_id)
+            if before is not None:
+                values = {k: int(v) if isinstance(v, bool) else v for k, v in fields.items()}
+                assignments = ", ".join(f"{k} = ?" for k in values)
+                conn.execute(f"UPDATE run_progress SET {assignments} WHERE run_id = ?", (*values.values(), run_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return before
+
+    def request_stop(self, run_id: str) -> bool:
+        cur = self._conn().execute("UPDATE run_progress SET should_stop = 1 WHERE run_id = ? AND status = 'running'", (run_id,))
+        return cur.rowcount > 0
+
+    def delete(self, run_id: str):
+        self._conn().execute("DELETE FROM run_progress WHERE run_id = ?", (run_id,))
+
+    def evict_finished(self, before: float) -> int:
+        cur = self._conn().execute("DELETE FROM run_progress WHERE finished_at IS NOT NULL AND finished_at < ?", (before,))
+        return cur.rowcount
+
+    def all(self) -> List[RunProgress]:
+        cur = self._conn().execute(f"SELECT {', '.join(self._COLUMNS)} FROM run_progress")
+        return [self._row(row) for row in cur.fetchall()]
+
+
+class RunStateManager:
+    """Thread-safe manager for active run states over a pluggable backend."""
+    
+    def __init__(self, backend=None, ttl_s: float = 3600.0):
+        self._backend = backend or MemoryStateBackend()
+        self.ttl_s = ttl_s
     
     def start_run(self, run_id: str, total_samples: int) -> RunProgress:
         """Initialize progress tracking for a new run."""
-        with self._lock:
-            progress = RunProgress(run_id=run_id, total_samples=total_samples)
-            self._active_runs[run_id] = progress
-            return progress
+        self.evict_expired()
+        progress = RunProgress(run_id=run_id, total_samples=total_samples)
+        self._backend.put(progress)
+        ACTIVE_RUNS.inc()
+        return progress
     
     def get_progress(self, run_id: str) -> Optional[RunProgress]:
         """Get current progress for a run."""
-        with self._lock:
-            return self._active_runs.get(run_id)
+        return self._backend.get(run_id)
     
     def update_progress(self, run_id: str, processed_samples: int, current_cost: float):
         """Update run progress."""
-        with self._lock:
-            if run_id in self._active_runs:
-                self._active_runs[run_id].processed_samples = processed_samples
-                self._active_runs[run_id].current_cost = current_cost
+        self._backend.update(run_id, processed_samples=processed_samples, current_cost=current_cost)
     
     def request_stop(self, run_id: str) -> bool:
         """Request a run to stop. Returns True if run exists and is running."""
-        with self._lock:
-            if run_id in self._active_runs:
-                progress = self._active_runs[run_id]
-                if progress.status == "running":
-                    progress.should_stop = True
-                    return True
-            return False
+        return self._backend.request_stop(run_id)
     
     def should_stop(self, run_id: str) -> bool:
         """Check if run should stop."""
-        with self._lock:
-            if run_id in self._active_runs:
-                return self._active_runs[run_id].should_stop
-            return False
+        progress = self._backend.get(run_id)
+        return bool(progress and progress.should_stop)
     
     def complete_run(self, run_id: str, status: str = "completed", error: Optional[str] = None):
-        """Mark run as complete."""
-        with self._lock:
-            if run_id in self._active_runs:
-                self._active_runs[run_id].status = status
-                self._active_runs[run_id].error = error
-                # Note: Daily costs are now calculated from run files, not stored in memory
+        """Mark run as complete; it stays queryable for ``ttl_s`` seconds."""
+        before = self._backend.update(run_id, status=status, error=error, finished_at=time.time())
+        if before is not None and before.status == "running":
+            ACTIVE_RUNS.dec()
+            RUNS_FINISHED.inc(status=status)
+        # Note: Daily costs are now calculated from run files, not stored in memory
     
     def cleanup_run(self, run_id: str):
         """Remove run from active tracking (after completion)."""
-        with self._lock:
-            self._active_runs.pop(run_id, None)
+        self._backend.delete(run_id)
+    
+    def evict_expired(self) -> int:
+        """Drop runs that finished more than ``ttl_s`` seconds ago."""
+        return self._backend.evict_finished(time.time() - self.ttl_s)
     
     def get_daily_cost(self, day: Optional[date] = None) -> float:
         """Get total cost for a specific day by reading from run files (default: today)."""
@@ -107,8 +236,9 @@ class RunStateManager:
                         # If no aggregate cost yet, check if it's an active run
                         if cost == 0.0:
                             run_id = run_data.get("run_id")
-                            if run_id and run_id in self._active_runs:
-                                cost = self._active_runs[run_id].current_cost
+                            progress = self._backend.get(run_id) if run_id else None
+                            if progress:
+                                cost = progress.current_cost
                         
                         total_cost += cost
             except (json.JSONDecodeError, ValueError, KeyError):
@@ -118,10 +248,21 @@ class RunStateManager:
         return total_cost
     
     def get_active_runs(self) -> Dict[str, RunProgress]:
-        """Get all active runs."""
-        with self._lock:
-            return dict(self._active_runs)
+        """Get all tracked runs (active, and finished within the TTL)."""
+        self.evict_expired()
+        return {p.run_id: p for p in self._backend.all()}
+
+
+def create_state_manager() -> RunStateManager:
+    """Build the manager selected by ``FACTORYBENCH_STATE_BACKEND``."""
+    from .config import STATE_BACKEND, STATE_DB_PATH, STATE_TTL_S
+
+    if STATE_BACKEND == "memory":
+        return RunStateManager(MemoryStateBackend(), ttl_s=STATE_TTL_S)
+    if STATE_BACKEND == "sqlite":
+        return RunStateManager(SQLiteStateBackend(STATE_DB_PATH), ttl_s=STATE_TTL_S)
+    raise ValueError(f"Unknown FACTORYBENCH_STATE_BACKEND '{STATE_BACKEND}'; use memory or sqlite")
 
 
 # Global singleton instance
-run_state = RunStateManager()
+run_state = create_state_manager()
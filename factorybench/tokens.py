@@ -0,0 +1,33 @@
+"""
+Prompt token counting.
+
+Counts with tiktoken's ``cl100k_base`` encoding when tiktoken is installed, and
+otherwise with a pre-tokenizer approximation of cl100k (digit runs split into groups
+of three).
+"""
+import re
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None  # type: ignore
+
+TOKENIZER_ENCODING = "cl100k_base"
+
+# cl100k's pre-tokenizer, restricted to ASCII; BPE never merges across these pieces
+_PRETOKEN_RE = re.compile(r" ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+")
+
+_encoding = None
+
+
+def tokenizer_name() -> str:
+    return TOKENIZER_ENCODING if tiktoken is not None else f"approx-{TOKENIZER_ENCODING}"
+
+
+def count_tokens(text: str) -> int:
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        return len(_encoding.encode(text))
+    return len(_PRETOKEN_RE.findall(text))
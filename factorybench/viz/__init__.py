@@ -4,6 +4,7 @@ from factorybench.viz.charts import (
     create_model_performance_bar_chart,
     create_cost_vs_performance_scatter,
     create_model_metrics_heatmap,
+    create_latency_distribution_chart,
     generate_all_charts,
 )
 
@@ -11,5 +12,6 @@ __all__ = [
     "create_model_performance_bar_chart",
     "create_cost_vs_performance_scatter",
     "create_model_metrics_heatmap",
+    "create_latency_distribution_chart",
     "generate_all_charts",
 ]
@@ -6,11 +6,14 @@ Uses matplotlib with Forgis brand colors.
 
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Callable, Dict, List, Tuple, Optional
 
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.figure import Figure
+from matplotlib.ticker import NullFormatter, ScalarFormatter
+
+from ..leaderboard import best_run_key
 
 # Forgis brand colors
 COLORS = {
@@ -62,16 +65,8 @@ def _select_best_run(runs: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     if not runs:
         return None
     
-    # Sort by samples (desc) then by started_at (desc for most recent)
-    sorted_runs = sorted(
-        runs,
-        key=lambda r: (
-            r.get("aggregate", {}).get("samples", 0),
-            r.get("started_at", "")
-        ),
-        reverse=True
-    )
-    return sorted_runs[0]
+    # Same ordering as the leaderboard's best-run view
+    return max(runs, key=best_run_key)
 
 
 def _group_runs_by_model_dataset(runs: List[Dict[str, Any]]) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
@@ -95,7 +90,8 @@ def _group_runs_by_model_dataset(runs: List[Dict[str, Any]]) -> Dict[Tuple[str,
     return groups
 
 
-def create_model_performance_bar_chart(runs: List[Dict[str, Any]], output_path: Path) -> Figure:
+def create_model_performance_bar_chart(runs: List[Dict[str, Any]], output_path: Path,
+                                      intervals: Optional[Dict[str, Dict[str, Any]]] = None) -> Figure:
     """
     Create sorted bar chart comparing model performance.
     Lower performance score is better.
@@ -103,6 +99,7 @@ def create_model_performance_bar_chart(runs: List[Dict[str, Any]], output_path:
     Args:
         runs: List of run dictionaries
         output_path: Path to save the chart
+        intervals: Optional bootstrap intervals by run_id, drawn as error bars
         
     Returns:
         Matplotlib figure
@@ -120,11 +117,13 @@ def create_model_performance_bar_chart(runs: List[Dict[str, Any]], output_path:
         if best_run:
             perf = best_run.get("aggregate", {}).get("performance", 0)
             samples = int(best_run.get("aggregate", {}).get("samples", 0))
+            ci = (intervals or {}).get(best_run.get("run_id"), {}).get("performance")
             data.append({
                 "model": model,
                 "dataset": dataset,
                 "performance": perf,
-                "samples": samples
+                "samples": samples,
+                "ci": (ci["low"], ci["high"]) if ci else (perf, perf)
             })
     
     if not data:
@@ -142,11 +141,15 @@ def create_model_performance_bar_chart(runs: List[Dict[str, Any]], output_path:
     # Color gradient from best (fire) to worst (steel)
     colors = [COLORS["fire"] if i == 0 else COLORS["tiger"] if i == 1 else COLORS["flicker"] if i == 2 else COLORS["steel"] for i in range(len(data))]
     
-    bars = ax.barh(labels, performances, color=colors, alpha=0.9)
+    # Asymmetric bootstrap interval around each bar; zero-length where none is known
+    xerr = np.array([[max(0.0, d["performance"] - d["ci"][0]) for d in data],
+                     [max(0.0, d["ci"][1] - d["performance"]) for d in data]])
+    bars = ax.barh(labels, performances, color=colors, alpha=0.9,
+                   xerr=xerr, error_kw={"ecolor": COLORS["platinum"], "capsize": 4, "elinewidth": 1.2})
     
     # Add sample count annotations
     for i, (bar, samp) in enumerate(zip(bars, samples)):
-        ax.text(bar.get_width() + 0.002, bar.get_y() + bar.get_height()/2,
+        ax.text(bar.get_width() + xerr[1][i] + 0.002, bar.get_y() + bar.get_height()/2,
                 f"n={samp}",
                 va="center", fontsize=11, color=COLORS["platinum"])
     
@@ -233,13 +236,15 @@ def create_cost_vs_performance_scatter(runs: List[Dict[str, Any]], output_path:
     return fig
 
 
-def create_model_metrics_heatmap(runs: List[Dict[str, Any]], output_path: Path) -> Figure:
+def create_model_metrics_heatmap(runs: List[Dict[str, Any]], output_path: Path,
+                                 intervals: Optional[Dict[str, Dict[str, Any]]] = None) -> Figure:
     """
     Create heatmap showing all error metrics for each model-dataset combination.
     
     Args:
         runs: List of run dictionaries
         output_path: Path to save the chart
+        intervals: Optional bootstrap intervals by run_id, annotated as +/- half-widths
         
     Returns:
         Matplotlib figure
@@ -256,8 +261,11 @@ def create_model_metrics_heatmap(runs: List[Dict[str, Any]], output_path: Path)
         best_run = _select_best_run(group_runs)
         if best_run:
             agg = best_run.get("aggregate", {})
+            ci = (intervals or {}).get(best_run.get("run_id"), {})
+            half = {k: (v["high"] - v["low"]) / 2.0 for k, v in ci.items()}
             data.append({
                 "label": f"{model}\n({dataset})",
+                "half_widths": [half.get(k) for k in ("mean_abs_err_mean", "min_abs_err_mean", "max_abs_err_mean", "performance")],
                 "mean_err": agg.get("mean_abs_err_mean", 0),
                 "min_err": agg.get("min_abs_err_mean", 0),
                 "max_err": agg.get("max_abs_err_mean", 0),
@@ -295,7 +303,9 @@ def create_model_metrics_heatmap(runs: List[Dict[str, Any]], output_path: Path)
     # Add value annotations for error metrics
     for i in range(len(metrics)):
         for j in range(len(labels)):
-            text = ax.text(j, i, f"{error_values[i, j]:.3f}",
+            half_width = data[j]["half_widths"][i]
+            label = f"{error_values[i, j]:.3f}" if half_width is None else f"{error_values[i, j]:.3f}\n±{half_width:.3f}"
+            text = ax.text(j, i, label,
                           ha="center", va="center", color=COLORS["gunmetal"],
                           fontsize=9, fontweight="bold")
     
@@ -317,6 +327,73 @@ def create_model_metrics_heatmap(runs: List[Dict[str, Any]], output_path: Path)
     return fig
 
 
+def create_latency_distribution_chart(runs: List[Dict[str, Any]], output_path: Path) -> Figure:
+    """
+    Create box plot of per-sample model latency for each model/deployment.
+    Pools the timed samples of all runs per model name; Azure runs are named
+    ``azure:<deployment>``, so each deployment gets its own box.
+    
+    Args:
+        runs: List of run dictionaries
+        output_path: Path to save the chart
+        
+    Returns:
+        Matplotlib figure
+    """
+    apply_style()
+    
+    if not runs:
+        return _save_empty_chart("No data available", output_path)
+    
+    latencies: Dict[str, List[float]] = {}
+    for run in runs:
+        model = run.get("model", "unknown")
+        for result in run.get("results", []):
+            value = (result.get("timing") or {}).get("generate_ms")
+            if isinstance(value, (int, float)):
+                latencies.setdefault(model, []).append(value)
+    
+    if not latencies:
+        return _save_empty_chart("No timing data (runs predate latency tracking)", output_path)
+    
+    # Sort by median latency (ascending - faster first)
+    models = sorted(latencies, key=lambda m: float(np.median(latencies[m])))
+    data = [latencies[m] for m in models]
+    
+    fig, ax = plt.subplots(figsize=(10, 6), dpi=300)
+    
+    bp = ax.boxplot(data, vert=False, patch_artist=True, showfliers=True,
+                    medianprops={"color": COLORS["white"], "linewidth": 1.5},
+                    whiskerprops={"color": COLORS["platinum"]},
+                    capprops={"color": COLORS["platinum"]},
+                    flierprops={"marker": ".", "markersize": 3, "markerfacecolor": COLORS["steel"], "markeredgecolor": COLORS["steel"]})
+    for i, patch in enumerate(bp["boxes"]):
+        patch.set_facecolor(COLORS["fire"] if i == 0 else COLORS["tiger"] if i == 1 else COLORS["flicker"] if i == 2 else COLORS["steel"])
+        patch.set_alpha(0.9)
+    
+    ax.set_yticks(np.arange(1, len(models) + 1))
+    ax.set_yticklabels(models, fontsize=11)
+    
+    # Annotate p95 and sample count
+    for i, values in enumerate(data, start=1):
+        p95 = float(np.percentile(values, 95))
+        ax.text(p95, i + 0.25, f"p95={p95:.0f}ms  n={len(values)}",
+                va="center", fontsize=9, color=COLORS["platinum"])
+    
+    ax.set_xscale("log")
+    ax.xaxis.set_major_formatter(ScalarFormatter())
+    ax.xaxis.set_minor_formatter(NullFormatter())
+    ax.set_xlabel("Latency per Sample (ms, log scale)", fontweight="bold", fontsize=14)
+    ax.set_ylabel("Model / Deployment", fontweight="bold", fontsize=14)
+    ax.set_title("Model Latency Distribution", fontsize=16, fontweight="bold", pad=15)
+    ax.grid(True, axis="x", alpha=0.3)
+    
+    plt.tight_layout()
+    fig.savefig(output_path, dpi=300, facecolor=COLORS["gunmetal"], edgecolor="none")
+    
+    return fig
+
+
 def _create_empty_chart(message: str) -> Figure:
     """Create a placeholder chart for missing data."""
     apply_style()
@@ -329,7 +406,36 @@ def _create_empty_chart(message: str) -> Figure:
     return fig
 
 
-def generate_all_charts(runs_dir: Path, output_dir: Path, model_filters: list = None, dataset_filters: list = None):
+def _save_empty_chart(message: str, output_path: Path) -> Figure:
+    """Create a placeholder chart and save it to ``output_path``."""
+    fig = _create_empty_chart(message)
+    fig.savefig(output_path, dpi=300, facecolor=COLORS["gunmetal"], edgecolor="none")
+    return fig
+
+
+def _load_intervals(runs: List[Dict[str, Any]], lookup: Optional[Callable[[str], Optional[Dict[str, Any]]]]) -> Dict[str, Dict[str, Any]]:
+    """Bootstrap intervals by run_id from ``lookup``; runs without are drawn without error bars."""
+    intervals = {}
+    if lookup is None:
+        return intervals
+    for run in runs:
+        run_id = run.get("run_id")
+        try:
+            found = lookup(run_id)
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            continue
+        if found is not None:
+            intervals[run_id] = found
+    return intervals
+
+
+def generate_all_charts(
+    runs_dir: Path,
+    output_dir: Path,
+    model_filters: list = None,
+    dataset_filters: list = None,
+    interval_lookup: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+):
     """
     Generate all charts for model comparison analysis.
     
@@ -338,6 +444,8 @@ def generate_all_charts(runs_dir: Path, output_dir: Path, model_filters: list =
         output_dir: Directory to save chart images
         model_filters: Optional list of model IDs to filter runs
         dataset_filters: Optional list of dataset sources to filter runs
+        interval_lookup: run_id -> bootstrap intervals by metric, drawn as error bars;
+            None draws no intervals
     """
     output_dir.mkdir(parents=True, exist_ok=True)
     
@@ -349,6 +457,10 @@ def generate_all_charts(runs_dir: Path, output_dir: Path, model_filters: list =
         with open(run_file) as f:
             run_data = json.load(f)
             
+            # Charts compare telemetry literacy metrics; other stages score differently
+            if run_data.get("stage", "telemetry_literacy") != "telemetry_literacy":
+                continue
+            
             # Apply filters
             if model_filters and run_data.get("model") not in model_filters:
                 continue
@@ -367,6 +479,7 @@ def generate_all_charts(runs_dir: Path, output_dir: Path, model_filters: list =
         _create_empty_chart("No data matches current filters").savefig(output_dir / "model_performance.png", dpi=300, facecolor=COLORS["gunmetal"])
         _create_empty_chart("No data matches current filters").savefig(output_dir / "cost_vs_performance.png", dpi=300, facecolor=COLORS["gunmetal"])
         _create_empty_chart("No data matches current filters").savefig(output_dir / "metrics_heatmap.png", dpi=300, facecolor=COLORS["gunmetal"])
+        _create_empty_chart("No data matches current filters").savefig(output_dir / "latency_distribution.png", dpi=300, facecolor=COLORS["gunmetal"])
         return
     
     filter_desc = []
@@ -378,9 +491,11 @@ def generate_all_charts(runs_dir: Path, output_dir: Path, model_filters: list =
     
     print(f"Generating charts for {len(runs)}/{all_runs_count} runs{filter_str}...")
     
-    create_model_performance_bar_chart(runs, output_dir / "model_performance.png")
+    intervals = _load_intervals(runs, interval_lookup)
+    create_model_performance_bar_chart(runs, output_dir / "model_performance.png", intervals)
     create_cost_vs_performance_scatter(runs, output_dir / "cost_vs_performance.png")
-    create_model_metrics_heatmap(runs, output_dir / "metrics_heatmap.png")
+    create_model_metrics_heatmap(runs, output_dir / "metrics_heatmap.png", intervals)
+    create_latency_distribution_chart(runs, output_dir / "latency_distribution.png")
     
     print(f"Charts saved to {output_dir}")
 
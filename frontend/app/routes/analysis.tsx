@@ -116,7 +116,8 @@ export default function Analysis() {
       charts: [
         { title: "Model Performance Comparison", type: "model_performance" },
         { title: "Cost vs Performance Tradeoff", type: "cost_vs_performance" },
-        { title: "Model Metrics Heatmap", type: "metrics_heatmap" }
+        { title: "Model Metrics Heatmap", type: "metrics_heatmap" },
+        { title: "Model Latency Distribution", type: "latency_distribution" }
       ]
     },
     {
@@ -261,6 +262,7 @@ function ChartCard({ title, type, runs, modelFilters, datasetFilters }: {
     model_performance: "Compares models by performance score (average of mean/min/max errors). Lower is better. Shows best run for each model-dataset combination.",
     cost_vs_performance: "Scatter plot of total cost vs performance. Ideal models are in the lower-left (low cost, low error). Point size indicates sample count.",
     metrics_heatmap: "Heatmap showing all error metrics for each model-dataset combo. Darker colors indicate higher values.",
+    latency_distribution: "Box plot of per-sample model latency for each model/deployment across all matching runs. Annotated with p95 and sample count.",
     retrieval: "Measures how accurately the model retrieves relevant information (Precision@K).",
     ordering: "Evaluates step ordering accuracy using Kendall tau correlation.",
     classification: "Shows F1 score for fault classification tasks.",
@@ -5,7 +5,7 @@ import * as React from "react";
 
 async function fetchRuns(apiBase: string, params?: URLSearchParams) {
   try {
-    const url = new URL(`${apiBase}/runs`);
+    const url = new URL(`${apiBase}/leaderboard`);
     if (params) {
       params.forEach((value, key) => {
         if (value) url.searchParams.append(key, value);
@@ -55,12 +55,14 @@ export default function Leaderboard() {
   const [searchParams, setSearchParams] = useSearchParams();
   const [modelDropdownOpen, setModelDropdownOpen] = React.useState(false);
   const [datasetDropdownOpen, setDatasetDropdownOpen] = React.useState(false);
-  const [sortBy, setSortBy] = React.useState<string>("run_id");
-  const [sortDir, setSortDir] = React.useState<"asc" | "desc">("desc");
 
   const modelFilters = searchParams.getAll("model");
   const datasetFilters = searchParams.getAll("dataset");
   const stageFilter = searchParams.get("stage") || "";
+  // Sorting and best-run selection happen server-side in GET /leaderboard
+  const sortBy = searchParams.get("sort") || "run_id";
+  const sortDir = searchParams.get("order") === "asc" ? "asc" : "desc";
+  const bestOnly = searchParams.get("best") === "true";
   
   // Set default filters on mount
   React.useEffect(() => {
@@ -84,65 +86,12 @@ export default function Leaderboard() {
   }, []); // Only run on mount
 
   function toggleSort(column: string) {
-    if (sortBy === column) {
-      setSortDir(sortDir === "asc" ? "desc" : "asc");
-    } else {
-      setSortBy(column);
-      setSortDir("asc");
-    }
+    const params = new URLSearchParams(searchParams);
+    params.set("sort", column);
+    params.set("order", sortBy === column && sortDir === "asc" ? "desc" : "asc");
+    setSearchParams(params);
   }
 
-  const sortedItems = React.useMemo(() => {
-    const sorted = [...items].sort((a: any, b: any) => {
-      let aVal: any, bVal: any;
-      if (sortBy === "ok_rate") {
-        aVal = a.aggregate?.ok_rate ?? 0;
-        bVal = b.aggregate?.ok_rate ?? 0;
-      } else if (sortBy === "mean_err") {
-        aVal = a.aggregate?.mean_abs_err_mean ?? 0;
-        bVal = b.aggregate?.mean_abs_err_mean ?? 0;
-      } else if (sortBy === "min_err") {
-        aVal = a.aggregate?.min_abs_err_mean ?? 0;
-        bVal = b.aggregate?.min_abs_err_mean ?? 0;
-      } else if (sortBy === "max_err") {
-        aVal = a.aggregate?.max_abs_err_mean ?? 0;
-        bVal = b.aggregate?.max_abs_err_mean ?? 0;
-      } else if (sortBy === "performance") {
-        aVal = a.aggregate?.performance ?? 0;
-        bVal = b.aggregate?.performance ?? 0;
-      } else if (sortBy === "cost_per_sample") {
-        aVal = a.aggregate?.cost_per_sample ?? 0;
-        bVal = b.aggregate?.cost_per_sample ?? 0;
-      } else if (sortBy === "cost_total") {
-        aVal = a.aggregate?.cost_total ?? 0;
-        bVal = b.aggregate?.cost_total ?? 0;
-      } else if (sortBy === "samples") {
-        aVal = a.aggregate?.samples ?? 0;
-        bVal = b.aggregate?.samples ?? 0;
-      } else if (sortBy === "dataset") {
-        aVal = a.dataset?.dataset_id || "";
-        bVal = b.dataset?.dataset_id || "";
-      } else if (sortBy === "model") {
-        aVal = a.model || "";
-        bVal = b.model || "";
-      } else if (sortBy === "stage") {
-        aVal = a.stage || "";
-        bVal = b.stage || "";
-      } else if (sortBy === "status") {
-        aVal = a.status || "";
-        bVal = b.status || "";
-      } else {
-        aVal = a.run_id || "";
-        bVal = b.run_id || "";
-      }
-      if (typeof aVal === "string") {
-        return sortDir === "asc" ? aVal.localeCompare(bVal) : bVal.localeCompare(aVal);
-      }
-      return sortDir === "asc" ? aVal - bVal : bVal - aVal;
-    });
-    return sorted;
-  }, [items, sortBy, sortDir]);
-
   // Helper components
   const SortTh = ({ column, label, sortBy, sortDir, onToggle }: any) => {
     const isActive = sortBy === column;
@@ -171,6 +120,23 @@ export default function Leaderboard() {
     setSearchParams(params);
   }
 
+  function toggleBestOnly() {
+    const params = new URLSearchParams(searchParams);
+    if (bestOnly) {
+      params.delete("best");
+    } else {
+      params.set("best", "true");
+    }
+    setSearchParams(params);
+  }
+
+  function clearFilters() {
+    const params = new URLSearchParams();
+    if (searchParams.get("sort")) params.set("sort", sortBy);
+    if (searchParams.get("order")) params.set("order", sortDir);
+    setSearchParams(params);
+  }
+
   function updateStageFilter(value: string) {
     const params = new URLSearchParams(searchParams);
     if (value) {
@@ -226,11 +192,23 @@ export default function Leaderboard() {
           </select>
         </div>
 
-        {(modelFilters.length > 0 || datasetFilters.length > 0 || stageFilter) && (
+        <div style={{ display: "flex", alignItems: "flex-end" }}>
+          <label style={{ display: "flex", alignItems: "center", gap: 8, padding: "8px 0", fontSize: 14, color: "var(--fg-platinum)", cursor: "pointer" }}>
+            <input
+              type="checkbox"
+              checked={bestOnly}
+              onChange={toggleBestOnly}
+              style={{ width: 16, height: 16, cursor: "pointer", accentColor: "var(--fg-fire)" }}
+            />
+            Best run per model and dataset
+          </label>
+        </div>
+
+        {(modelFilters.length > 0 || datasetFilters.length > 0 || stageFilter || bestOnly) && (
           <div style={{ display: "flex", alignItems: "flex-end" }}>
             <button 
               className="btn" 
-              onClick={() => setSearchParams(new URLSearchParams())}
+              onClick={clearFilters}
               style={{ padding: "8px 12px" }}
             >
               Clear Filters
@@ -258,10 +236,10 @@ export default function Leaderboard() {
           </tr>
         </thead>
         <tbody>
-          {sortedItems.length === 0 && (
+          {items.length === 0 && (
             <tr><td colSpan={13} className="muted">No runs match the filters. Try adjusting or clearing them.</td></tr>
           )}
-          {sortedItems.map((r: any) => {
+          {items.map((r: any) => {
             const agg = r.aggregate || {};
             const ds = r.dataset || {};
             const stageShort = r.stage === 'telemetry_literacy' ? 'TL' : r.stage === 'root_cause_analysis' ? 'RCA' : r.stage === 'guided_remediation' ? 'GR' : r.stage || '-';
@@ -4,13 +4,21 @@ import { useLoaderData, useNavigation, Form, useActionData } from "@remix-run/re
 import * as React from "react";
 
 async function fetchMetadata(apiBase: string) {
-  const [modelsRes, datasetsRes] = await Promise.all([
+  const [modelsRes, datasetsRes, rcaDatasetsRes] = await Promise.all([
     fetch(`${apiBase}/metadata/models`),
-    fetch(`${apiBase}/metadata/datasets?stage=telemetry_literacy`)
+    fetch(`${apiBase}/metadata/datasets?stage=telemetry_literacy`),
+    fetch(`${apiBase}/metadata/datasets?stage=root_cause_analysis`)
   ]);
   const models = modelsRes.ok ? await modelsRes.json() : { models: [] };
   const datasets = datasetsRes.ok ? await datasetsRes.json() : { datasets: [] };
-  return { models: models.models || [], datasets: datasets.datasets || [] };
+  const rcaDatasets = rcaDatasetsRes.ok ? await rcaDatasetsRes.json() : { datasets: [] };
+  return {
+    models: models.models || [],
+    datasets: [
+      ...(datasets.datasets || []).map((d:any)=>({ ...d, stage: "telemetry_literacy" })),
+      ...(rcaDatasets.datasets || []).map((d:any)=>({ ...d, stage: "root_cause_analysis" })),
+    ],
+  };
 }
 
 export async function loader({ request }: LoaderFunctionArgs) {
@@ -32,7 +40,7 @@ export async function action({ request }: ActionFunctionArgs) {
   if (limit != null && (isNaN(limit) || limit <= 0)) errors.limit = "Limit must be positive";
   if (Object.keys(errors).length) return json({ ok:false, errors }, { status: 400 });
   const body = {
-    stage: "telemetry_literacy",
+    stage: dataset_id.startsWith("local_rca_") ? "root_cause_analysis" : "telemetry_literacy",
     model,
     dataset_source: dataset_id.startsWith("hf_") ? "hf" : "local",
     dataset_id,
@@ -65,6 +73,7 @@ function inferFixturePath(dataset_id: string){
   if (dataset_id === 'local_basic') return 'datasets/basic_statistics.json';
   if (dataset_id === 'local_step_functions') return 'datasets/step_functions.json';
   if (dataset_id === 'local_patterns') return 'datasets/pattern_recognition.json';
+  if (dataset_id === 'local_rca_basic') return 'datasets/rca_basic.json';
   return 'datasets/basic_statistics.json';
 }
 
@@ -89,7 +98,7 @@ export default function RunPage(){
   return (
     <div className="card">
       <h2 style={{ marginTop:0 }}>Create Run</h2>
-      <p className="muted">Evaluate a model on a selected telemetry literacy dataset.</p>
+      <p className="muted">Evaluate a model on a telemetry literacy or root cause analysis dataset.</p>
       <Form method="post" style={{ display:'grid', gap:16, maxWidth:520, marginTop:16 }}>
         <Field label="Model" name="model" error={actionData?.errors?.model}>
           <select name="model" defaultValue="azure:gpt-4o-mini" style={selectStyle}>
@@ -98,7 +107,7 @@ export default function RunPage(){
         </Field>
         <Field label="Dataset" name="dataset_id" error={actionData?.errors?.dataset_id}>
           <select name="dataset_id" defaultValue="hf_factoryset" style={selectStyle}>
-            {datasets.map((d:any)=>(<option key={d.id} value={d.id}>{d.name} ({d.id})</option>))}
+            {datasets.map((d:any)=>(<option key={d.id} value={d.id}>{d.stage === 'root_cause_analysis' ? 'RCA: ' : ''}{d.name} ({d.id})</option>))}
           </select>
         </Field>
         <Field label="Limit (optional)" name="limit" error={actionData?.errors?.limit}>
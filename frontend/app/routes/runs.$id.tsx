@@ -174,6 +174,8 @@ export default function RunDetail() {
         <Metric label="Total Tokens" value={agg.total_tokens ?? '-'} />
         <Metric label="Cost Total" value={fmt(agg.cost_total)} />
         <Metric label="Cost/Sample" value={fmt(agg.cost_per_sample)} />
+        <Metric label="Latency p50/p95" value={agg.latency_p50_ms != null ? `${agg.latency_p50_ms.toFixed(0)} / ${agg.latency_p95_ms.toFixed(0)} ms` : '-'} />
+        <Metric label="Samples/s" value={fmt(agg.samples_per_sec)} />
       </div>
       <details style={{ marginTop:24 }}>
         <summary style={{ cursor:'pointer', fontWeight:500 }}>Raw Aggregate JSON</summary>